@@ -0,0 +1,241 @@
+"""API HTTP locale de classification pour les autres systèmes de la clinique (exports PACS,
+formulaire de télémédecine) : même chargement du modèle, même préprocessing et même top-5 que
+l'interface Streamlit
+
+    python api_server.py --host 127.0.0.1 --port 8502
+
+POST /classify
+    corps image/* ou application/octet-stream : une image
+    multipart/form-data : une ou plusieurs images (chaque champ fichier)
+    → {"results": [{"name", "predictions": [{"disease", "probability", "confidence"}, ...],
+                    "cached"} ou {"name", "error"}], "latency_ms"}
+GET /health   état du chargement du modèle (503 tant qu'il n'est pas prêt, 500 si le chargement a échoué)
+GET /stats    micro-lots, cache et latences par étape
+
+Les requêtes concurrentes passent par le même MicroBatchScheduler que l'interface : leurs images
+partagent les passes du modèle. Connexions persistantes (keep-alive) gérées par uvicorn.
+"""
+import argparse
+import asyncio
+import io
+from contextlib import asynccontextmanager
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import config
+from batching import MicroBatchScheduler
+from decoding import ImageTooLargeError, decode_image
+from inference import MODEL_PATH, disease_index, preprocess_uint8, results_from_top_k, top_k_batch
+from model_loader import FAILED, BackgroundLoader, build_model, served_artifact
+from prediction_cache import PredictionCache
+from prediction_log import PredictionLog
+from timing import LatencyRecorder, RequestTimer
+
+RAW_CONTENT_TYPES = ('image/', 'application/octet-stream')
+
+
+class ClassificationService:
+    """Pipeline de classification de l'API : cache, décodage, micro-lots, top-5, journal"""
+
+    def __init__(self, loader, cache=None, log=None, recorder=None):
+        self.loader = loader
+        self.cache = cache
+        self.log = log
+        self.recorder = recorder or LatencyRecorder(window=config.LATENCY_WINDOW)
+        self.scheduler = None
+
+    def get_scheduler(self):
+        """Ordonnanceur créé au premier appel une fois le modèle prêt (None avant)"""
+        if self.scheduler is None and self.loader.ready:
+            self.scheduler = MicroBatchScheduler(
+                self.loader.result().predict,
+                max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+                max_wait_ms=config.MICRO_BATCH_MAX_WAIT_MS,
+                workers=max(1, config.WORKER_PROCESSES),
+            )
+        return self.scheduler
+
+    def _prepare(self, data, timer):
+        """Décodage et préprocessing (thread du pool) : (1, 64, 64, 3) uint8"""
+        with timer.stage('decode'):
+            image = decode_image(io.BytesIO(data), max_pixels=config.DECODE_MAX_PIXELS)
+        with timer.stage('preprocess'):
+            return preprocess_uint8(image)
+
+    async def classify(self, images):
+        """Classifie [(nom, octets)] ; retourne un résultat par image, dans l'ordre"""
+        scheduler = self.get_scheduler()
+        timer = RequestTimer(self.recorder)
+        items = [{'name': name} for name, _ in images]
+        keys = [self.cache.key(data) if self.cache is not None else None for _, data in images]
+        misses = []
+        for item, key, (_, data) in zip(items, keys, images):
+            results = self.cache.get(key) if key is not None else None
+            if results is not None:
+                item.update(predictions=results, cached=True)
+            else:
+                misses.append((item, key, data))
+
+        # Images de la requête décodées en parallèle sur le pool de threads
+        prepared = await asyncio.gather(
+            *(run_in_threadpool(self._prepare, data, timer) for _, _, data in misses), return_exceptions=True)
+        arrays, pending = [], []
+        for (item, key, _), array in zip(misses, prepared):
+            # OSError : format inconnu ou fichier tronqué ; bombe de décompression : ImageTooLargeError
+            if isinstance(array, (ImageTooLargeError, OSError)):
+                item['error'] = f"Image illisible ou trop grande: {array}"
+                continue
+            if isinstance(array, BaseException):
+                raise array
+            arrays.append(array)
+            pending.append((item, key))
+
+        if pending:
+            # Toutes les images de la requête dans une seule soumission, regroupée avec les autres requêtes
+            with timer.stage('inference'):
+                probabilities = await asyncio.wrap_future(scheduler.submit(np.concatenate(arrays)))
+            with timer.stage('postprocess'):
+                indices, top_probabilities = top_k_batch(probabilities)
+                for (item, key), row_indices, row_probabilities in zip(pending, indices, top_probabilities):
+                    results = results_from_top_k(row_indices, row_probabilities)
+                    item.update(predictions=results, cached=False)
+                    if key is not None:
+                        self.cache.put(key, results)
+        latency = timer.finish()
+
+        if self.log is not None:
+            for item, key in zip(items, keys):
+                if 'predictions' in item:
+                    self.log.record(
+                        key.rpartition('-')[2] if key else '',
+                        [disease_index(result['disease']) for result in item['predictions']],
+                        [result['probability'] for result in item['predictions']],
+                        latency * 1000,
+                        user='api',
+                        cached=item['cached'],
+                    )
+        return items, latency
+
+    def stats(self):
+        return {
+            'model': self.loader.status(),
+            'scheduler': self.scheduler.stats() if self.scheduler is not None else None,
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'latency': self.recorder.summary(),
+            'throughput_per_second': self.recorder.throughput(),
+        }
+
+    def close(self):
+        if self.scheduler is not None:
+            self.scheduler.close()
+        if self.log is not None:
+            self.log.close()
+
+
+async def read_images(request, max_images, max_bytes):
+    """[(nom, octets)] d'une requête : image brute ou formulaire multipart"""
+    content_type = request.headers.get('content-type', '')
+    if content_type.startswith('multipart/form-data'):
+        async with request.form(max_files=max_images, max_part_size=max_bytes) as form:
+            uploads = [(key, value) for key, value in form.multi_items() if isinstance(value, UploadFile)]
+            return [(upload.filename or key, await upload.read()) for key, upload in uploads]
+    if content_type.startswith(RAW_CONTENT_TYPES):
+        return [(request.query_params.get('name', 'image'), await request.body())]
+    raise HTTPException(415, "Envoyez une image (image/*, application/octet-stream) ou un formulaire multipart/form-data")
+
+
+def not_ready(service):
+    """503 avec Retry-After tant que le modèle se charge, 500 (erreur du chargeur) s'il a échoué"""
+    status = service.loader.status()
+    if status['state'] == FAILED:
+        return JSONResponse(status, 500)
+    service.loader.prioritize()
+    return JSONResponse(status, 503, headers={'Retry-After': '1'})
+
+
+def create_app(service, max_body_bytes=None, max_images=None):
+    """Application ASGI de l'API autour d'un ClassificationService"""
+    max_body_bytes = max_body_bytes or config.API_MAX_BODY_BYTES
+    max_images = max_images or config.API_MAX_IMAGES
+
+    async def classify(request):
+        if service.get_scheduler() is None:
+            return not_ready(service)
+        images = await read_images(request, max_images, max_body_bytes)
+        if not images:
+            raise HTTPException(400, "Aucune image dans la requête")
+        items, latency = await service.classify(images)
+        status = 200 if any('predictions' in item for item in items) else 422
+        return JSONResponse({'results': items, 'latency_ms': latency * 1000}, status)
+
+    async def health(request):
+        if not service.loader.ready:
+            return not_ready(service)
+        return JSONResponse(service.loader.status())
+
+    async def stats(request):
+        return JSONResponse(service.stats())
+
+    async def http_error(request, exc):
+        return JSONResponse({'error': exc.detail}, exc.status_code, headers=exc.headers)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        service.close()
+
+    return Starlette(
+        routes=[
+            # Corps limité : 413 dès que le Content-Length annoncé ou les octets reçus dépassent la limite
+            Route('/classify', classify, methods=['POST'], max_body_size=max_body_bytes),
+            Route('/health', health),
+            Route('/stats', stats),
+        ],
+        exception_handlers={HTTPException: http_error},
+        lifespan=lifespan,
+    )
+
+
+def create_service():
+    """Service configuré comme l'application Streamlit (config.py / variables DERMAI_*)"""
+    cache = PredictionCache(
+        MODEL_PATH,
+        max_entries=config.PREDICTION_CACHE_SIZE,
+        cache_dir=config.PREDICTION_CACHE_DIR,
+        max_disk_entries=config.PREDICTION_CACHE_DISK_SIZE,
+        backend=config.INFERENCE_BACKEND,
+        artifact_path=served_artifact(),  # empreinte lue à la première clé, après l'export au chargement
+    )
+    log = None
+    if config.PREDICTION_LOG_PATH:
+        log = PredictionLog(config.PREDICTION_LOG_PATH, flush_interval=config.PREDICTION_LOG_FLUSH_SECONDS)
+    # Pas de première page à afficher : chargement immédiat
+    return ClassificationService(BackgroundLoader(build_model).start(), cache, log)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API HTTP locale de classification des lésions cutanées")
+    parser.add_argument('--host', default=config.API_HOST)
+    parser.add_argument('--port', type=int, default=config.API_PORT)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run(
+        create_app(create_service()),
+        host=args.host,
+        port=args.port,
+        timeout_keep_alive=config.API_KEEPALIVE_SECONDS,
+        limit_concurrency=config.API_MAX_CONCURRENCY,  # au-delà : 503 immédiat plutôt qu'une file sans fin
+        log_level='warning',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+"""Index inversé de l'Atlas : recherche par symptômes insensible aux accents, multi-termes et classée
+
+Syntaxe des requêtes : les termes sont combinés en ET ("rouge visage") ; `|` ou le mot « ou »
+sépare des alternatives ("bulles | squames"). Un terme correspond aussi aux mots qui commencent
+par lui ("rouge" → rougeurs), avec un poids moindre qu'une correspondance exacte. Un terme
+absent du vocabulaire est corrigé ("psoriasys" → psoriasis) par un index de trigrammes.
+"""
+import math
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+
+# Poids de chaque champ dans le score (le nom et les symptômes comptent le plus)
+FIELD_WEIGHTS = {'name': 3.0, 'symptoms': 2.0, 'description': 1.0, 'treatment': 0.5}
+PREFIX_WEIGHT = 0.5  # facteur appliqué aux correspondances par préfixe
+MIN_PREFIX_LENGTH = 3
+FUZZY_WEIGHT = 0.4  # facteur appliqué aux corrections orthographiques
+SUGGESTIONS = 8  # complétions conservées par nœud du trie
+
+STOPWORDS = frozenset("""
+a au aux avec ce ces d dans de des du en et l la le les leur par pas pour qu que qui
+s sa se ses si son sur un une y
+""".split())
+OR_WORDS = frozenset({'ou', 'or'})
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Minuscules sans accents ni ligatures (« Démangeaisons » → « demangeaisons »)"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).replace('œ', 'oe')
+
+
+def stem(token):
+    """Racine légère : pluriels français en -s / -x"""
+    if len(token) > 3 and token[-1] in 'sx' and token[-2] not in 'su':
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Termes indexés d'un texte : élisions (l', d'), mots vides et pluriels retirés"""
+    return [stem(token) for token in _TOKEN.findall(normalize(text)) if token not in STOPWORDS]
+
+
+def parse_query(query):
+    """Groupes de termes (ET à l'intérieur d'un groupe, OU entre les groupes)"""
+    groups = []
+    for part in query.split('|'):
+        group = []
+        for token in _TOKEN.findall(normalize(part)):
+            if token in OR_WORDS:
+                groups.append(group)
+                group = []
+            elif token not in STOPWORDS:
+                group.append(stem(token))
+        groups.append(group)
+    return [group for group in groups if group]
+
+
+def max_edits(term):
+    """Distance d'édition tolérée : aucune sous 4 lettres, 1 jusqu'à 7, 2 au-delà"""
+    return 0 if len(term) < 4 else 1 if len(term) <= 7 else 2
+
+
+def trigrams(term):
+    """Trigrammes du terme encadré ("$$eczema$") : une édition en détruit au plus trois"""
+    padded = f"$${term}$"
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+def edit_distance(first, second, limit):
+    """Distance de Levenshtein, ou limit + 1 dès qu'elle dépasse `limit`
+
+    Algorithme bit-parallèle de Myers : une colonne de la matrice tient dans un entier,
+    soit quelques opérations par caractère de `second` au lieu d'une ligne complète.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    if not first:
+        return len(second)
+    masks = {}
+    for position, char in enumerate(first):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    full = (1 << len(first)) - 1
+    top = 1 << (len(first) - 1)
+    positive, negative, score = full, 0, len(first)
+    remaining = len(second)
+    for char in second:
+        remaining -= 1
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        up = negative | (~(horizontal | positive) & full)
+        down = positive & horizontal
+        if up & top:
+            score += 1
+        elif down & top:
+            score -= 1
+        if score - remaining > limit:
+            return limit + 1
+        up = ((up << 1) | 1) & full
+        down = (down << 1) & full
+        positive = down | (~(vertical | up) & full)
+        negative = up & vertical
+    return score if score <= limit else limit + 1
+
+
+class TrigramIndex:
+    """Correspondances approchées à distance d'édition bornée sur un vocabulaire
+
+    Les listes de trigrammes sont rangées par longueur de terme : une requête ne parcourt que
+    les termes de longueur compatible, puis ne vérifie la distance que pour ceux qui partagent
+    assez de trigrammes (lemme des q-grammes, sans faux négatif).
+    """
+
+    def __init__(self, vocabulary):
+        self.terms = list(vocabulary)
+        self.postings = {}
+        for term_id, term in enumerate(self.terms):
+            for gram in trigrams(term):
+                self.postings.setdefault((gram, len(term)), []).append(term_id)
+
+    def search(self, term, limit=None):
+        """Termes les plus proches à distance <= `limit` (max_edits par défaut) : [(terme, distance)]
+
+        Les distances sont essayées dans l'ordre (1 puis 2) : le filtre à 1 édition, bien plus
+        sélectif, suffit pour la plupart des fautes de frappe.
+        """
+        limit = max_edits(term) if limit is None else limit
+        grams = trigrams(term)
+        for edits in range(1, limit + 1):
+            matches = self._search(term, grams, edits)
+            if matches:
+                return matches
+        return []
+
+    def _search(self, term, grams, edits):
+        shared = Counter()
+        for length in range(len(term) - edits, len(term) + edits + 1):
+            for gram in grams:
+                shared.update(self.postings.get((gram, length), ()))
+        required = len(grams) - 3 * edits
+        matches = []
+        for term_id, count in shared.items():
+            if count >= required:
+                candidate = self.terms[term_id]
+                distance = edit_distance(term, candidate, edits)
+                if distance <= edits:
+                    matches.append((candidate, distance))
+        return sorted(matches, key=lambda match: (match[1], match[0]))
+
+
+class PrefixTrie:
+    """Trie des clés normalisées ; chaque nœud garde ses meilleures complétions
+
+    La complétion ne parcourt que les caractères du préfixe, quel que soit le vocabulaire.
+    """
+
+    def __init__(self, entries, limit=SUGGESTIONS):
+        self.limit = limit
+        self.root = ({}, [])
+        for key, display, weight in entries:
+            node = self.root
+            self._offer(node, display, weight)
+            for char in key:
+                node = node[0].setdefault(char, ({}, []))
+                self._offer(node, display, weight)
+
+    def _offer(self, node, display, weight):
+        best, entry = node[1], (-weight, display)
+        if len(best) >= self.limit and entry >= best[-1] or entry in best:
+            return
+        insort(best, entry)
+        del best[self.limit:]
+
+    def complete(self, prefix, limit=None):
+        """Complétions de `prefix` (déjà normalisé), de la plus fréquente à la moins fréquente"""
+        node = self.root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return [display for _, display in node[1][:limit]]
+
+
+def autocomplete_entries(documents):
+    """(clé normalisée, texte affiché, poids) : noms et symptômes entiers, mots de tous les champs"""
+    weights, displays = Counter(), {}
+
+    def add(phrase, display):
+        key = normalize(phrase)
+        if len(key) >= 2 and key not in STOPWORDS:
+            weights[key] += 1
+            displays.setdefault(key, display)
+
+    for name, info in documents.items():
+        for text in (name, *info.get('symptoms', ())):
+            add(text, text)
+        for text in (name, info.get('description', ''), info.get('treatment', ''), *info.get('symptoms', ())):
+            for word in _WORD.findall(text):
+                add(word, word.lower())
+    return [(key, displays[key], weight) for key, weight in weights.items()]
+
+
+class SearchIndex:
+    """Index inversé terme → {document: poids} construit une fois sur DISEASE_INFO
+
+    Le poids d'un document pour un terme est la somme des poids des champs qui le contiennent ;
+    le score d'une requête additionne poids × idf de chaque terme trouvé.
+    """
+
+    def __init__(self, documents):
+        self.names = list(documents)
+        self.display = {}
+        self._positions = {name: doc for doc, name in enumerate(self.names)}
+        self.postings = {}
+        self._symptom_terms = []
+        for doc, (name, info) in enumerate(documents.items()):
+            fields = {
+                'name': tokenize(name),
+                'symptoms': [term for symptom in info.get('symptoms', ()) for term in tokenize(symptom)],
+                'description': tokenize(info.get('description', '')),
+                'treatment': tokenize(info.get('treatment', '')),
+            }
+            for field, terms in fields.items():
+                for term in set(terms):
+                    weights = self.postings.setdefault(term, {})
+                    weights[doc] = weights.get(doc, 0.0) + FIELD_WEIGHTS[field]
+            for text in (name, info.get('description', ''), info.get('treatment', ''), *info.get('symptoms', ())):
+                for word in _WORD.findall(text):
+                    self.display.setdefault(stem(normalize(word)), word.lower())
+            self._symptom_terms.append([(symptom, set(tokenize(symptom))) for symptom in info.get('symptoms', ())])
+        self.vocabulary = sorted(self.postings)
+        count = len(self.names)
+        self.idf = {term: math.log(1.0 + count / len(weights)) for term, weights in self.postings.items()}
+        self.fuzzy = TrigramIndex(self.vocabulary)
+        self.trie = PrefixTrie(autocomplete_entries(documents))
+
+    def __len__(self):
+        return len(self.names)
+
+    def expand(self, term):
+        """Termes du vocabulaire correspondant à `term` : {terme: facteur}
+
+        Correspondance exacte (1), par préfixe (PREFIX_WEIGHT), ou à défaut correction
+        orthographique à la plus petite distance trouvée (FUZZY_WEIGHT).
+        """
+        matches = {term: 1.0} if term in self.postings else {}
+        for candidate in self._prefix_terms(term):
+            matches.setdefault(candidate, PREFIX_WEIGHT)
+        if not matches:
+            corrections = self.fuzzy.search(term)
+            best = corrections[0][1] if corrections else None
+            matches = {candidate: FUZZY_WEIGHT for candidate, distance in corrections if distance == best}
+        return matches
+
+    def corrected_query(self, query):
+        """Requête réécrite avec les corrections orthographiques, ou None si aucune n'a servi"""
+        words, changed = [], False
+        for group in parse_query(query):
+            for term in group:
+                if term in self.postings or next(self._prefix_terms(term), None) is not None:
+                    words.append(self.display.get(term, term))
+                    continue
+                corrections = self.fuzzy.search(term)
+                if corrections:
+                    words.append(self.display.get(corrections[0][0], corrections[0][0]))
+                    changed = True
+                else:
+                    words.append(term)
+        return ' '.join(words) if changed else None
+
+    def _prefix_terms(self, term):
+        if len(term) < MIN_PREFIX_LENGTH:
+            return
+        position = bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+            yield self.vocabulary[position]
+            position += 1
+
+    def autocomplete(self, text, limit=5):
+        """Suggestions pendant la saisie : phrases complètes, puis complétion du dernier mot"""
+        key = normalize(text).strip()
+        if not key:
+            return []
+        suggestions = self.trie.complete(key, limit)
+        head, _, last = text.rstrip().rpartition(' ')
+        if head and len(suggestions) < limit:
+            for completion in self.trie.complete(normalize(last), limit):
+                if ' ' not in completion:
+                    suggestion = f"{head} {completion.lower()}"
+                    if suggestion not in suggestions:
+                        suggestions.append(suggestion)
+        return suggestions[:limit]
+
+    def _term_scores(self, term):
+        scores = {}
+        for match, factor in self.expand(term).items():
+            idf = self.idf[match] * factor
+            for doc, weight in self.postings[match].items():
+                scores[doc] = max(scores.get(doc, 0.0), weight * idf)
+        return scores
+
+    def _group_scores(self, group):
+        scores = None
+        for term in group:
+            term_scores = self._term_scores(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: score + term_scores[doc] for doc, score in scores.items() if doc in term_scores}
+            if not scores:
+                return {}
+        return scores
+
+    def search(self, query, limit=None):
+        """Noms des maladies correspondant à `query`, du plus pertinent au moins pertinent, sans doublon"""
+        groups = parse_query(query)
+        if not groups:
+            return []
+        scores = {}
+        for group in groups:
+            for doc, score in self._group_scores(group).items():
+                scores[doc] = scores.get(doc, 0.0) + score
+        ranked = sorted(scores, key=lambda doc: (-scores[doc], doc))
+        return [self.names[doc] for doc in ranked[:limit]]
+
+    def matching_symptoms(self, name, query):
+        """Symptômes de `name` contenant un terme de la requête (mise en évidence dans l'Atlas)"""
+        doc = self._positions[name]
+        terms = {term for group in parse_query(query) for term in group}
+        return [
+            symptom for symptom, symptom_terms in self._symptom_terms[doc]
+            if any(candidate == term or (len(term) >= MIN_PREFIX_LENGTH and candidate.startswith(term))
+                   for term in terms for candidate in symptom_terms)
+        ]
@@ -0,0 +1,162 @@
+"""Classification en lot (sans interface) d'un dossier d'images ou d'un fichier manifeste
+
+Exemple:
+    python batch_classify.py images/ --output resultats.csv --batch-size 64
+    python batch_classify.py manifeste.txt --output resultats.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import config
+from decoding import decode_image
+from inference import MODEL_PATH, TOP_K, preprocess_uint8, results_from_top_k, top_k_batch
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def iter_image_paths(source):
+    """Chemins des images d'un dossier (récursif) ou d'un manifeste (un chemin par ligne)"""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield os.path.join(root, name)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(source))
+        with open(source, encoding='utf-8') as manifest:
+            for line in manifest:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                yield line if os.path.isabs(line) else os.path.join(base_dir, line)
+
+
+def load_image(path):
+    """Décodage et préprocessing d'une image (même traitement que l'interface)"""
+    return preprocess_uint8(decode_image(path, max_pixels=config.DECODE_MAX_PIXELS))[0]
+
+
+def iter_batches(paths, batch_size, workers=4, prefetch=2):
+    """Décode les images sur un pool de threads et produit des lots (chemins, tableau, erreurs)
+
+    Jusqu'à `prefetch` lots sont décodés à l'avance pendant que le modèle travaille.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        paths = iter(paths)
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < batch_size * (prefetch + 1):
+                path = next(paths, None)
+                if path is None:
+                    exhausted = True
+                    break
+                pending.append((path, pool.submit(load_image, path)))
+            if not pending:
+                return
+
+            batch_paths, arrays, errors = [], [], []
+            while pending and len(batch_paths) < batch_size:
+                path, future = pending.popleft()
+                try:
+                    arrays.append(future.result())
+                    batch_paths.append(path)
+                except Exception as exc:
+                    errors.append((path, str(exc)))
+            if batch_paths:
+                yield batch_paths, np.stack(arrays), errors
+            elif errors:
+                yield [], None, errors
+
+
+class ResultWriter:
+    """Écriture des résultats au fil de l'eau en CSV ou JSONL (selon l'extension)"""
+
+    def __init__(self, output, top_k=TOP_K):
+        self.top_k = top_k
+        self.jsonl = output.endswith('.jsonl')
+        self.file = sys.stdout if output == '-' else open(output, 'w', newline='', encoding='utf-8')
+        if not self.jsonl:
+            header = ['path', 'error']
+            for rank in range(1, top_k + 1):
+                header += [f'disease_{rank}', f'probability_{rank}']
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(header)
+
+    def write(self, path, results=None, error=None):
+        if self.jsonl:
+            row = {'path': path, 'predictions': results or []}
+            if error:
+                row['error'] = error
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        else:
+            row = [path, error or '']
+            for result in (results or [])[:self.top_k]:
+                row += [result['disease'], f"{result['probability']:.6f}"]
+            self.csv.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+def classify(source, output, model_path=MODEL_PATH, batch_size=32, workers=4, top_k=TOP_K,
+             backend='keras', threads=None):
+    """Classifie toutes les images de `source` et retourne (nb images, nb erreurs, durée)"""
+    from serving import load_backend
+
+    model = load_backend(backend, model_path, threads)
+    writer = ResultWriter(output, top_k)
+    processed, failed = 0, 0
+    start = time.perf_counter()
+    try:
+        for paths, batch, errors in iter_batches(iter_image_paths(source), batch_size, workers):
+            for path, error in errors:
+                writer.write(path, error=error)
+                failed += 1
+            if batch is None:
+                continue
+            indices, probabilities = top_k_batch(model.predict(batch), top_k)
+            for path, row_indices, row_probabilities in zip(paths, indices, probabilities):
+                writer.write(path, results_from_top_k(row_indices, row_probabilities))
+            processed += len(paths)
+    finally:
+        writer.close()
+    return processed, failed, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Classification en lot des images de lésions cutanées")
+    parser.add_argument('source', help="Dossier d'images ou fichier manifeste (un chemin par ligne)")
+    parser.add_argument('--output', '-o', default='-', help="Fichier .csv ou .jsonl (défaut: CSV sur la sortie standard)")
+    parser.add_argument('--model', default=MODEL_PATH, help="Chemin du modèle Keras")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=4, help="Threads de décodage")
+    parser.add_argument('--top-k', type=int, default=TOP_K)
+    parser.add_argument('--backend', default='keras',
+                        choices=('keras', 'savedmodel', 'tflite-float32', 'tflite-float16', 'tflite-dynamic', 'tflite-int8'),
+                        help="Backend d'inférence")
+    parser.add_argument('--threads', type=int, default=None, help="Threads de l'interpréteur TFLite")
+    args = parser.parse_args(argv)
+
+    processed, failed, elapsed = classify(
+        args.source, args.output, args.model, args.batch_size, args.workers, args.top_k,
+        args.backend, args.threads
+    )
+    rate = processed / elapsed if elapsed > 0 else 0.0
+    print(f"{processed} images classées, {failed} erreurs en {elapsed:.2f}s ({rate:.1f} images/s)", file=sys.stderr)
+    return 1 if failed and not processed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
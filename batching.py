@@ -0,0 +1,178 @@
+"""Ordonnanceur de micro-lots : regroupe les images de toutes les sessions en une seule passe du modèle
+
+Simulation de charge pour régler la fenêtre d'attente:
+    python batching.py --clients 32 --requests 50 --max-wait-ms 10
+"""
+import argparse
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatchScheduler:
+    """File partagée vidée par un ou plusieurs threads en lots de `max_batch_size` images au plus
+
+    Un lot part dès qu'il est plein ou que la première image attend depuis `max_wait_ms`.
+    Chaque appelant récupère ses propres lignes de sortie via un Future. Avec `workers` > 1
+    (pool de processus), plusieurs lots peuvent être en cours d'exécution simultanément.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=10.0, stats_window=1000, workers=1):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._waits = deque(maxlen=stats_window)
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f'micro-batch-scheduler-{index}', daemon=True)
+            for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, images):
+        """Met en file un tableau (64, 64, 3) ou (N, 64, 64, 3) ; retourne un Future des probabilités"""
+        if self._closed:
+            raise RuntimeError("L'ordonnanceur est arrêté")
+        images = np.asarray(images)
+        if images.ndim == 3:
+            images = images[np.newaxis]
+        future = Future()
+        self._queue.put((images, future, time.perf_counter()))
+        return future
+
+    def predict(self, images, timeout=None):
+        """Même interface que ServingModel.predict, en passant par la file partagée"""
+        return self.submit(images).result(timeout)
+
+    __call__ = predict
+
+    def stats(self):
+        """Profondeur de file, histogramme des tailles de lot et attente en file (ms)"""
+        with self._lock:
+            histogram = dict(sorted(self._batch_sizes.items()))
+            waits = list(self._waits)
+        batches = sum(histogram.values())
+        images = sum(size * count for size, count in histogram.items())
+        stats = {
+            'queue_depth': self._queue.qsize(),
+            'batches': batches,
+            'images': images,
+            'mean_batch_size': images / batches if batches else 0.0,
+            'batch_size_histogram': histogram,
+        }
+        if waits:
+            p50, p95, p99 = np.percentile(waits, [50, 95, 99]) * 1000
+            stats.update({'wait_p50_ms': float(p50), 'wait_p95_ms': float(p95), 'wait_p99_ms': float(p99)})
+        return stats
+
+    def close(self, timeout=5.0):
+        """Arrête les threads après avoir traité les images déjà en file"""
+        self._closed = True
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            rows = len(item[0])
+            deadline = item[2] + self.max_wait
+            stop = False
+            while rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._execute(batch)
+            if stop:
+                return
+
+    def _execute(self, batch):
+        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        # Une passe par format d'entrée (uint8 brut / float normalisé, taille d'image)
+        groups = {}
+        for entry in batch:
+            groups.setdefault((entry[0].dtype, entry[0].shape[1:]), []).append(entry)
+
+        for group in groups.values():
+            try:
+                outputs = self.predict_fn(np.concatenate([images for images, _, _ in group]))
+            except Exception as exc:
+                for _, future, _ in group:
+                    future.set_exception(exc)
+                continue
+
+            offset = 0
+            for images, future, _ in group:
+                future.set_result(outputs[offset:offset + len(images)])
+                offset += len(images)
+
+            with self._lock:
+                self._batch_sizes[offset] += 1
+        with self._lock:
+            self._waits.extend(started - enqueued for _, _, enqueued in batch)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulation de sessions concurrentes sur l'ordonnanceur")
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=50, help="Requêtes par client")
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=10.0)
+    args = parser.parse_args(argv)
+
+    from serving import INPUT_SHAPE, load_serving_model
+
+    model = load_serving_model()
+    scheduler = MicroBatchScheduler(model.predict, args.max_batch_size, args.max_wait_ms)
+    image = np.random.rand(1, *INPUT_SHAPE[1:]).astype(np.float32)
+    latencies = []
+
+    def client():
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            scheduler.predict(image)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    scheduler.close()
+
+    stats = scheduler.stats()
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    print(f"{len(latencies)} requêtes en {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s), "
+          f"latence p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+    print(f"taille moyenne de lot {stats['mean_batch_size']:.1f}, attente p95 {stats.get('wait_p95_ms', 0):.1f} ms")
+    print(f"histogramme des lots: {stats['batch_size_histogram']}")
+
+
+if __name__ == '__main__':
+    main()
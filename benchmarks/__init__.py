@@ -0,0 +1,4 @@
+"""Benchmarks hors ligne de DermAI (exécuter depuis la racine : python -m benchmarks.<module>)
+
+benchmarks.suite regroupe les mesures principales, avec historique et détection des régressions.
+"""
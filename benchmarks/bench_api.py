@@ -0,0 +1,174 @@
+"""Test de charge de l'API HTTP locale (api_server.py) : requêtes par seconde et latences
+
+    python -m benchmarks.bench_api --spawn --concurrency 16 --requests 400
+    python -m benchmarks.bench_api --url http://127.0.0.1:8502 --images-per-request 4
+
+Chaque client garde sa connexion ouverte (keep-alive) sauf avec --no-keepalive. Les images sont
+des JPEG aléatoires distincts (--distinct) pour que le cache de prédictions ne réponde pas à
+tout. Code de sortie non nul en cas d'erreur HTTP ou si le débit est sous --min-rps.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from benchmarks.common import synthetic_jpegs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def multipart_body(images):
+    """Corps multipart/form-data avec un champ fichier par image"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for index, data in enumerate(images):
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="image"; filename="image-{index}.jpg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n'.encode() + data + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def wait_ready(host, port, timeout):
+    """Attend que /health réponde 200 (modèle chargé)"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection(host, port, timeout=5)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def get_json(host, port, path):
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    connection.request('GET', path)
+    return json.loads(connection.getresponse().read())
+
+
+def run(host, port, payloads, concurrency, requests, keepalive):
+    """Lance `concurrency` clients ; retourne (latences en s, statuts en erreur, connexions, durée)"""
+    latencies, errors = [], []
+    connections = [0]
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client():
+        connection = None
+        for index in counter:
+            body, content_type = payloads[index % len(payloads)]
+            if connection is None:
+                connection = http.client.HTTPConnection(host, port, timeout=60)
+                with lock:
+                    connections[0] += 1
+            start = time.perf_counter()
+            try:
+                connection.request('POST', '/classify', body, {'Content-Type': content_type})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as exc:
+                status = repr(exc)
+                connection.close()
+                connection = None
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if status != 200:
+                    errors.append(status)
+            if not keepalive and connection is not None:
+                connection.close()
+                connection = None
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, connections[0], time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8502')
+    parser.add_argument('--spawn', action='store_true', help="Démarre api_server.py pour la durée du test")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--images-per-request', type=int, default=1)
+    parser.add_argument('--distinct', type=int, default=512, help="Images différentes envoyées (au-delà : cache)")
+    parser.add_argument('--no-keepalive', action='store_true', help="Nouvelle connexion par requête")
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--min-rps', type=float, default=0.0)
+    parser.add_argument('--ready-timeout', type=float, default=180.0)
+    args = parser.parse_args(argv)
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    server = None
+    if args.spawn:
+        env = dict(os.environ, DERMAI_API_HOST=host, DERMAI_API_PORT=str(port))
+        env.setdefault('DERMAI_PREDICTION_LOG', '')  # ne pas remplir le journal réel
+        server = subprocess.Popen([sys.executable, 'api_server.py'], cwd=ROOT, env=env)
+    try:
+        if not wait_ready(host, port, args.ready_timeout):
+            print(f"ÉCHEC: API non disponible sur {args.url}", file=sys.stderr)
+            return 1
+
+        images = synthetic_jpegs(args.distinct + args.warmup)
+        warmup, images = images[args.distinct:], images[:args.distinct]
+        per_request = args.images_per_request
+        if per_request == 1:
+            payloads = [(data, 'image/jpeg') for data in images]
+        else:
+            payloads = [multipart_body([images[(start + offset) % len(images)] for offset in range(per_request)])
+                        for start in range(0, len(images), per_request)]
+        run(host, port, [(data, 'image/jpeg') for data in warmup], args.concurrency, args.warmup, True)
+        before = get_json(host, port, '/stats')['scheduler']
+
+        latencies, errors, connections, elapsed = run(
+            host, port, payloads, args.concurrency, args.requests, not args.no_keepalive
+        )
+        after = get_json(host, port, '/stats')['scheduler']
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(30)
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    rps = len(latencies) / elapsed
+    batches = after['batches'] - before['batches']
+    batched_images = after['images'] - before['images']
+    print(f"{len(latencies)} requêtes ({per_request} image(s) chacune), {args.concurrency} clients, "
+          f"{connections} connexions {'(keep-alive)' if not args.no_keepalive else '(une par requête)'}")
+    print(f"{rps:.1f} req/s ({rps * per_request:.1f} images/s) ; latence p50 {p50:.1f} ms, "
+          f"p95 {p95:.1f} ms, p99 {p99:.1f} ms ; {len(errors)} erreurs")
+    if batches:
+        print(f"{batched_images} images inférées en {batches} passes du modèle "
+              f"(lot moyen {batched_images / batches:.1f})")
+
+    failures = []
+    if errors:
+        failures.append(f"{len(errors)} requêtes en erreur (ex. {errors[0]})")
+    if rps < args.min_rps:
+        failures.append(f"{rps:.1f} req/s, sous le minimum de {args.min_rps}")
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
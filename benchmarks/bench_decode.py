@@ -0,0 +1,96 @@
+"""Décodage d'images volumineuses : chemin historique (décodage pleine résolution) contre decode_image
+
+    python -m benchmarks.bench_decode --megapixels 12 24 --repeat 5
+"""
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from decoding import decode_image
+from inference import preprocess_image
+
+
+def make_photo(path, megapixels, seed=0):
+    """Photo synthétique 4:3 (dégradé + bruit) enregistrée en JPEG qualité 90"""
+    width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(80, 200, width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    pixels = np.broadcast_to(gradient, (height, width, 3)) + rng.normal(0, 12, (height, width, 3))
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path, 'JPEG', quality=90)
+    return width, height
+
+
+def legacy_path(path):
+    """Ancien code : Image.open puis preprocess_image sur l'image pleine résolution"""
+    with Image.open(path) as image:
+        image.load()
+        return preprocess_image(image)
+
+
+def fast_path(path):
+    return preprocess_image(decode_image(path))
+
+
+PATHS = {'historique': legacy_path, 'decode_image': fast_path}
+
+
+def peak_rss_kb():
+    """Pic de mémoire résidente du processus (VmHWM sous Linux, sinon ru_maxrss)"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(name, path, repeat, results):
+    """Exécuté dans un processus neuf pour isoler le pic mémoire"""
+    function = PATHS[name]
+    baseline_kb = peak_rss_kb()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(path)
+        timings.append(time.perf_counter() - start)
+    peak_kb = peak_rss_kb()
+    results.put((float(np.median(timings)), (peak_kb - baseline_kb) / 1024))
+
+
+def measure(name, path, repeat):
+    context = mp.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_measure, args=(name, path, repeat, results))
+    process.start()
+    outcome = results.get()
+    process.join()
+    return outcome
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megapixels', type=float, nargs='+', default=[12.0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'image':<16} {'chemin':<14} {'médiane ms':>10} {'pic mémoire Mo':>15}")
+        for megapixels in args.megapixels:
+            path = os.path.join(directory, f"photo_{megapixels:g}mp.jpg")
+            width, height = make_photo(path, megapixels)
+            for name in PATHS:
+                seconds, peak_mb = measure(name, path, args.repeat)
+                print(f"{f'{width}x{height}':<16} {name:<14} {seconds * 1000:>10.1f} {peak_mb:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
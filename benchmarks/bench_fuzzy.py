@@ -0,0 +1,97 @@
+"""Correction orthographique et autocomplétion de l'Atlas sur des vocabulaires synthétiques
+
+    python -m benchmarks.bench_fuzzy --terms 1000 10000 50000 [--budget-ms 1.0]
+Compare l'index de trigrammes à un parcours exhaustif (Levenshtein sur tout le vocabulaire).
+Code de sortie non nul si le p99 d'une requête approchée ou d'une complétion dépasse le budget.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from atlas_search import PrefixTrie, TrigramIndex, edit_distance, max_edits, normalize
+from disease_info import DISEASE_INFO
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def synthetic_vocabulary(size, seed=0):
+    """Mots de DISEASE_INFO complétés par des mots inventés de 4 à 14 lettres"""
+    rng = np.random.default_rng(seed)
+    words = {normalize(word) for info in DISEASE_INFO.values()
+             for text in (info['description'], *info['symptoms']) for word in text.split()}
+    syllables = ['der', 'ma', 'to', 'se', 'ker', 'a', 'ti', 'lo', 'pa', 'pu', 'le', 've', 'si', 'cu', 'ri']
+    while len(words) < size:
+        word = ''.join(rng.choice(syllables, size=rng.integers(2, 6)))
+        if len(word) >= 4:
+            words.add(word)
+    return sorted(words)[:size]
+
+
+def misspell(word, rng):
+    """Une faute de frappe : substitution, suppression ou insertion d'une lettre"""
+    position = int(rng.integers(0, len(word)))
+    letter = LETTERS[int(rng.integers(0, len(LETTERS)))]
+    kind = int(rng.integers(0, 3))
+    if kind == 0:
+        return word[:position] + letter + word[position + 1:]
+    if kind == 1:
+        return word[:position] + word[position + 1:]
+    return word[:position] + letter + word[position:]
+
+
+def brute_force(vocabulary, term):
+    limit = max_edits(term)
+    return [candidate for candidate in vocabulary if edit_distance(term, candidate, limit) <= limit]
+
+
+def percentiles(function, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        function(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 99])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--terms', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--budget-ms', type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'termes':>7} {'index ms':>9} {'opération':<14} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in args.terms:
+        rng = np.random.default_rng(size)
+        vocabulary = synthetic_vocabulary(size)
+        targets = [vocabulary[index] for index in rng.integers(0, len(vocabulary), args.queries)]
+        typos = [misspell(word, rng) for word in targets]
+        prefixes = [word[:int(rng.integers(2, len(word) + 1))] for word in targets]
+
+        start = time.perf_counter()
+        fuzzy = TrigramIndex(vocabulary)
+        trie = PrefixTrie((word, word, 1) for word in vocabulary)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        found = np.mean([any(match == target for match, _ in fuzzy.search(typo))
+                         for typo, target in zip(typos, targets) if max_edits(typo)])
+        rows = [('trigrammes', fuzzy.search, typos), ('exhaustif', lambda term: brute_force(vocabulary, term),
+                                                     typos[:max(1, args.queries // 10)]),
+                ('complétion', trie.complete, prefixes)]
+        for name, function, queries in rows:
+            p50, p99 = percentiles(function, queries)
+            print(f"{size:>7} {build_ms:>9.0f} {name:<14} {p50:>8.3f} {p99:>8.3f}")
+            if name != 'exhaustif' and p99 > args.budget_ms:
+                failures.append(f"{size} termes, {name}: p99 {p99:.3f} ms au-delà de {args.budget_ms} ms")
+        print(f"{'':>7} {'':>9} mot d'origine retrouvé pour {found:.0%} des fautes")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
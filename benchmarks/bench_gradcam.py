@@ -0,0 +1,59 @@
+"""Grad-CAM : latence ajoutée par rapport à la prédiction seule
+
+    python -m benchmarks.bench_gradcam --repeat 200 --batch-sizes 1 8
+
+Compare, sur les images d'assets/ préparées comme dans l'interface, la prédiction seule
+(ServingModel.predict), la passe partagée prédiction + Grad-CAM (GradCAM.explain) et ce que
+coûterait une explication séparée (prédiction puis explication). Code de sortie non nul si
+les probabilités de la passe partagée diffèrent de la prédiction seule.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import asset_images, median_ms
+from inference import preprocess_tta, preprocess_uint8
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8],
+                        help="1 : image seule ; 8 : vues TTA d'une image")
+    args = parser.parse_args(argv)
+
+    from gradcam import explainer_for
+    from model_loader import build_model
+
+    model = build_model(lambda fraction, message: None)
+    images = asset_images(extensions=('.jpg',))
+    start = time.perf_counter()
+    explainer = explainer_for(model)
+    explainer.explain(preprocess_uint8(images[0]))
+    print(f"Grad-CAM prêt en {time.perf_counter() - start:.2f}s (couche {explainer.layer})")
+
+    failures = []
+    print(f"\n{'lot':>4} {'prédiction (ms)':>16} {'+ Grad-CAM (ms)':>16} {'ajout':>8} {'2 passes (ms)':>14}")
+    for batch_size in args.batch_sizes:
+        batches = [preprocess_tta(image, batch_size) if batch_size > 1 else preprocess_uint8(image)
+                   for image in images]
+        for batch in batches:
+            probabilities, cams = explainer.explain(batch)
+            if not np.allclose(probabilities, model.predict(batch), atol=1e-5):
+                failures.append(f"lot de {batch_size} : probabilités de la passe Grad-CAM différentes")
+                break
+        cycle = iter(np.resize(np.arange(len(batches)), args.repeat * 2 + 6))
+        predict = median_ms(lambda: model.predict(batches[next(cycle)]), args.repeat, warmup=3)
+        shared = median_ms(lambda: explainer.explain(batches[next(cycle)]), args.repeat, warmup=3)
+        print(f"{batch_size:>4} {predict:>16.2f} {shared:>16.2f} {shared / predict - 1:>+8.0%} "
+              f"{predict + shared:>14.2f}")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
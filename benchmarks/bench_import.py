@@ -0,0 +1,95 @@
+"""Temps d'import de my_app (style python -X importtime) et premier rendu de la page de connexion
+
+    python -m benchmarks.bench_import [--budget-ms 1000]
+Code de sortie non nul si un module lourd est importé au démarrage ou si le budget est dépassé.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Modules qui ne doivent être importés que par les pages qui en ont besoin
+HEAVY_MODULES = ('tensorflow', 'keras', 'plotly', 'pandas', 'streamlit_carousel')
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+LOGIN_SCRIPT = '''
+import time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout=120)
+start = time.perf_counter()
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+'''
+
+
+def import_report(module='my_app'):
+    """Imports directs de `module` ({nom: temps cumulé en µs}), son temps total et tous les modules chargés"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, 'TF_CPP_MIN_LOG_LEVEL': '3'},
+    )
+    # -X importtime affiche les enfants (indentation 3) avant leur parent (indentation 1)
+    children, pending, total, imported = {}, {}, 0, set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        imported.add(name)
+        if indent == 3:
+            pending[name] = cumulative
+        elif indent == 1:
+            if name == module:
+                children, total = pending, cumulative
+            pending = {}
+    return children, total, imported
+
+
+def login_first_paint():
+    """Durée du premier rendu de login_page dans un processus neuf (exécution du script comprise),
+    et durée totale du processus"""
+    script = LOGIN_SCRIPT.format(path=os.path.join(ROOT, 'my_app.py'))
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return float(result.stdout.strip().splitlines()[-1]), time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=1000.0,
+                        help="Budget du premier rendu de la page de connexion (processus à froid)")
+    parser.add_argument('--top', type=int, default=12)
+    args = parser.parse_args(argv)
+
+    modules, total, imported = import_report()
+    print(f"import my_app: {total / 1000:.0f} ms, dont:")
+    for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    # Streamlit charge lui-même quelques sous-modules (plotly.graph_objects paresseux) : on les ignore
+    _, _, streamlit_imports = import_report('streamlit')
+    heavy = sorted({name.split('.')[0] for name in imported - streamlit_imports
+                    if name.split('.')[0] in HEAVY_MODULES})
+    if heavy:
+        failures.append(f"modules lourds importés au démarrage: {', '.join(heavy)}")
+
+    render_seconds, process_seconds = login_first_paint()
+    print(f"page de connexion: rendu {render_seconds * 1000:.0f} ms "
+          f"(processus complet {process_seconds * 1000:.0f} ms)")
+    if render_seconds * 1000 > args.budget_ms:
+        failures.append(f"premier rendu au-delà du budget de {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
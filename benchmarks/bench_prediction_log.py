@@ -0,0 +1,91 @@
+"""Journal des prédictions : débit d'écriture et latence des requêtes de statistiques
+
+    python -m benchmarks.bench_prediction_log --rows 1000000 [--budget-ms 5]
+Compare les lectures sur les tables d'agrégats aux mêmes requêtes calculées sur le journal brut.
+Code de sortie non nul si le p99 d'une requête sur les agrégats dépasse le budget.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from prediction_log import PredictionLog, generate
+
+# Mêmes statistiques recalculées par parcours de la table `predictions`
+SCAN_QUERIES = {
+    'totals': 'SELECT COUNT(*), SUM(cached), AVG(latency_ms) FROM predictions',
+    'daily': 'SELECT day, COUNT(*), AVG(latency_ms), MAX(latency_ms) FROM predictions '
+             'GROUP BY day ORDER BY day DESC LIMIT 30',
+    'class_counts': 'SELECT top_class, COUNT(*) FROM predictions GROUP BY top_class',
+    'latency_percentiles': 'SELECT latency_ms FROM predictions ORDER BY latency_ms',
+}
+
+
+def timed(function, repeat):
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 99])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--scan-repeat', type=int, default=3)
+    parser.add_argument('--budget-ms', type=float, default=5.0)
+    args = parser.parse_args(argv)
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        log = PredictionLog(os.path.join(directory, 'predictions.sqlite3'))
+
+        # Coût d'un appel record() sur le chemin de la requête
+        probabilities = np.array([0.6, 0.2, 0.1, 0.05, 0.05], dtype=np.float32)
+        start = time.perf_counter()
+        for _ in range(10_000):
+            log.record('0' * 16, [1, 2, 3, 4, 5], probabilities, 40.0, user='bench')
+        record_us = (time.perf_counter() - start) / 10_000 * 1e6
+        log.flush()
+
+        start = time.perf_counter()
+        generate(log, args.rows, args.days)
+        elapsed = time.perf_counter() - start
+        print(f"record(): {record_us:.1f} µs par appel ; {args.rows:,} analyses écrites en {elapsed:.1f}s "
+              f"({args.rows / elapsed:,.0f}/s), {log.dropped} perdues")
+        print(f"taille de la base: {os.path.getsize(log.path) / 2**20:.0f} Mo")
+
+        queries = {
+            'totals': log.totals,
+            'daily': lambda: log.daily(30),
+            'class_counts': log.class_counts,
+            'latency_percentiles': log.latency_percentiles,
+            'recent': lambda: log.recent(20),
+        }
+        connection = log._connect()
+        print(f"{'requête':<20} {'agrégats p50':>12} {'p99 ms':>8} {'journal brut p50':>17}")
+        for name, query in queries.items():
+            p50, p99 = timed(query, args.repeat)
+            scan = ''
+            if name in SCAN_QUERIES:
+                scan_p50, _ = timed(lambda: connection.execute(SCAN_QUERIES[name]).fetchall(), args.scan_repeat)
+                scan = f"{scan_p50:.1f}"
+            print(f"{name:<20} {p50:>12.3f} {p99:>8.3f} {scan:>17}")
+            if p99 > args.budget_ms:
+                failures.append(f"{name}: p99 {p99:.3f} ms au-delà du budget de {args.budget_ms} ms")
+        connection.close()
+        log.close()
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
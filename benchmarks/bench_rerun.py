@@ -0,0 +1,65 @@
+"""Durée d'un rerun du panneau de résultats de classification_page (AppTest, sans navigateur)
+
+    python -m benchmarks.bench_rerun --reruns 20
+Modes : figures Plotly reconstruites à chaque rerun (ancien comportement), figures mémoïsées
+par charts, et graphiques légers natifs.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ('plotly sans cache', 'plotly mémoïsé', 'léger')
+RESULTS = [
+    {'disease': 'Eczema', 'probability': 0.62, 'confidence': 62.0},
+    {'disease': 'Psoriasis', 'probability': 0.21, 'confidence': 21.0},
+    {'disease': 'Tinea', 'probability': 0.09, 'confidence': 9.0},
+    {'disease': 'Lichen', 'probability': 0.05, 'confidence': 5.0},
+    {'disease': 'Rosacea', 'probability': 0.03, 'confidence': 3.0},
+]
+
+
+def results_panel(root, mode, results):
+    """Script exécuté par AppTest : le panneau de droite de classification_page"""
+    import sys
+    sys.path.insert(0, root)
+    import streamlit as st
+    import charts
+    from my_app import display_prediction_results
+
+    if mode == 'plotly sans cache':
+        charts.cache_clear()
+    st.session_state['light_mode'] = mode == 'léger'
+    display_prediction_results(results)
+
+
+def rerun_ms(mode, reruns):
+    app = AppTest.from_function(results_panel, args=(ROOT, mode, RESULTS), default_timeout=60)
+    app.run()  # premier rendu : imports et construction initiale
+    assert not app.exception, app.exception
+    latencies = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 95])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('DERMAI_PRELOAD_MODEL', '0')
+    os.environ.setdefault('DERMAI_PREDICTION_LOG', '')
+    print(f"{'mode':<20} {'rerun p50 ms':>12} {'p95 ms':>8}")
+    for mode in MODES:
+        p50, p95 = rerun_ms(mode, args.reruns)
+        print(f"{mode:<20} {p50:>12.1f} {p95:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Screening en flux : débit, retard, contre-pression et reprise après arrêt brutal
+
+    python -m benchmarks.bench_screening --images 2000 --max-in-flight 64
+
+Les images sont déposées dans un dossier temporaire ; le service est interrompu en cours de
+route (arrêt brutal simulé par annulation), puis relancé jusqu'à ce qu'inbox/ soit vide.
+Code de sortie non nul si une image manque, est journalisée deux fois, si une image déjà
+terminée avant l'arrêt est reclassée, si une image redéposée sous un nom déjà traité écrase
+la première ou si plus de `max_in_flight` images ont été réclamées.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.common import synthetic_jpegs
+from screening import ScreeningService, claimed_name, original_name
+
+DONE_BEFORE_CRASH = 'deja-traitee.jpg'
+
+
+class CountingLog:
+    """Remplace PredictionLog : compte les analyses journalisées par hash de contenu"""
+
+    def __init__(self):
+        self.records = Counter()
+
+    def record(self, content_hash, *args, **kwargs):
+        self.records[content_hash] += 1
+
+
+def deposit(inbox, images, prefix):
+    """Dépôt comme le ferait un export : écriture sous .part puis renommage"""
+    for index, data in enumerate(images):
+        path = os.path.join(inbox, f"{prefix}-{index:06d}.jpg")
+        with open(f"{path}.part", 'wb') as output:
+            output.write(data)
+        os.replace(f"{path}.part", path)
+
+
+async def run_until(service, stop_after, samples):
+    """Lance le service et l'annule après `stop_after` images traitées (None : jusqu'au bout)"""
+    task = asyncio.create_task(service.run(once=stop_after is None))
+    while not task.done():
+        samples.append(service.in_flight)
+        if stop_after is not None and service.processed >= stop_after:
+            task.cancel()
+            break
+        await asyncio.sleep(0.005)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--decode-threads', type=int, default=4)
+    parser.add_argument('--max-in-flight', type=int, default=64)
+    args = parser.parse_args(argv)
+
+    from model_loader import build_model
+
+    model = build_model(lambda fraction, message: None)
+    images = synthetic_jpegs(args.images + 1, seed=1)
+    redeposited = images.pop()
+    failures = []
+    with tempfile.TemporaryDirectory() as root:
+        log = CountingLog()
+        options = dict(batch_size=args.batch_size, decode_threads=args.decode_threads,
+                       max_in_flight=args.max_in_flight, poll_interval=0.05, settle_seconds=0.0,
+                       log=log, metrics_interval=3600)
+        first = ScreeningService(model, root, **options)
+        deposit(first.dirs['inbox'], images, 'lot')
+        with open(os.path.join(first.dirs['inbox'], 'corrompue.jpg'), 'wb') as output:
+            output.write(b'pas une image')
+        # Image dont le résultat était écrit au moment de l'arrêt, mais pas encore déplacée
+        done_before_crash = claimed_name(DONE_BEFORE_CRASH)
+        with open(os.path.join(first.dirs['work'], done_before_crash), 'wb') as output:
+            output.write(images[0])
+        with open(os.path.join(first.dirs['results'], f"{done_before_crash}.json"), 'w') as output:
+            json.dump({'name': DONE_BEFORE_CRASH, 'predictions': [], 'marker': True}, output)
+
+        samples = []
+        start = time.perf_counter()
+        asyncio.run(run_until(first, args.images // 2, samples))
+        interrupted = {name for name in os.listdir(first.dirs['work'])}
+        # Nouvelle image déposée sous le nom d'une image déjà traitée
+        deposit(first.dirs['inbox'], [redeposited], 'lot')
+        second = ScreeningService(model, root, **options)
+        asyncio.run(run_until(second, None, samples))
+        elapsed = time.perf_counter() - start
+        metrics = second.metrics()
+
+        processed = first.processed + second.processed
+        print(f"{processed} images classées en {elapsed:.1f}s ({processed / elapsed:.1f} images/s), "
+              f"lot moyen {processed / max(first.batches + second.batches, 1):.1f}")
+        print(f"retard dépôt → résultat (2e passe) p50 {metrics.get('lag_p50_seconds', 0):.2f}s, "
+              f"p95 {metrics.get('lag_p95_seconds', 0):.2f}s ; réclamées simultanément au plus "
+              f"{max(samples)} (limite {args.max_in_flight})")
+        print(f"arrêt après {first.processed} images, {len(interrupted)} en cours reprises "
+              f"({second.recovered} remises en file ou terminées au redémarrage)")
+
+        done = Counter(original_name(name) for name in os.listdir(second.dirs['done']))
+        expected = Counter(f"lot-{index:06d}.jpg" for index in range(args.images))
+        expected.update([DONE_BEFORE_CRASH, 'lot-000000.jpg'])
+        if done != expected:
+            failures.append(f"{sum((expected - done).values())} images manquantes dans done/")
+        if len(os.listdir(second.dirs['results'])) != sum(expected.values()) + 1:
+            failures.append("résultats manquants ou écrasés dans results/")
+        if os.listdir(second.dirs['inbox']) or os.listdir(second.dirs['work']):
+            failures.append("inbox/ ou work/ non vide à la fin")
+        if [original_name(name) for name in os.listdir(second.dirs['failed'])] != ['corrompue.jpg']:
+            failures.append("l'image corrompue n'est pas dans failed/")
+        duplicates = [key for key, count in log.records.items() if count > 1]
+        # Les JPEG aléatoires sont distincts, sauf DONE_BEFORE_CRASH, copie de la première image
+        if duplicates or sum(log.records.values()) != args.images + 1:
+            failures.append(f"{sum(log.records.values())} analyses journalisées pour {args.images + 1} images")
+        with open(os.path.join(second.dirs['results'], f"{done_before_crash}.json")) as handle:
+            if not json.load(handle).get('marker'):
+                failures.append("image terminée avant l'arrêt reclassée")
+        if max(samples) > args.max_in_flight:
+            failures.append(f"{max(samples)} images réclamées, au-delà de {args.max_in_flight}")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
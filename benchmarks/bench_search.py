@@ -0,0 +1,103 @@
+"""Recherche de l'Atlas : parcours linéaire historique contre index inversé, sur une base synthétique
+
+    python -m benchmarks.bench_search --conditions 22 1000 5000 [--budget-ms 1.0]
+Code de sortie non nul si le p99 d'une requête indexée dépasse le budget.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from atlas_search import SearchIndex
+from disease_info import DISEASE_INFO
+
+QUERIES = ['demangeaisons', 'rouge visage', 'plaques rouges', 'bulles | squames', 'taches brunes',
+           'Démangeaisons intenses', 'eruption ou ulceres', 'croissance lente masse']
+
+
+def linear_search(documents, query):
+    """Ancienne recherche : sous-chaîne contiguë, sensible aux accents, doublons possibles"""
+    query = query.lower()
+    matches = []
+    for disease, info in documents.items():
+        if query in disease.lower() or query in info['description'].lower():
+            matches.append(disease)
+            continue
+        for symptom in info['symptoms']:
+            if query in symptom.lower():
+                matches.append(disease)
+                break
+        if query in info['treatment'].lower():
+            matches.append(disease)
+    return matches
+
+
+def synthetic_knowledge_base(size, seed=0):
+    """`size` fiches recombinant les mots de DISEASE_INFO et des termes médicaux inventés"""
+    rng = np.random.default_rng(seed)
+    words = sorted({word for info in DISEASE_INFO.values()
+                    for text in (info['description'], info['treatment'], *info['symptoms'])
+                    for word in text.split()})
+    syllables = ['der', 'ma', 'to', 'se', 'ker', 'a', 'ti', 'lo', 'pa', 'pu', 'le', 'vé', 'si', 'cu']
+    words += [''.join(rng.choice(syllables, size=rng.integers(2, 5))) for _ in range(size * 2)]
+    templates = list(DISEASE_INFO.values())
+
+    def sentence(count):
+        return ' '.join(rng.choice(words, size=count))
+
+    documents = {}
+    for index in range(size):
+        template = templates[index % len(templates)]
+        name = list(DISEASE_INFO)[index % len(DISEASE_INFO)] + (f' {index}' if index >= len(DISEASE_INFO) else '')
+        documents[name] = {
+            'description': template['description'] if index < len(DISEASE_INFO) else sentence(10),
+            'symptoms': template['symptoms'] if index < len(DISEASE_INFO) else
+            [sentence(int(rng.integers(1, 4))) for _ in range(int(rng.integers(2, 6)))],
+            'treatment': template['treatment'] if index < len(DISEASE_INFO) else sentence(6),
+        }
+    return documents
+
+
+def time_queries(search, queries, repeat):
+    """Latences (ms) de chaque exécution de chaque requête"""
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--conditions', type=int, nargs='+', default=[22, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--budget-ms', type=float, default=1.0, help="Budget p99 d'une requête indexée")
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'fiches':>7} {'termes':>7} {'index ms':>9} {'chemin':<8} {'p50 ms':>8} {'p99 ms':>8} {'résultats':>9}")
+    for size in args.conditions:
+        documents = synthetic_knowledge_base(size)
+        start = time.perf_counter()
+        index = SearchIndex(documents)
+        build_ms = (time.perf_counter() - start) * 1000
+        for name, search in (('linéaire', lambda query: linear_search(documents, query)),
+                             ('index', index.search)):
+            latencies = time_queries(search, QUERIES, args.repeat)
+            p50, p99 = np.percentile(latencies, [50, 99])
+            hits = sum(len(search(query)) for query in QUERIES)
+            print(f"{size:>7} {len(index.vocabulary):>7} {build_ms:>9.1f} {name:<8} "
+                  f"{p50:>8.3f} {p99:>8.3f} {hits:>9}")
+            if name == 'index' and p99 > args.budget_ms:
+                failures.append(f"{size} fiches: p99 {p99:.3f} ms au-delà du budget de {args.budget_ms} ms")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
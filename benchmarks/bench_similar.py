@@ -0,0 +1,103 @@
+"""Recherche de cas similaires : latence d'une requête sur 10k et 1M vecteurs synthétiques
+
+    python -m benchmarks.bench_similar --sizes 10000 1000000 --queries 200 --nprobe 4 16 64
+
+Vecteurs de dimension 32 (celle de dense_19) tirés autour de centres aléatoires, écrits comme
+un vrai index (matrice .npy mappée + métadonnées) puis rouverts par CaseIndex.load. Latence
+de la recherche exacte et de l'IVF selon nprobe, avec le rappel des k voisins exacts.
+Code de sortie non nul si la recherche exacte diffère d'un tri complet ou si le rappel IVF au
+plus grand nprobe est sous `--min-recall`.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from similar_cases import CaseIndex, normalize, write_index
+
+DIM = 32
+
+
+def synthetic_vectors(count, clusters=1000, seed=0, chunk=100_000):
+    """Vecteurs normalisés groupés autour de `clusters` centres (comme des classes de lésions)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, DIM)).astype(np.float32)
+    vectors = np.empty((count, DIM), dtype=np.float32)
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        vectors[start:start + size] = normalize(
+            centers[rng.integers(0, clusters, size)] + rng.normal(0, 0.5, (size, DIM)).astype(np.float32))
+    return vectors
+
+
+def latencies_ms(index, queries, k, nprobe=None):
+    index.search(queries[0], k, nprobe)
+    timings = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        indices, _ = index.search(query, k, nprobe)
+        timings.append(time.perf_counter() - start)
+        results.append(indices)
+    return np.percentile(timings, [50, 95]) * 1000, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[4, 16, 64])
+    parser.add_argument('--min-recall', type=float, default=0.9)
+    args = parser.parse_args(argv)
+
+    failures = []
+    for size in args.sizes:
+        vectors = synthetic_vectors(size)
+        rng = np.random.default_rng(1)
+        queries = normalize(vectors[rng.integers(0, size, args.queries)]
+                            + rng.normal(0, 0.2, (args.queries, DIM)).astype(np.float32))
+        lists = int(4 * np.sqrt(size))
+        cases = [{'path': f'cas-{index}.jpg', 'label': None} for index in range(size)]
+        with tempfile.TemporaryDirectory() as directory:
+            exact_dir, ivf_dir = os.path.join(directory, 'exact'), os.path.join(directory, 'ivf')
+            write_index(exact_dir, vectors, cases)
+            start = time.perf_counter()
+            write_index(ivf_dir, vectors, cases, ivf_lists=lists)
+            build_seconds = time.perf_counter() - start
+            exact, ivf = CaseIndex.load(exact_dir), CaseIndex.load(ivf_dir)
+            matrix_mb = os.path.getsize(os.path.join(exact_dir, 'embeddings.npy')) / 2**20
+
+            (p50, p95), truth = latencies_ms(exact, queries, args.k)
+            print(f"\n{size:,} vecteurs ({matrix_mb:.0f} Mo mappés), IVF {lists} listes construit en {build_seconds:.1f}s")
+            print(f"{'recherche':<16} {'p50 (ms)':>9} {'p95 (ms)':>9} {f'rappel@{args.k}':>10}")
+            print(f"{'exacte':<16} {p50:>9.2f} {p95:>9.2f} {1.0:>10.3f}")
+            for query, found in zip(queries[:20], truth):
+                expected = np.argsort(-(vectors @ query), kind='stable')[:args.k]
+                if not np.allclose(vectors[found] @ query, vectors[expected] @ query, atol=1e-5):
+                    failures.append(f"{size}: recherche exacte différente d'un tri complet")
+                    break
+
+            # Positions de l'index IVF → cas d'origine (les cas sont réordonnés par liste)
+            original = np.array([int(case['path'][4:-4]) for case in ivf.cases])
+            recall = 0.0
+            for nprobe in sorted(args.nprobe):
+                (p50, p95), found = latencies_ms(ivf, queries, args.k, nprobe)
+                recall = np.mean([len(set(original[approx]) & set(reference)) / args.k
+                                  for approx, reference in zip(found, truth)])
+                print(f"{f'IVF nprobe={nprobe}':<16} {p50:>9.2f} {p95:>9.2f} {recall:>10.3f}")
+            if recall < args.min_recall:
+                failures.append(f"{size}: rappel IVF {recall:.3f} à nprobe={max(args.nprobe)}, "
+                                f"minimum {args.min_recall}")
+            del exact, ivf
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Analyse par zones d'une photo de 12 Mpx : zones/s et mémoire
+
+    python -m benchmarks.bench_tiling --megapixels 12 --decode-size 2048 --repeat 5
+
+Compare la génération des fenêtres par vues NumPy à pas (tiling.tile_views, copie par lots)
+à un recadrage PIL par fenêtre, puis mesure l'analyse complète (tiling.analyze) avec le
+modèle configuré. Mémoire : pic des allocations Python/NumPy (tracemalloc) pendant l'analyse
+et mémoire résidente du processus. Code de sortie non nul si le pic dépasse `--max-memory-mb`.
+"""
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+import config
+from benchmarks.bench_decode import make_photo
+from decoding import decode_image
+from inference import IMAGE_SIZE
+from session_store import process_rss_bytes
+from tiling import TILE_BATCH_SIZE, analyze, scaled_grid, tile_views
+
+TILE = IMAGE_SIZE[0]
+
+
+def strided_batches(image, scales, overlap, batch_size=TILE_BATCH_SIZE):
+    """Lots de fenêtres comme dans analyze : une réduction par échelle, vues à pas"""
+    for scale in scales:
+        size, stride = scaled_grid(image.size, scale, overlap)
+        tiles = tile_views(np.asarray(image.resize(size, Image.Resampling.BILINEAR)), TILE, stride)
+        rows_per_batch = max(1, batch_size // tiles.shape[1])
+        for start in range(0, tiles.shape[0], rows_per_batch):
+            yield np.ascontiguousarray(tiles[start:start + rows_per_batch]).reshape(-1, TILE, TILE, 3)
+
+
+def pil_batches(image, scales, overlap, batch_size=TILE_BATCH_SIZE):
+    """Mêmes fenêtres, chacune recadrée puis réduite en 64x64 par PIL"""
+    batch = []
+    for scale in scales:
+        (width, height), stride = scaled_grid(image.size, scale, overlap)
+        fx, fy = width / image.width, height / image.height
+        for top in range(0, height - TILE + 1, stride):
+            for left in range(0, width - TILE + 1, stride):
+                box = (left / fx, top / fy, (left + TILE) / fx, (top + TILE) / fy)
+                batch.append(np.asarray(image.resize(IMAGE_SIZE, Image.Resampling.BILINEAR, box=box)))
+                if len(batch) == batch_size:
+                    yield np.stack(batch)
+                    batch = []
+    if batch:
+        yield np.stack(batch)
+
+
+def best_of(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def peak_mb(function):
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megapixels', type=float, default=12)
+    parser.add_argument('--decode-size', type=int, default=config.TILE_DECODE_SIZE[0])
+    parser.add_argument('--scales', type=float, nargs='+', default=list(config.TILE_SCALES))
+    parser.add_argument('--overlap', type=float, default=config.TILE_OVERLAP)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-memory-mb', type=float, default=64)
+    args = parser.parse_args(argv)
+
+    buffer = io.BytesIO()
+    width, height = make_photo(buffer, args.megapixels)
+    data = buffer.getvalue()
+    seconds, image = best_of(lambda: decode_image(io.BytesIO(data), size=(args.decode_size,) * 2), args.repeat)
+    print(f"photo {width}x{height} ({len(data) / 2**20:.1f} Mo), décodée en {image.width}x{image.height} "
+          f"en {seconds * 1000:.0f} ms")
+
+    failures = []
+    print(f"\n{'génération des zones':<24} {'zones':>6} {'ms':>8} {'zones/s':>9} {'pic (Mo)':>9}")
+    for name, generate in (('vues NumPy à pas', strided_batches), ('recadrages PIL', pil_batches)):
+        count = lambda: sum(len(batch) for batch in generate(image, args.scales, args.overlap))
+        seconds, tiles = best_of(count, args.repeat)
+        print(f"{name:<24} {tiles:>6} {seconds * 1000:>8.1f} {tiles / seconds:>9.0f} {peak_mb(count):>9.1f}")
+
+    from model_loader import build_model
+
+    model = build_model(lambda fraction, message: None)
+    run = lambda: analyze(image, model, args.scales, args.overlap)
+    run()
+    rss_before = process_rss_bytes()
+    seconds, analysis = best_of(run, args.repeat)
+    rss_after = process_rss_bytes()
+    peak = peak_mb(run)
+    print(f"\nanalyse complète : {analysis.tiles} zones en {seconds * 1000:.0f} ms "
+          f"({analysis.tiles / seconds:.0f} zones/s), carte {analysis.heat.shape[0]}x{analysis.heat.shape[1]}")
+    print(f"mémoire : pic NumPy/Python {peak:.1f} Mo, résidente {rss_after / 2**20:.0f} Mo "
+          f"({(rss_after - rss_before) / 2**20:+.1f} Mo pendant les mesures)")
+    print("top-5 agrégé : " + ", ".join(f"{r['disease']} {r['confidence']:.1f}%" for r in analysis.results()))
+    if peak > args.max_memory_mb:
+        failures.append(f"pic mémoire {peak:.1f} Mo pendant l'analyse, plafond {args.max_memory_mb} Mo")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Augmentation au test (TTA) : latence selon le nombre de vues et accord avec la vue unique
+
+    python -m benchmarks.bench_tta --views 1 2 4 8 --repeat 20
+    python -m benchmarks.bench_tta --images dossier/photos --perturbations 20
+
+Latence : préprocessing + prédiction, les vues passées en un seul lot (preprocess_tta) contre
+autant d'appels model.predict séparés. Accord : pour chaque image, des cadrages perturbés
+(recadrage de 80 à 100 % du côté, décalé au hasard) simulent une photo reprise ; on compte la
+part des cadrages dont la classe prédite est celle de l'image entière, en vue unique et en TTA.
+Code de sortie non nul si le lot de N vues coûte plus que `--max-ratio` fois une vue unique.
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from benchmarks.common import ASSETS_DIR, asset_images, median_ms
+from inference import TTA_VIEWS, aggregate_views, preprocess_tta, preprocess_uint8
+
+
+def perturbed(image, rng):
+    """Cadrage aléatoire : 80 à 100 % du côté, position tirée au hasard"""
+    fraction = rng.uniform(0.8, 1.0)
+    width, height = round(image.width * fraction), round(image.height * fraction)
+    left = int(rng.integers(0, image.width - width + 1))
+    top = int(rng.integers(0, image.height - height + 1))
+    return image.crop((left, top, left + width, top + height))
+
+
+def top1(model, image, views, method):
+    batch = preprocess_tta(image, views) if views > 1 else preprocess_uint8(image)
+    return int(np.argmax(aggregate_views(model.predict(batch), method)[0]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--views', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--images', default=ASSETS_DIR, help="Dossier d'images JPEG/PNG")
+    parser.add_argument('--perturbations', type=int, default=10, help="Cadrages perturbés par image")
+    parser.add_argument('--aggregate', choices=['mean', 'geometric'], default='mean')
+    parser.add_argument('--max-ratio', type=float, default=3.0,
+                        help="Coût maximal du lot de N vues par rapport à une vue unique")
+    args = parser.parse_args(argv)
+
+    from model_loader import build_model
+
+    model = build_model(lambda fraction, message: None)
+    images = asset_images(args.images)
+    failures = []
+
+    single = median_ms(lambda: model.predict(preprocess_uint8(images[0])), args.repeat)
+    print(f"{'vues':>4} {'un lot (ms)':>12} {'appels séparés (ms)':>20} {'vs vue unique':>14}")
+    for views in args.views:
+        views = min(views, len(TTA_VIEWS))
+        batched = median_ms(lambda: model.predict(preprocess_tta(images[0], views)), args.repeat)
+        separate = median_ms(lambda: [model.predict(view[np.newaxis])
+                                      for view in preprocess_tta(images[0], views)], args.repeat)
+        print(f"{views:>4} {batched:>12.1f} {separate:>20.1f} {batched / single:>13.2f}x")
+        if batched > single * args.max_ratio:
+            failures.append(f"{views} vues en un lot : {batched:.1f} ms, plus de {args.max_ratio}x "
+                            f"la vue unique ({single:.1f} ms)")
+
+    views = min(max(args.views), len(TTA_VIEWS))
+    rng = np.random.default_rng(0)
+    stable = {1: 0, views: 0}
+    agree = 0
+    total = 0
+    for image in images:
+        reference = {count: top1(model, image, count, args.aggregate) for count in stable}
+        agree += reference[1] == reference[views]
+        for _ in range(args.perturbations):
+            crop = perturbed(image, rng)
+            for count in stable:
+                stable[count] += top1(model, crop, count, args.aggregate) == reference[count]
+            total += 1
+    print(f"\n{len(images)} images ({args.images}), {args.perturbations} cadrages perturbés chacune")
+    print(f"classe inchangée après recadrage : vue unique {stable[1] / total:.0%}, "
+          f"TTA {views} vues ({args.aggregate}) {stable[views] / total:.0%}")
+    print(f"accord TTA / vue unique sur l'image entière : {agree}/{len(images)}")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
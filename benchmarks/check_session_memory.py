@@ -0,0 +1,126 @@
+"""Plafond mémoire de l'état des sessions : nombreuses sessions simulées sur un jeu d'images commun
+
+    python -m benchmarks.check_session_memory --sessions 2000 --images 40 --image-budget-mb 32
+Compare l'ancien état (liste de dictionnaires top-5 + image décodée par session) au nouveau
+(SessionPrediction compacte + ImageCache partagé). Code de sortie non nul si un plafond est
+dépassé ou si l'éviction des sessions inactives ne libère pas leurs entrées.
+"""
+import argparse
+import io
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.common import synthetic_jpegs
+from decoding import decode_image
+from inference import top_k_results
+from prediction_cache import content_hash
+from session_store import ImageCache, SessionPrediction, SessionStore, image_nbytes
+
+
+def fake_probabilities(rng):
+    logits = rng.normal(size=22)
+    return np.exp(logits) / np.exp(logits).sum()
+
+
+def python_bytes(function):
+    """Octets alloués par Python (tracemalloc) et conservés après function()"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = function()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, kept
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=2000)
+    parser.add_argument('--images', type=int, default=40)
+    parser.add_argument('--image-budget-mb', type=float, default=32)
+    parser.add_argument('--reruns', type=int, default=3, help="Reruns par session (image relue à chaque fois)")
+    parser.add_argument('--session-ceiling-bytes', type=int, default=1024,
+                        help="Plafond par session de l'état compact (hors cache d'images partagé)")
+    args = parser.parse_args(argv)
+
+    # Photos JPEG 1600x1200 distinctes (décodées à 1024x768 par decode_image)
+    uploads = synthetic_jpegs(args.images, (1600, 1200), quality=85, cell=100)
+    digests = [content_hash(data) for data in uploads]
+    rng = np.random.default_rng(1)
+    probabilities = [fake_probabilities(rng) for _ in range(args.sessions)]
+    failures = []
+
+    # Ancien état : top-5 en dictionnaires et image décodée par session
+    def legacy():
+        sessions = {}
+        for index in range(args.sessions):
+            sessions[f"session-{index}"] = {'prediction_results': top_k_results(probabilities[index])}
+        return sessions
+
+    legacy_python, _ = python_bytes(legacy)
+    legacy_image = image_nbytes(decode_image(io.BytesIO(uploads[0])))
+    legacy_total = legacy_python + legacy_image * args.sessions
+
+    # Nouvel état : prédiction compacte par session, images partagées dans un budget
+    store = SessionStore(idle_seconds=0.5, sweep_interval=3600)
+    images = ImageCache(int(args.image_budget_mb * 2**20))
+
+    def compact():
+        for index in range(args.sessions):
+            session = f"session-{index}"
+            upload = index * args.images // args.sessions  # plusieurs sessions successives par image
+            for _ in range(args.reruns):
+                store.touch(session, user='medecin')
+                images.get_or_decode(digests[upload], lambda: decode_image(io.BytesIO(uploads[upload])))
+            results = top_k_results(probabilities[index])
+            store.put(session, SessionPrediction.from_results(digests[upload], results))
+        return store
+
+    start = time.perf_counter()
+    compact_python, _ = python_bytes(compact)
+    elapsed = time.perf_counter() - start
+    report = store.report()
+    image_stats = images.stats()
+    compact_total = compact_python + image_stats['bytes']
+
+    print(f"{args.sessions} sessions, {args.images} images distinctes ({elapsed:.1f}s)")
+    print(f"ancien état : {legacy_python / args.sessions:,.0f} o/session (Python) + "
+          f"{legacy_image / 2**20:.1f} Mo d'image par session = {legacy_total / 2**20:,.0f} Mo")
+    print(f"nouvel état : {compact_python / args.sessions:,.0f} o/session (Python, mesuré), "
+          f"{report['max_bytes']} o/session (rapport) + cache d'images {image_stats['bytes'] / 2**20:.1f} Mo "
+          f"({image_stats['entries']} images, {image_stats['evictions']} évictions, "
+          f"succès {image_stats['hit_rate']:.0%}) = {compact_total / 2**20:,.1f} Mo")
+
+    if compact_python / args.sessions > args.session_ceiling_bytes:
+        failures.append(f"{compact_python / args.sessions:.0f} o/session mesurés, plafond {args.session_ceiling_bytes}")
+    if report['max_bytes'] > args.session_ceiling_bytes:
+        failures.append(f"rapport: {report['max_bytes']} o pour une session, plafond {args.session_ceiling_bytes}")
+    if image_stats['bytes'] > image_stats['max_bytes']:
+        failures.append(f"cache d'images à {image_stats['bytes']} o, budget {image_stats['max_bytes']}")
+
+    # Le top-5 dérivé du vecteur compact est celui calculé à l'origine
+    sample = store.get('session-0').results()
+    expected = top_k_results(probabilities[0])
+    if [r['disease'] for r in sample] != [r['disease'] for r in expected] or not np.allclose(
+            [r['probability'] for r in sample], [r['probability'] for r in expected], atol=1e-6):
+        failures.append("top-5 dérivé différent du top-5 d'origine")
+
+    # Éviction : seules les sessions actives récemment restent
+    time.sleep(store.idle_seconds * 1.5)
+    active = [f"session-{index}" for index in range(0, args.sessions, 10)]
+    for session in active:
+        store.touch(session)
+    evicted = store.evict_idle()
+    print(f"éviction : {evicted} sessions inactives retirées, {len(store)} restantes")
+    if len(store) != len(active) or any(store.get(session) is None for session in active):
+        failures.append(f"{len(store)} sessions après éviction, {len(active)} attendues")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
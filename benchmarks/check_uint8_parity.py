@@ -0,0 +1,79 @@
+"""Parité numérique entre preprocess_image (float64 côté Python) et le chemin uint8 dans le graphe
+
+    python -m benchmarks.check_uint8_parity
+Code de sortie non nul si une tolérance est dépassée.
+"""
+import argparse
+import glob
+import sys
+
+import numpy as np
+from PIL import Image
+
+from decoding import decode_image
+from inference import preprocess_image, preprocess_uint8
+
+
+def sample_images(directory='assets', synthetic=16, seed=0):
+    """Images des assets + images synthétiques de tailles variées (RGBA et niveaux de gris inclus)"""
+    images = [decode_image(path) for path in sorted(glob.glob(f"{directory}/*.jp*g"))]
+    rng = np.random.default_rng(seed)
+    for index in range(synthetic):
+        height, width = rng.integers(80, 900, size=2)
+        pixels = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        image = Image.fromarray(pixels)
+        if index % 4 == 1:
+            image = image.convert('RGBA')
+        elif index % 4 == 2:
+            image = image.convert('L')
+        images.append(image)
+    return images
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--graph-resize-tolerance', type=float, default=0.05,
+                        help="Écart moyen de pixel toléré (échelle [0, 1]) pour le redimensionnement dans le graphe")
+    args = parser.parse_args(argv)
+
+    import tensorflow as tf
+    from serving import load_serving_model, preprocess_in_graph
+
+    failures = []
+    images = sample_images()
+
+    # 1. Entrée du modèle : uint8 / 255 dans le graphe == preprocess_image historique
+    reference = np.concatenate([preprocess_image(image) for image in images]).astype(np.float32)
+    uint8_batch = np.concatenate([preprocess_uint8(image) for image in images])
+    in_graph = preprocess_in_graph(tf.constant(uint8_batch)).numpy()
+    input_diff = float(np.abs(in_graph - reference).max())
+    print(f"entrée modèle, écart max: {input_diff:.2e}")
+    if input_diff > 1e-6:
+        failures.append("normalisation uint8 différente de preprocess_image")
+
+    # 2. Sorties du modèle sur les deux chemins
+    model = load_serving_model()
+    output_diff = float(np.abs(model.predict(uint8_batch) - model.predict(reference)).max())
+    print(f"probabilités, écart max: {output_diff:.2e}")
+    if output_diff > 1e-5:
+        failures.append("probabilités différentes entre les chemins uint8 et float")
+
+    # 3. Redimensionnement dans le graphe (images brutes de taille quelconque) contre PIL
+    pixel_diffs, agreement = [], []
+    for image, expected in zip(images, reference):
+        raw = np.asarray(image.convert('RGB'), dtype=np.uint8)[np.newaxis]
+        resized = preprocess_in_graph(tf.constant(raw)).numpy()[0]
+        pixel_diffs.append(float(np.abs(resized - expected).mean()))
+        agreement.append(model.predict(raw).argmax() == model.predict(expected[np.newaxis]).argmax())
+    print(f"redimensionnement dans le graphe, écart moyen de pixel max: {max(pixel_diffs):.4f}, "
+          f"accord top-1: {np.mean(agreement):.0%}")
+    if max(pixel_diffs) > args.graph_resize_tolerance:
+        failures.append("redimensionnement dans le graphe trop éloigné de PIL")
+
+    for failure in failures:
+        print(f"ÉCHEC: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
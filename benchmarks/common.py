@@ -0,0 +1,46 @@
+"""Outils partagés par les benchmarks : chronométrage médian et images de test"""
+import glob
+import io
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from decoding import decode_image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(ROOT, 'assets')
+
+
+def median_ms(function, repeat, warmup=1):
+    """Durée médiane (ms) de `repeat` appels, après `warmup` appels de préchauffage"""
+    for _ in range(warmup):
+        function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+
+def asset_images(directory=ASSETS_DIR, extensions=('.jpg', '.jpeg', '.png')):
+    """Images d'un dossier décodées comme dans l'interface (decode_image), par ordre de nom"""
+    paths = [path for path in sorted(glob.glob(os.path.join(directory, '*')))
+             if path.lower().endswith(extensions)]
+    return [decode_image(path) for path in paths]
+
+
+def synthetic_jpegs(count, size=(512, 512), seed=0, quality=90, cell=32):
+    """Octets de JPEG aléatoires distincts (largeur, hauteur) : bruit de `cell` pixels agrandi en
+    bicubique, texture lisse proche d'une photo en taille compressée"""
+    width, height = size
+    rng = np.random.default_rng(seed)
+    images = []
+    for _ in range(count):
+        small = rng.integers(0, 256, (max(1, height // cell), max(1, width // cell), 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(small).resize(size, Image.Resampling.BICUBIC).save(buffer, 'JPEG', quality=quality)
+        images.append(buffer.getvalue())
+    return images
@@ -0,0 +1,264 @@
+"""Suite de benchmarks hors ligne avec historique et détection des régressions
+
+    python -m benchmarks.suite                          # tout, comparé à la référence
+    python -m benchmarks.suite --only decode search     # groupes choisis
+    python -m benchmarks.suite --save-baseline          # la mesure devient la référence
+    python -m benchmarks.suite --tolerance 0.15
+
+Groupes : decode (décodage + réduction des images d'assets/ et de photos synthétiques de 12 et
+24 Mpx, préprocessing), model (latence par lot de 1/8/32/128), postprocess (top-k), search
+(recherche de l'Atlas). Chaque exécution est ajoutée à l'historique JSONL avec la description de
+la machine ; code de sortie non nul si une mesure se dégrade au-delà de la tolérance par
+rapport à la référence. La référence n'a de sens que sur la machine où elle a été mesurée : sur
+une machine partagée (CI, conteneur), relever --tolerance.
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_decode import make_photo
+from benchmarks.bench_search import QUERIES
+from benchmarks.common import ROOT
+
+RESULTS_DIR = os.path.join('data', 'benchmarks')
+HISTORY_PATH = os.path.join(RESULTS_DIR, 'history.jsonl')
+BASELINE_PATH = os.path.join(RESULTS_DIR, 'baseline.json')
+GROUPS = ('decode', 'model', 'postprocess', 'search')
+BATCH_SIZES = (1, 8, 32, 128)
+SYNTHETIC_MEGAPIXELS = (12, 24)
+
+
+def metric(value, unit, better='lower'):
+    return {'value': float(value), 'unit': unit, 'better': better}
+
+
+def best_seconds(function, repeat, warmup=1, min_time=0.05):
+    """Meilleure durée d'un appel sur `repeat` échantillons (après `warmup` appels non mesurés)
+
+    Chaque échantillon enchaîne assez d'appels pour durer au moins `min_time` (comme
+    timeit.autorange) : les opérations de quelques microsecondes ne sont pas noyées dans la
+    résolution de l'horloge. Le minimum est moins sensible que la médiane aux autres processus
+    de la machine.
+    """
+    for _ in range(warmup):
+        function()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed * 2 >= min_time else 10
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def bench_decode(repeat):
+    """Décodage + réduction (decode_image) et préprocessing, sur assets/ et sur de grandes photos"""
+    from decoding import decode_image
+    from inference import preprocess_image, preprocess_uint8
+
+    metrics = {}
+    assets = [path for path in sorted(glob.glob(os.path.join(ROOT, 'assets', '*')))
+              if path.lower().endswith(('.jpg', '.jpeg', '.png'))]
+    payloads = []
+    for path in assets:
+        with open(path, 'rb') as source:
+            payloads.append(source.read())
+
+    def decode_assets():
+        for data in payloads:
+            preprocess_uint8(decode_image(io.BytesIO(data)))
+
+    seconds = best_seconds(decode_assets, repeat)
+    metrics['decode.assets'] = metric(len(payloads) / seconds, 'images/s', 'higher')
+
+    for megapixels in SYNTHETIC_MEGAPIXELS:
+        buffer = io.BytesIO()
+        make_photo(buffer, megapixels)
+        data = buffer.getvalue()
+        seconds = best_seconds(lambda: preprocess_uint8(decode_image(io.BytesIO(data))), repeat)
+        metrics[f'decode.synthetic_{megapixels}mp'] = metric(seconds * 1000, 'ms')
+
+    decoded = decode_image(io.BytesIO(payloads[0]))
+    metrics['preprocess.float'] = metric(best_seconds(lambda: preprocess_image(decoded), repeat) * 1e6, 'µs')
+    metrics['preprocess.uint8'] = metric(best_seconds(lambda: preprocess_uint8(decoded), repeat) * 1e6, 'µs')
+    return metrics
+
+
+def bench_model(repeat):
+    """Latence d'une passe du modèle configuré (config.INFERENCE_BACKEND) par taille de lot"""
+    from inference import IMAGE_SIZE
+    from model_loader import build_model
+
+    model = build_model(lambda fraction, message: None)
+    rng = np.random.default_rng(0)
+    metrics = {}
+    for batch_size in BATCH_SIZES:
+        images = rng.integers(0, 256, (batch_size, *IMAGE_SIZE, 3), dtype=np.uint8)
+        seconds = best_seconds(lambda: model.predict(images), repeat, warmup=2)
+        metrics[f'model.batch_{batch_size}'] = metric(seconds * 1000, 'ms')
+    return metrics
+
+
+def bench_postprocess(repeat):
+    """Top-5 d'une prédiction et d'un lot de 128 (mapping vers les noms DISEASE_INFO compris)"""
+    from inference import results_from_top_k, top_k_batch, top_k_results
+
+    rng = np.random.default_rng(0)
+    logits = rng.normal(size=(128, 22)).astype(np.float32)
+    probabilities = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+
+    def batch():
+        indices, top = top_k_batch(probabilities)
+        return [results_from_top_k(row_indices, row_top) for row_indices, row_top in zip(indices, top)]
+
+    return {
+        'postprocess.single': metric(best_seconds(lambda: top_k_results(probabilities[0]), repeat) * 1e6, 'µs'),
+        'postprocess.batch_128': metric(best_seconds(batch, repeat) * 1e6, 'µs'),
+    }
+
+
+def bench_search(repeat):
+    """Construction de l'index de l'Atlas, recherche, correction orthographique et suggestions"""
+    from atlas_search import SearchIndex
+    from disease_info import DISEASE_INFO
+
+    index = SearchIndex(DISEASE_INFO)
+
+    def queries():
+        for query in QUERIES:
+            index.search(query)
+
+    typos = ['demangaisons', 'psoriasiss', 'eczma', 'vitiglio']
+    return {
+        'search.build': metric(best_seconds(lambda: SearchIndex(DISEASE_INFO), repeat) * 1000, 'ms'),
+        'search.query': metric(best_seconds(queries, repeat) / len(QUERIES) * 1e6, 'µs'),
+        'search.fuzzy': metric(best_seconds(lambda: [index.search(query) for query in typos], repeat)
+                               / len(typos) * 1e6, 'µs'),
+        'search.autocomplete': metric(best_seconds(lambda: index.autocomplete('dema'), repeat) * 1e6, 'µs'),
+    }
+
+
+BENCHMARKS = {
+    'decode': bench_decode,
+    'model': bench_model,
+    'postprocess': bench_postprocess,
+    'search': bench_search,
+}
+
+
+def machine_info():
+    """Description de la machine et de la version mesurées, enregistrée avec chaque exécution"""
+    import PIL
+
+    import config
+
+    info = {
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'cpus_available': len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count(),
+        'numpy': np.__version__,
+        'pillow': PIL.__version__,
+        'backend': config.INFERENCE_BACKEND,
+    }
+    if 'tensorflow' in sys.modules:
+        info['tensorflow'] = sys.modules['tensorflow'].__version__
+    try:
+        with open('/proc/meminfo') as meminfo:
+            info['memory_gb'] = round(int(meminfo.readline().split()[1]) / 2**20, 1)
+    except OSError:
+        pass
+    try:
+        info['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                        text=True, timeout=10).stdout.strip() or None
+    except OSError:
+        info['commit'] = None
+    return info
+
+
+def compare(metrics, baseline, tolerance):
+    """Lignes (nom, valeur, référence, écart relatif, régression) pour les mesures communes"""
+    rows = []
+    for name, current in metrics.items():
+        reference = baseline.get('metrics', {}).get(name)
+        if reference is None or not reference['value']:
+            rows.append((name, current, None, None, False))
+            continue
+        change = current['value'] / reference['value'] - 1
+        worse = change if current['better'] == 'lower' else -change
+        rows.append((name, current, reference['value'], change, worse > tolerance))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=GROUPS, default=list(GROUPS))
+    parser.add_argument('--skip', nargs='+', choices=GROUPS, default=[])
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Dégradation relative tolérée (0.10 = 10 %%)")
+    parser.add_argument('--history', default=HISTORY_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args(argv)
+
+    metrics = {}
+    for group in args.only:
+        if group not in args.skip:
+            print(f"[{group}]", file=sys.stderr, flush=True)
+            metrics.update(BENCHMARKS[group](args.repeat))
+    run = {'time': time.time(), 'machine': machine_info(), 'metrics': metrics}
+
+    os.makedirs(os.path.dirname(args.history) or '.', exist_ok=True)
+    with open(args.history, 'a', encoding='utf-8') as history:
+        history.write(json.dumps(run, ensure_ascii=False) + '\n')
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        differences = [key for key in ('machine', 'cpus_available', 'backend')
+                       if baseline['machine'].get(key) != run['machine'].get(key)]
+        if differences:
+            print(f"Attention: référence mesurée sur une autre configuration ({', '.join(differences)})")
+
+    rows = compare(metrics, baseline, args.tolerance)
+    print(f"{'mesure':<26} {'valeur':>12} {'unité':<9} {'référence':>12} {'écart':>8}")
+    for name, current, reference, change, regressed in rows:
+        reference_text = f"{reference:>12.3f}" if reference is not None else f"{'-':>12}"
+        change_text = f"{change:>+7.1%}" if change is not None else f"{'':>7}"
+        flag = '  RÉGRESSION' if regressed else ''
+        print(f"{name:<26} {current['value']:>12.3f} {current['unit']:<9} {reference_text} {change_text}{flag}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as handle:
+            json.dump(run, handle, ensure_ascii=False, indent=2)
+        print(f"Référence enregistrée dans {args.baseline}")
+        return 0
+
+    regressions = [name for name, _, _, _, regressed in rows if regressed]
+    for name in regressions:
+        print(f"ÉCHEC: {name} dégradé au-delà de {args.tolerance:.0%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
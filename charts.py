@@ -0,0 +1,99 @@
+"""Figures Plotly mémoïsées par leurs données : une figure n'est construite qu'une fois par jeu
+de données, puis réutilisée par tous les reruns et toutes les sessions
+
+Les arguments sont des tuples (hachables) ; les figures retournées sont partagées et ne doivent
+pas être modifiées. Plotly n'est importé qu'à la première construction.
+"""
+from functools import lru_cache
+
+FIGURE_CACHE_SIZE = 256
+
+
+def results_key(results):
+    """(maladies, probabilités) d'une liste de résultats, utilisable comme clé de cache"""
+    return tuple(r['disease'] for r in results), tuple(round(float(r['probability']), 6) for r in results)
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def prediction_bar(diseases, probabilities):
+    """Barres horizontales du top 5 des prédictions"""
+    import plotly.express as px
+
+    fig = px.bar(
+        x=probabilities,
+        y=diseases,
+        orientation='h',
+        title="Top 5 des Prédictions",
+        labels={'x': 'Probabilité', 'y': 'Maladie'},
+        color=probabilities,
+        color_continuous_scale='viridis',
+        text=[f"{p:.1%}" for p in probabilities]  # Affichage des pourcentages
+    )
+    fig.update_layout(
+        height=400,
+        showlegend=False,
+        xaxis_title="Probabilité de prédiction",
+        yaxis_title="Maladies",
+        title_x=0.5,
+        font=dict(size=12)
+    )
+    fig.update_traces(textposition='inside')
+    return fig
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def prediction_pie(diseases, probabilities):
+    """Secteurs des diagnostics les plus probables"""
+    import plotly.express as px
+
+    fig = px.pie(values=probabilities, names=diseases, title="Top 3 des diagnostics")
+    fig.update_traces(
+        textposition='inside',
+        textinfo='percent+label',
+        hovertemplate='<b>%{label}</b><br>Probabilité: %{percent}<br><extra></extra>'
+    )
+    return fig
+
+
+@lru_cache(maxsize=32)
+def bar(x, y, title, x_label, y_label, color=None, color_label=None):
+    """Barres verticales (lots exécutés, analyses par jour, diagnostics)"""
+    import plotly.express as px
+
+    labels = {'x': x_label, 'y': y_label}
+    if color is not None:
+        labels['color'] = color_label
+    return px.bar(x=x, y=y, color=color, title=title, labels=labels)
+
+
+@lru_cache(maxsize=32)
+def latency_histogram(stages, latencies_ms):
+    """Distribution des latences, une couleur par étape"""
+    import plotly.express as px
+
+    return px.histogram(
+        x=latencies_ms,
+        color=stages,
+        barmode='overlay',
+        nbins=50,
+        title="Distribution des Latences par Étape",
+        labels={'x': 'Latence (ms)', 'color': 'Étape'}
+    )
+
+
+@lru_cache(maxsize=32)
+def pie(names, values, title):
+    import plotly.express as px
+
+    return px.pie(values=values, names=names, title=title)
+
+
+def cache_info():
+    """Succès / échecs des caches de figures, par fonction"""
+    return {function.__name__: function.cache_info()._asdict()
+            for function in (prediction_bar, prediction_pie, bar, latency_histogram, pie)}
+
+
+def cache_clear():
+    for function in (prediction_bar, prediction_pie, bar, latency_histogram, pie):
+        function.cache_clear()
@@ -0,0 +1,110 @@
+"""Paramètres de l'application (surchargeables par variables d'environnement)"""
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def _env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on', 'oui')
+
+
+# Cache des prédictions
+PREDICTION_CACHE_SIZE = _env_int('DERMAI_PREDICTION_CACHE_SIZE', 1024)
+PREDICTION_CACHE_DIR = os.environ.get('DERMAI_PREDICTION_CACHE_DIR') or None  # None = pas de cache disque
+PREDICTION_CACHE_DISK_SIZE = _env_int('DERMAI_PREDICTION_CACHE_DISK_SIZE', 100_000)
+
+# Mesure des latences (taille de la fenêtre glissante) et délai artificiel de l'ancienne démo
+LATENCY_WINDOW = _env_int('DERMAI_LATENCY_WINDOW', 1000)
+SIMULATED_DELAY_SECONDS = _env_float('DERMAI_SIMULATED_DELAY', 0.0)  # 0 = désactivé
+
+# Service du modèle : fonction tracée (défaut), compilation XLA optionnelle, ou ancien model.predict
+SERVING_XLA = _env_bool('DERMAI_XLA')
+SERVING_LEGACY_PREDICT = _env_bool('DERMAI_LEGACY_PREDICT')
+
+# Micro-lots inter-sessions : taille maximale de lot et fenêtre d'attente
+MICRO_BATCHING = _env_bool('DERMAI_MICRO_BATCHING', True)
+MICRO_BATCH_MAX_SIZE = _env_int('DERMAI_MICRO_BATCH_MAX_SIZE', 32)
+MICRO_BATCH_MAX_WAIT_MS = _env_float('DERMAI_MICRO_BATCH_MAX_WAIT_MS', 5.0)
+
+# Backend d'inférence : 'keras', 'savedmodel' (SavedModel pré-exporté, démarrage plus rapide)
+# ou 'tflite-float32' / 'tflite-float16' / 'tflite-dynamic' / 'tflite-int8'
+INFERENCE_BACKEND = os.environ.get('DERMAI_BACKEND', 'keras')
+TFLITE_DIR = os.environ.get('DERMAI_TFLITE_DIR', 'checkpoints_projet/tflite')
+TFLITE_THREADS = _env_int('DERMAI_TFLITE_THREADS', 0) or None  # None = choix de TFLite
+SAVEDMODEL_DIR = os.environ.get('DERMAI_SAVEDMODEL_DIR', 'checkpoints_projet/savedmodel')
+
+# Chargement du modèle en arrière-plan dès le démarrage du serveur (sinon au premier besoin)
+PRELOAD_MODEL = _env_bool('DERMAI_PRELOAD_MODEL', True)
+PRELOAD_DELAY_SECONDS = _env_float('DERMAI_PRELOAD_DELAY', 1.0)  # laisse la première page s'afficher
+
+# Pool de processus d'inférence (0 = modèle dans le processus Streamlit)
+WORKER_PROCESSES = _env_int('DERMAI_WORKER_PROCESSES', 0)
+WORKER_THREADS = _env_int('DERMAI_WORKER_THREADS', 1)  # threads intra-op par worker
+
+# Budget de pixels accepté au décodage des images téléchargées
+DECODE_MAX_PIXELS = _env_int('DERMAI_DECODE_MAX_PIXELS', 50_000_000)
+
+# Journal SQLite des classifications (vide = désactivé) et intervalle d'écriture des lots
+PREDICTION_LOG_PATH = os.environ.get('DERMAI_PREDICTION_LOG', 'data/predictions.sqlite3')
+PREDICTION_LOG_FLUSH_SECONDS = _env_float('DERMAI_PREDICTION_LOG_FLUSH', 1.0)
+
+# Mode léger par défaut : graphiques natifs, images allégées (modifiable dans la barre latérale)
+LIGHT_MODE = _env_bool('DERMAI_LIGHT_MODE')
+
+# API HTTP locale (api_server.py) : adresse, taille maximale d'une requête, images par requête,
+# durée de maintien des connexions inactives et requêtes simultanées avant refus (503)
+API_HOST = os.environ.get('DERMAI_API_HOST', '127.0.0.1')
+API_PORT = _env_int('DERMAI_API_PORT', 8502)
+API_MAX_BODY_BYTES = _env_int('DERMAI_API_MAX_BODY_BYTES', 20 * 2**20)
+API_MAX_IMAGES = _env_int('DERMAI_API_MAX_IMAGES', 16)
+API_KEEPALIVE_SECONDS = _env_int('DERMAI_API_KEEPALIVE', 15)
+API_MAX_CONCURRENCY = _env_int('DERMAI_API_MAX_CONCURRENCY', 256)
+
+# Screening en flux (screening.py) : dossier surveillé, taille des lots, threads de décodage,
+# images réclamées simultanément au plus, intervalle de scan et délai avant de prendre un fichier
+SCREENING_DIR = os.environ.get('DERMAI_SCREENING_DIR', 'data/screening')
+SCREENING_BATCH_SIZE = _env_int('DERMAI_SCREENING_BATCH_SIZE', 32)
+SCREENING_DECODE_THREADS = _env_int('DERMAI_SCREENING_DECODE_THREADS', 4)
+SCREENING_MAX_IN_FLIGHT = _env_int('DERMAI_SCREENING_MAX_IN_FLIGHT', 256)
+SCREENING_POLL_SECONDS = _env_float('DERMAI_SCREENING_POLL', 1.0)
+SCREENING_SETTLE_SECONDS = _env_float('DERMAI_SCREENING_SETTLE', 1.0)
+
+# État des sessions : éviction après inactivité (s) et budget du cache commun d'images décodées
+SESSION_IDLE_SECONDS = _env_float('DERMAI_SESSION_IDLE', 1800.0)
+IMAGE_CACHE_MAX_BYTES = _env_int('DERMAI_IMAGE_CACHE_MB', 128) * 2**20
+
+# Augmentation au test (TTA) : activée par défaut ou non, nombre de vues passées en un seul lot
+# (2 à 8, voir inference.TTA_VIEWS) et agrégation des probabilités ('mean' ou 'geometric')
+TTA_ENABLED = _env_bool('DERMAI_TTA')
+TTA_VIEWS = _env_int('DERMAI_TTA_VIEWS', 8)
+TTA_AGGREGATE = os.environ.get('DERMAI_TTA_AGGREGATE', 'mean')
+
+# Cas similaires (similar_cases.py) : dossier de l'index (absent = section masquée), nombre de
+# cas affichés et listes IVF parcourues par requête (0 = recherche exacte)
+CASES_INDEX_DIR = os.environ.get('DERMAI_CASES_INDEX', 'data/cases')
+CASES_TOP_K = _env_int('DERMAI_CASES_TOP_K', 5)
+CASES_NPROBE = _env_int('DERMAI_CASES_NPROBE', 0)
+
+# Analyse par zones (tiling.py) : activée par défaut ou non, taille de décodage des photos,
+# côtés des fenêtres en fraction du petit côté, recouvrement, agrégation ('max' ou 'mean') et
+# nombre maximal de fenêtres (les échelles les plus fines sont abandonnées au-delà)
+TILED_ENABLED = _env_bool('DERMAI_TILED')
+TILE_DECODE_SIZE = (_env_int('DERMAI_TILE_DECODE_SIZE', 2048),) * 2
+TILE_SCALES = tuple(float(value) for value in os.environ.get('DERMAI_TILE_SCALES', '0.5,0.25,0.125').split(','))
+TILE_OVERLAP = _env_float('DERMAI_TILE_OVERLAP', 0.5)
+TILE_AGGREGATE = os.environ.get('DERMAI_TILE_AGGREGATE', 'max')
+TILE_MAX_TILES = _env_int('DERMAI_TILE_MAX_TILES', 1024)
+
+# Explication Grad-CAM (gradcam.py) cochée par défaut ou non dans la page de classification
+GRADCAM_ENABLED = _env_bool('DERMAI_GRADCAM')
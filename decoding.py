@@ -0,0 +1,55 @@
+"""Décodage rapide des images : résolution réduite dès le décodage JPEG, orientation EXIF, RGB"""
+from PIL import Image, ImageOps
+
+# Budget de pixels par défaut (au-delà, l'image est refusée avant décodage)
+MAX_PIXELS = 50_000_000
+# Taille maximale après décodage : sert à l'affichage et au préprocessing, dans l'interface
+# comme en lot, pour que les prédictions soient identiques
+DECODE_SIZE = (1024, 1024)
+
+
+class ImageTooLargeError(ValueError):
+    """Image dont la taille déclarée dépasse le budget de pixels"""
+
+
+def to_rgb(image, background=(255, 255, 255)):
+    """Convertit RGBA / LA / palette / niveaux de gris en RGB (transparence sur fond blanc)"""
+    if image.mode == 'RGB':
+        return image
+    if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        flattened = Image.new('RGB', rgba.size, background)
+        flattened.paste(rgba, mask=rgba.getchannel('A'))
+        return flattened
+    return image.convert('RGB')
+
+
+def decode_image(source, size=DECODE_SIZE, max_pixels=MAX_PIXELS):
+    """Décode `source` (chemin ou fichier) en RGB orienté, réduit pour tenir dans `size`
+
+    Pour un JPEG, draft() demande au décodeur une mise à l'échelle DCT (1/2 à 1/8) : l'image
+    n'est jamais décodée en pleine résolution. thumbnail() termine ensuite la réduction par
+    étapes (reduce puis rééchantillonnage), en conservant le ratio. Une image que PIL refuse
+    comme bombe de décompression lève aussi ImageTooLargeError ; un fichier tronqué lève
+    OSError, comme un format inconnu (UnidentifiedImageError).
+    """
+    try:
+        image = Image.open(source)
+    except Image.DecompressionBombError as exc:
+        raise ImageTooLargeError(str(exc)) from exc
+    width, height = image.size
+    if max_pixels and width * height > max_pixels:
+        image.close()
+        raise ImageTooLargeError(
+            f"Image de {width}x{height} pixels, au-delà du budget de {max_pixels:,} pixels"
+        )
+
+    if image.format == 'JPEG':
+        # L'orientation EXIF peut échanger largeur et hauteur : on demande le côté le plus grand
+        side = max(size)
+        image.draft('RGB', (side, side))
+
+    image = ImageOps.exif_transpose(image)
+    image = to_rgb(image)
+    image.thumbnail(size, Image.Resampling.BICUBIC, reducing_gap=2.0)
+    return image
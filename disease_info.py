@@ -0,0 +1,159 @@
+"""Base de connaissances des maladies de peau affichée par l'application"""
+
+# Classes de maladies avec descriptions détaillées
+DISEASE_INFO = {
+    'Acne': {
+        'description': 'Affection cutanée commune caractérisée par des boutons, points noirs et kystes',
+        'symptoms': ['Boutons rouges', 'Points noirs', 'Points blancs', 'Kystes'],
+        'treatment': 'Nettoyage doux, rétinoïdes topiques, antibiotiques si nécessaire',
+        'prevalence': '85% des adolescents',
+        # 'picture':"SkinDisease/train/Acne/07AcnePittedScars.jpeg"
+    },
+    'Actinic Keratosis': {
+        'description': 'Lésions précancéreuses causées par l\'exposition au soleil',
+        'symptoms': ['Plaques rugueuses', 'Squames', 'Démangeaisons'],
+        'treatment': 'Cryothérapie, thérapie photodynamique, crèmes topiques',
+        'prevalence': '58 millions d\'Américains',
+        # 'picture': 'SkinDisease/train/Actinic_Keratosis/3-s2.0-B9780128133163000064-f06-02-9780128133163.jpeg'
+    },
+    'Benign Tumors': {
+        'description': 'Tumeurs cutanées non cancéreuses',
+        'symptoms': ['Croissance lente', 'Masse palpable', 'Changement de couleur'],
+        'treatment': 'Surveillance, excision chirurgicale si nécessaire',
+        'prevalence': 'Très commune',
+        # 'picture':'SkinDisease/train/Benign_tumors/20cystAnal0531041.jpeg'
+    },
+    'Bullous': {
+        'description': 'Maladies caractérisées par des bulles cutanées',
+        'symptoms': ['Bulles remplies de liquide', 'Érosions', 'Croûtes'],
+        'treatment': 'Corticostéroïdes, immunosuppresseurs',
+        'prevalence': 'Rare',
+        # 'picture':'SkinDisease/train/Bullous/Bullous_Impetigo_fee391183f15cb4d62773032fe0be92d.jpeg'
+    },
+    'Candidiasis': {
+        'description': 'Infection fongique causée par Candida',
+        'symptoms': ['Éruption rouge', 'Démangeaisons', 'Desquamation'],
+        'treatment': 'Antifongiques topiques ou oraux',
+        'prevalence': 'Commune',
+        # 'picture':"SkinDisease/train/Candidiasis/13CandidaAxillae0712041.jpeg"
+    },
+    'Drug Eruption': {
+        'description': 'Réaction cutanée aux médicaments',
+        'symptoms': ['Éruption cutanée', 'Démangeaisons', 'Fièvre possible'],
+        'treatment': 'Arrêt du médicament, corticostéroïdes',
+        'prevalence': '2-3% des hospitalisations',
+        # 'picture':'SkinDisease/train/DrugEruption/drug-eruption-photosensitivity-12.jpeg'
+    },
+    'Eczema': {
+        'description': 'Dermatite atopique, inflammation chronique de la peau',
+        'symptoms': ['Démangeaisons intenses', 'Peau sèche', 'Rougeurs'],
+        'treatment': 'Hydratants, corticostéroïdes topiques, éviction allergènes',
+        'prevalence': '10-20% des enfants',
+        # 'picture':'SkinDisease/train/Eczema/3Eczema3-300.jpeg'
+    },
+    'Infestations/Bites': {
+        'description': 'Lésions causées par des insectes ou parasites',
+        'symptoms': ['Démangeaisons', 'Papules', 'Traces de morsures'],
+        'treatment': 'Antihistaminiques, insecticides topiques',
+        'prevalence': 'Saisonnière',
+        # 'picture':'SkinDisease/train/Infestations_Bites/1370__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsInkiLDdd.jpeg'
+    },
+    'Lichen': {
+        'description': 'Maladie inflammatoire chronique de la peau',
+        'symptoms': ['Papules violacées', 'Démangeaisons', 'Lignes de Wickham'],
+        'treatment': 'Corticostéroïdes topiques, rétinoïdes',
+        'prevalence': '0.2-1% population',
+        # 'picture':'SkinDisease/train/Lichen/3063__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsInkiLDM2XQ.jpeg'
+    },
+    'Lupus': {
+        'description': 'Maladie auto-immune systémique affectant la peau',
+        'symptoms': ['Éruption en papillon', 'Photosensibilité', 'Ulcères'],
+        'treatment': 'Immunosuppresseurs, protection solaire',
+        'prevalence': '0.1% population',
+        # 'picture':'SkinDisease/train/Lupus/2521__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsInkiLDM2XQ.jpeg'
+    },
+    'Moles': {
+        'description': 'Naevus mélanocytaires, taches pigmentées bénignes',
+        'symptoms': ['Taches brunes/noires', 'Bordures régulières', 'Symétrie'],
+        'treatment': 'Surveillance, excision si suspect',
+        'prevalence': '10-40 grains par personne',
+        # 'picture':'SkinDisease/train/Moles/3153__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsIngiLDFd.jpeg'
+    },
+    'Psoriasis': {
+        'description': 'Maladie auto-immune chronique avec plaques squameuses',
+        'symptoms': ['Plaques rouges épaisses', 'Squames argentées', 'Démangeaisons'],
+        'treatment': 'Corticostéroïdes, méthotrexate, biologiques',
+        'prevalence': '2-3% population mondiale',
+        # 'picture':'SkinDisease/train/Psoriasis/8Psoriasis2-127.jpeg'
+    },
+    'Rosacea': {
+        'description': 'Affection inflammatoire chronique du visage',
+        'symptoms': ['Rougeurs persistantes', 'Papules', 'Télangiectasies'],
+        'treatment': 'Métronidazole topique, éviction déclencheurs',
+        'prevalence': '5.5% population adulte',
+        # 'picture':'SkinDisease/train/Rosacea/07RosaceaK02161.jpeg'
+    },
+    'Seborrheic Keratoses': {
+        'description': 'Lésions bénignes verruqueuses liées à l\'âge',
+        'symptoms': ['Plaques brunes/noires', 'Surface verruqueuse', 'Bien délimitées'],
+        'treatment': 'Cryothérapie, électrocoagulation',
+        'prevalence': '>90% après 60 ans',
+        # 'picture':'SkinDisease/train/Seborrh_Keratoses/sebks01__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsIngiLDBd.jpeg'
+    },
+    'Skin Cancer': {
+        'description': 'Tumeurs malignes de la peau',
+        'symptoms': ['Asymétrie', 'Bordures irrégulières', 'Couleur variée', 'Diamètre >6mm'],
+        'treatment': 'Excision chirurgicale, chimiothérapie, radiothérapie',
+        'prevalence': '1 sur 5 Américains',
+        # 'picture':'SkinDisease/train/SkinCancer/basal-cell-carcinoma-aldara-3.jpeg'
+    },
+    'Sun/Sunlight Damage': {
+        'description': 'Dommages cutanés causés par l\'exposition UV',
+        'symptoms': ['Taches de vieillesse', 'Rides', 'Texture rugueuse'],
+        'treatment': 'Protection solaire, rétinoïdes, peelings',
+        'prevalence': '>90% adultes',
+        # 'picture':'SkinDisease/train/Sun_Sunlight_Damage/actinic-comedones-2.jpeg'
+    },
+    'Tinea': {
+        'description': 'Infections fongiques superficielles',
+        'symptoms': ['Plaques circulaires', 'Bordure surélevée', 'Desquamation'],
+        'treatment': 'Antifongiques topiques ou oraux',
+        'prevalence': '10-20% population',
+        # 'picture':'SkinDisease/train/Tinea/13tineaCApitis98-GP3.jpeg'
+    },
+    'Unknown/Normal': {
+        'description': 'Peau normale ou condition non identifiée',
+        'symptoms': ['Aucun symptôme particulier'],
+        'treatment': 'Aucun traitement nécessaire',
+        'prevalence': 'Variable',
+        # 'picture':'SkinDisease/train/Unknown_Normal/Image3.jpeg'
+    },
+    'Vascular Tumors': {
+        'description': 'Tumeurs des vaisseaux sanguins',
+        'symptoms': ['Lésions rouges/violacées', 'Croissance progressive'],
+        'treatment': 'Laser, sclérose, chirurgie',
+        'prevalence': '10% nouveau-nés',
+        # 'picture':'SkinDisease/train/Vascular_Tumors/angiokeratomas-4.jpeg'
+    },
+    'Vasculitis': {
+        'description': 'Inflammation des vaisseaux sanguins',
+        'symptoms': ['Purpura', 'Ulcères', 'Nodules'],
+        'treatment': 'Corticostéroïdes, immunosuppresseurs',
+        'prevalence': 'Rare',
+        # 'picture':'SkinDisease/train/Vasculitis/atrophy-blanche-4.jpeg'
+    },
+    'Vitiligo': {
+        'description': 'Perte de pigmentation cutanée',
+        'symptoms': ['Taches blanches', 'Dépigmentation progressive'],
+        'treatment': 'Corticostéroïdes, photothérapie, greffes',
+        'prevalence': '0.5-2% population',
+        # 'picture':'SkinDisease/train/Vitiligo/Image3.jpeg'
+    },
+    'Warts': {
+        'description': 'Verrues causées par le virus HPV',
+        'symptoms': ['Papules rugueuses', 'Surface kératosique'],
+        'treatment': 'Cryothérapie, acide salicylique, laser',
+        'prevalence': '7-12% population',
+        # 'picture':'SkinDisease/train/Warts/11AnalWarts090801.jpeg'
+    }
+}
@@ -0,0 +1,111 @@
+"""Explication des prédictions par Grad-CAM, dans la même passe que la prédiction
+
+Une seule passe avant/arrière (GradientTape) donne à la fois les probabilités et le gradient
+du score de la classe prédite par rapport aux cartes de la dernière convolution (conv2d_13,
+29x29x8) : l'explication ne coûte pas une deuxième inférence.
+
+    python gradcam.py photo.jpg --output gradcam.png
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from inference import MODEL_PATH
+
+
+def last_conv_layer(keras_model):
+    """Dernière couche Conv2D du modèle"""
+    import tensorflow as tf
+
+    layers = [layer for layer in keras_model.layers if isinstance(layer, tf.keras.layers.Conv2D)]
+    if not layers:
+        raise ValueError("Le modèle n'a pas de couche de convolution")
+    return layers[-1]
+
+
+class GradCAM:
+    """Probabilités et cartes Grad-CAM d'un lot uint8, via une fonction tracée une seule fois
+
+    Le modèle (séquentiel) est coupé après la dernière convolution : les couches suivantes sont
+    rejouées sous la bande sur les cartes observées, et le score dérivé est le logit (avant
+    softmax) de la classe, calculé avec les poids de la dernière couche Dense. Le lot est traité
+    comme les vues d'une même image (TTA) : la classe expliquée est celle de la moyenne des
+    probabilités, pour chaque vue. Sans modèle fourni, le checkpoint est chargé (ligne de commande).
+    """
+
+    def __init__(self, keras_model=None, model_path=MODEL_PATH, layer=None):
+        import tensorflow as tf
+        from serving import UINT8_INPUT_SHAPE, preprocess_in_graph
+
+        if keras_model is None:
+            keras_model = tf.keras.models.load_model(model_path)
+        self.layer = layer or last_conv_layer(keras_model).name
+        conv_layer = keras_model.get_layer(self.layer)
+        self.features_model = tf.keras.Model(keras_model.inputs, conv_layer.output)
+        head = keras_model.layers[keras_model.layers.index(conv_layer) + 1:-1]
+        classifier = keras_model.layers[-1]
+
+        def explain(images):
+            features = self.features_model(preprocess_in_graph(images), training=False)
+            with tf.GradientTape() as tape:
+                tape.watch(features)
+                hidden = features
+                for head_layer in head:
+                    hidden = head_layer(hidden, training=False)
+                logits = tf.matmul(hidden, classifier.kernel) + classifier.bias
+                probabilities = classifier.activation(logits)
+                target = tf.argmax(tf.reduce_mean(probabilities, axis=0))
+                score = tf.reduce_sum(logits[:, target])
+            gradients = tape.gradient(score, features)
+            weights = tf.reduce_mean(gradients, axis=(1, 2), keepdims=True)
+            cams = tf.nn.relu(tf.reduce_sum(weights * features, axis=-1))
+            cams /= tf.reduce_max(cams, axis=(1, 2), keepdims=True) + 1e-8
+            return probabilities, cams
+
+        self._explain = tf.function(explain, input_signature=[tf.TensorSpec(UINT8_INPUT_SHAPE, tf.uint8)])
+
+    def explain(self, images):
+        """(probabilités (N, 22) float32, cartes (N, h, w) uint8 0-255) d'un lot (N, H, W, 3) uint8"""
+        import tensorflow as tf
+
+        probabilities, cams = self._explain(tf.constant(np.asarray(images, dtype=np.uint8)))
+        return probabilities.numpy(), np.round(cams.numpy() * 255).astype(np.uint8)
+
+
+def explainer_for(model):
+    """Grad-CAM sur le modèle Keras du modèle servi ; ValueError pour les autres backends, dont
+    les prédictions (quantifiées, autre processus) ne seraient pas celles expliquées"""
+    from serving import keras_model_of
+
+    return GradCAM(keras_model_of(model, fallback=False))
+
+
+def gradcam_overlay(image, cam):
+    """Carte Grad-CAM uint8 (h, w) superposée à l'image (même rendu que la carte par zones)"""
+    from tiling import heatmap_overlay
+
+    return heatmap_overlay(image, np.asarray(cam, dtype=np.float32) / 255)
+
+
+def main(argv=None):
+    from decoding import decode_image
+    from inference import preprocess_uint8, top_k_results
+
+    parser = argparse.ArgumentParser(description="Prédiction et carte Grad-CAM d'une image")
+    parser.add_argument('image')
+    parser.add_argument('--output', help="Image PNG de la carte superposée")
+    args = parser.parse_args(argv)
+
+    explainer = GradCAM()
+    image = decode_image(args.image)
+    probabilities, cams = explainer.explain(preprocess_uint8(image))
+    for result in top_k_results(probabilities[0]):
+        print(f"{result['confidence']:6.2f}%  {result['disease']}")
+    if args.output:
+        gradcam_overlay(image, cams[0]).save(args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""Fonctions d'inférence partagées entre l'application Streamlit et les outils en ligne de commande"""
+import numpy as np
+from PIL import Image
+
+from decoding import to_rgb
+from disease_info import DISEASE_INFO
+
+# Chemin du modèle et taille d'entrée attendue
+MODEL_PATH = 'checkpoints_projet/model_vgg16.keras'
+IMAGE_SIZE = (64, 64)
+TOP_K = 5
+
+# Dictionnaire des classes avec leurs indices
+CLASSES_PREDICTION = {
+    'Acne': 0,
+    'Actinic_Keratosis': 1,  # Attention: dans DISEASE_INFO c'est 'Actinic Keratosis' avec un espace
+    'Benign_tumors': 2,       # Attention: dans DISEASE_INFO c'est 'Benign Tumors' avec un espace
+    'Bullous': 3,
+    'Candidiasis': 4,
+    'DrugEruption': 5,        # Attention: dans DISEASE_INFO c'est 'Drug Eruption' avec un espace
+    'Eczema': 6,
+    'Infestations_Bites': 7, # Attention: dans DISEASE_INFO c'est 'Infestations/Bites' avec un slash
+    'Lichen': 8,
+    'Lupus': 9,
+    'Moles': 10,
+    'Psoriasis': 11,
+    'Rosacea': 12,
+    'Seborrh_Keratoses': 13,  # Attention: dans DISEASE_INFO c'est 'Seborrheic Keratoses'
+    'SkinCancer': 14,         # Attention: dans DISEASE_INFO c'est 'Skin Cancer' avec un espace
+    'Sun_Sunlight_Damage': 15, # Attention: dans DISEASE_INFO c'est 'Sun/Sunlight Damage' avec un slash
+    'Tinea': 16,
+    'Unknown_Normal': 17,     # Attention: dans DISEASE_INFO c'est 'Unknown/Normal' avec un slash
+    'Vascular_Tumors': 18,    # Attention: dans DISEASE_INFO c'est 'Vascular Tumors' avec un espace
+    'Vasculitis': 19,
+    'Vitiligo': 20,
+    'Warts': 21
+}
+
+# Dictionnaire inverse pour récupérer le nom à partir de l'indice
+INDEX_TO_CLASS = {v: k for k, v in CLASSES_PREDICTION.items()}
+
+# Mapping vers les noms utilisés dans DISEASE_INFO
+MODEL_TO_DISEASE_INFO = {
+    'Actinic_Keratosis': 'Actinic Keratosis',
+    'Benign_tumors': 'Benign Tumors',
+    'DrugEruption': 'Drug Eruption',
+    'Infestations_Bites': 'Infestations/Bites',
+    'Seborrh_Keratoses': 'Seborrheic Keratoses',
+    'SkinCancer': 'Skin Cancer',
+    'Sun_Sunlight_Damage': 'Sun/Sunlight Damage',
+    'Unknown_Normal': 'Unknown/Normal',
+    'Vascular_Tumors': 'Vascular Tumors'
+}
+
+
+class LabelSpace:
+    """Espace des étiquettes construit une fois : indice → étiquette modèle → clé DISEASE_INFO"""
+
+    def __init__(self, classes_prediction, model_to_disease_info):
+        indices = sorted(classes_prediction.values())
+        if indices != list(range(len(indices))):
+            raise ValueError("Les indices de classes doivent être contigus à partir de 0")
+        index_to_class = {v: k for k, v in classes_prediction.items()}
+        self.model_labels = np.array([index_to_class[i] for i in indices], dtype=object)
+        self.disease_names = np.array(
+            [model_to_disease_info.get(label, label) for label in self.model_labels], dtype=object
+        )
+        self.disease_indices = {}
+        for index, name in enumerate(self.disease_names):
+            self.disease_indices.setdefault(name, index)
+
+    def __len__(self):
+        return len(self.model_labels)
+
+    def validate(self, disease_info):
+        """Vérifie que chaque classe du modèle a une entrée dans DISEASE_INFO"""
+        missing = [name for name in self.disease_names if name not in disease_info]
+        if missing:
+            raise ValueError(f"Classes du modèle absentes de DISEASE_INFO: {', '.join(missing)}")
+
+
+LABELS = LabelSpace(CLASSES_PREDICTION, MODEL_TO_DISEASE_INFO)
+LABELS.validate(DISEASE_INFO)
+
+
+def disease_name(index):
+    """Nom DISEASE_INFO correspondant à un indice de sortie du modèle"""
+    index = int(index)
+    return LABELS.disease_names[index] if 0 <= index < len(LABELS) else 'Unknown'
+
+
+def disease_index(name):
+    """Indice de sortie du modèle correspondant à un nom DISEASE_INFO (-1 s'il est inconnu)"""
+    return LABELS.disease_indices.get(name, -1)
+
+
+def preprocess_image(image):
+    """Préprocessing de l'image pour le modèle"""
+    img = to_rgb(image).resize(IMAGE_SIZE)  # Adaptez selon votre modèle
+    img_array = np.array(img) / 255.0
+    img_array = np.expand_dims(img_array, axis=0)
+    return img_array
+
+
+def preprocess_uint8(image):
+    """Préprocessing sans intermédiaire flottant : (1, 64, 64, 3) uint8, la normalisation
+    /255 est faite dans le graphe du modèle (voir ServingModel)"""
+    img = to_rgb(image).resize(IMAGE_SIZE)
+    return np.asarray(img, dtype=np.uint8)[np.newaxis]
+
+
+# Vues de l'augmentation au test (TTA), dans l'ordre : les `views` premières sont utilisées
+TTA_VIEWS = ('original', 'hflip', 'crop', 'vflip', 'rotate+10', 'rotate-10', 'crop-hflip', 'crop-vflip')
+TTA_CROP = 0.9     # fraction du côté conservée par le recadrage central
+TTA_ANGLE = 10.0   # rotation en degrés
+
+
+def preprocess_tta(image, views=len(TTA_VIEWS)):
+    """`views` vues augmentées d'une image, empilées en un seul lot (views, 64, 64, 3) uint8
+
+    La première vue est exactement preprocess_uint8(image). Les retournements sont des vues
+    numpy ; recadrage et rotations partent d'une seule réduction à ~71 px (64 / TTA_CROP) :
+    aucune vue ne repasse par l'image pleine résolution.
+    """
+    views = max(1, min(views, len(TTA_VIEWS)))
+    img = to_rgb(image)
+    base = np.asarray(img.resize(IMAGE_SIZE), dtype=np.uint8)
+    batch = np.empty((views, *base.shape), dtype=np.uint8)
+    batch[0] = base
+    if views == 1:
+        return batch
+
+    width, height = IMAGE_SIZE
+    large_size = (round(width / TTA_CROP), round(height / TTA_CROP))
+    large = img.resize(large_size)
+    left, top = (large_size[0] - width) // 2, (large_size[1] - height) // 2
+    crop = np.asarray(large, dtype=np.uint8)[top:top + height, left:left + width]
+
+    def rotated(angle):
+        # Rotation de l'image légèrement agrandie puis recadrage : pas de coins vides
+        return np.asarray(large.rotate(angle, Image.Resampling.BILINEAR), dtype=np.uint8)[
+            top:top + height, left:left + width]
+
+    makers = {
+        'hflip': lambda: base[:, ::-1],
+        'crop': lambda: crop,
+        'vflip': lambda: base[::-1],
+        'rotate+10': lambda: rotated(TTA_ANGLE),
+        'rotate-10': lambda: rotated(-TTA_ANGLE),
+        'crop-hflip': lambda: crop[:, ::-1],
+        'crop-vflip': lambda: crop[::-1],
+    }
+    for index, name in enumerate(TTA_VIEWS[1:views], start=1):
+        batch[index] = makers[name]()
+    return batch
+
+
+def aggregate_views(probabilities, method='mean'):
+    """Probabilités (1, 22) d'une image à partir de celles de ses vues (N, 22)
+
+    'mean' : moyenne arithmétique ; 'geometric' : moyenne géométrique renormalisée (une vue
+    très sûre d'elle pèse moins face à des vues qui écartent la classe).
+    """
+    probabilities = np.asarray(probabilities, dtype=np.float32)
+    if len(probabilities) == 1:
+        return probabilities
+    if method == 'geometric':
+        log_mean = np.log(np.maximum(probabilities, 1e-7)).mean(axis=0)
+        aggregated = np.exp(log_mean - log_mean.max())
+        return (aggregated / aggregated.sum())[np.newaxis]
+    if method != 'mean':
+        raise ValueError(f"Agrégation inconnue: {method}")
+    return probabilities.mean(axis=0, keepdims=True)
+
+
+def to_float_input(images):
+    """Entrée float32 dans [0, 1] pour les backends sans normalisation intégrée"""
+    images = np.asarray(images)
+    if images.dtype == np.uint8:
+        return images.astype(np.float32) / np.float32(255)
+    return images.astype(np.float32, copy=False)
+
+
+def to_uint8_input(images):
+    """Entrée uint8 brute (0-255), la normalisation étant faite par le backend ; une entrée float
+    dans [0, 1] (preprocess_image) est reconvertie sans perte"""
+    images = np.asarray(images)
+    if images.dtype == np.uint8:
+        return images
+    return np.clip(np.rint(images * 255), 0, 255).astype(np.uint8)
+
+
+def top_k_batch(probabilities, k=TOP_K):
+    """Top-k vectorisé sur une matrice (N, 22) : retourne (indices (N, k), probabilités (N, k))
+
+    argpartition sélectionne les k meilleures classes en O(C), seules ces k sont ensuite triées.
+    """
+    probabilities = np.asarray(probabilities)
+    if probabilities.ndim == 1:
+        probabilities = probabilities[np.newaxis]
+    k = min(k, probabilities.shape[1])
+    top = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+    top_probabilities = np.take_along_axis(probabilities, top, axis=1)
+    order = np.argsort(-top_probabilities, axis=1, kind='stable')
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_probabilities, order, axis=1)
+
+
+def results_from_top_k(indices, probabilities):
+    """Liste de dictionnaires attendue par l'interface, pour une ligne du top-k"""
+    return [
+        {
+            'disease': disease,
+            'probability': float(probability),  # Conversion en float pour éviter les erreurs
+            'confidence': float(probability * 100)
+        }
+        for disease, probability in zip(LABELS.disease_names[indices], probabilities)
+    ]
+
+
+def top_k_results(probabilities, k=TOP_K):
+    """Top-k des prédictions pour un vecteur de probabilités"""
+    indices, top_probabilities = top_k_batch(probabilities, k)
+    return results_from_top_k(indices[0], top_probabilities[0])
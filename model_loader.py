@@ -0,0 +1,146 @@
+"""Chargement du modèle en arrière-plan avec état de disponibilité (les pages ne l'attendent pas)
+
+build_model() est partagé par l'application Streamlit et l'API HTTP (api_server.py).
+"""
+import os
+import threading
+import time
+
+import config
+from inference import MODEL_PATH
+
+PENDING, LOADING, READY, FAILED = 'pending', 'loading', 'ready', 'failed'
+
+
+class BackgroundLoader:
+    """Exécute `build(progress)` dans un thread démon et expose son état
+
+    `build` reçoit une fonction `progress(fraction, message)` pour signaler son avancement
+    et retourne l'objet chargé (modèle, pool...). result() attend la fin du chargement.
+    Avec `delay`, le thread laisse d'abord la première page s'afficher : l'import de TensorFlow
+    garde le GIL l'essentiel du temps et ralentirait ce premier rendu.
+    """
+
+    def __init__(self, build, delay=0.0, name='model-loader'):
+        self._build = build
+        self.delay = delay
+        self._done = threading.Event()
+        self._hurry = threading.Event()
+        self._lock = threading.Lock()
+        self.state = PENDING
+        self.message = "En attente"
+        self.progress = 0.0
+        self.error = None
+        self.time_to_ready = None
+        self._value = None
+        self._started = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+                self.state = LOADING
+                self._thread.start()
+        return self
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def prioritize(self):
+        """Annule le délai restant : une page attend le modèle"""
+        self._hurry.set()
+
+    def result(self, timeout=None):
+        """Objet chargé ; bloque jusqu'à `timeout` secondes et relève l'erreur du chargement"""
+        self.start()
+        self.prioritize()
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Chargement non terminé: {self.message}")
+        if self.error is not None:
+            raise self.error
+        return self._value
+
+    def status(self):
+        """État, message, avancement (0-1), durée écoulée ou temps de disponibilité (s)"""
+        elapsed = self.time_to_ready
+        if elapsed is None and self._started is not None:
+            elapsed = time.perf_counter() - self._started
+        return {
+            'state': self.state,
+            'message': self.message,
+            'progress': self.progress,
+            'elapsed_seconds': elapsed,
+            'error': repr(self.error) if self.error is not None else None,
+        }
+
+    def _report(self, fraction, message):
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        self.message = message
+
+    def _run(self):
+        self._hurry.wait(self.delay)
+        try:
+            self._value = self._build(self._report)
+        except Exception as exc:
+            self.error = exc
+            self.state = FAILED
+            self.message = f"Échec du chargement: {exc}"
+        else:
+            self.state = READY
+            self._report(1.0, "Modèle prêt")
+        finally:
+            self.time_to_ready = time.perf_counter() - self._started
+            self._done.set()
+        print(f"[DermAI] {self.message} en {self.time_to_ready:.2f}s", flush=True)
+
+
+def served_artifact(backend=None):
+    """Fichier exporté servi par le backend configuré (None pour le modèle Keras)"""
+    backend = backend or config.INFERENCE_BACKEND
+    if backend.startswith('tflite-'):
+        from tflite_backend import tflite_path
+        return tflite_path(backend.split('-', 1)[1], config.TFLITE_DIR)
+    if backend == 'savedmodel':
+        return os.path.join(config.SAVEDMODEL_DIR, 'saved_model.pb')
+    return None
+
+
+def build_model(progress):
+    """Chargement du modèle selon la configuration, exécuté par le thread de préchargement"""
+    if config.WORKER_PROCESSES > 0:
+        # Pool de processus, chacun avec sa copie du modèle (tenseurs en mémoire partagée)
+        progress(0.1, f"Démarrage de {config.WORKER_PROCESSES} workers d'inférence")
+        from worker_pool import WorkerPool
+        return WorkerPool(
+            config.WORKER_PROCESSES,
+            config.INFERENCE_BACKEND,
+            MODEL_PATH,
+            threads_per_worker=config.WORKER_THREADS,
+            tflite_dir=config.TFLITE_DIR,
+            savedmodel_dir=config.SAVEDMODEL_DIR,
+        )
+
+    if config.INFERENCE_BACKEND.startswith('tflite-'):
+        # Modèle quantifié exécuté par l'interpréteur TFLite (exporté au besoin)
+        progress(0.1, "Chargement de l'interpréteur TFLite")
+        from tflite_backend import load_tflite_model
+        variant = config.INFERENCE_BACKEND.split('-', 1)[1]
+        return load_tflite_model(variant, config.TFLITE_DIR, config.TFLITE_THREADS)
+
+    progress(0.05, "Import de TensorFlow")
+    import tensorflow as tf
+    from serving import ServingModel, load_savedmodel
+
+    if config.INFERENCE_BACKEND == 'savedmodel':
+        # Fonctions de service déjà tracées, exportées une fois à côté du checkpoint
+        progress(0.6, "Chargement du SavedModel")
+        return load_savedmodel(MODEL_PATH, config.SAVEDMODEL_DIR)
+
+    # Remplacez cette ligne par le chargement de votre modèle réel
+    progress(0.6, "Chargement du modèle Keras")
+    model = tf.keras.models.load_model(MODEL_PATH)
+    # Fonction de service tracée et préchauffée (DERMAI_LEGACY_PREDICT=1 pour model.predict)
+    progress(0.8, "Préchauffage des fonctions de service")
+    return ServingModel(model, jit_compile=config.SERVING_XLA, legacy=config.SERVING_LEGACY_PREDICT)
@@ -1,15 +1,31 @@
 import streamlit as st
-import tensorflow as tf
 import numpy as np
-from PIL import Image
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 from datetime import datetime
 import hashlib
-from streamlit_carousel import carousel # Importez le composant carrousel
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.utils import img_to_array
+import io
+import os
+from decoding import ImageTooLargeError, decode_image
+from disease_info import DISEASE_INFO
+from atlas_search import SearchIndex
+from inference import (MODEL_PATH, aggregate_views, disease_index, disease_name, preprocess_tta,
+                       preprocess_uint8, top_k_results)
+from prediction_cache import PredictionCache, content_hash
+from prediction_log import PredictionLog
+from batching import MicroBatchScheduler
+from session_store import ImageCache, SessionPrediction, SessionStore, process_rss_bytes
+from model_loader import BackgroundLoader, build_model, served_artifact
+from timing import LatencyRecorder, RequestTimer, STAGES
+import charts
+import config
+import gradcam
+import similar_cases
+import static_assets
+import tiling
+import time
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# TensorFlow, Plotly, pandas et le carrousel sont importés par les pages qui s'en servent :
+# la page de connexion s'affiche sans les charger (voir benchmarks/bench_import.py)
 
 # Configuration de la page
 st.set_page_config(
@@ -79,164 +95,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Classes de maladies avec descriptions détaillées
-DISEASE_INFO = {
-    'Acne': {
-        'description': 'Affection cutanée commune caractérisée par des boutons, points noirs et kystes',
-        'symptoms': ['Boutons rouges', 'Points noirs', 'Points blancs', 'Kystes'],
-        'treatment': 'Nettoyage doux, rétinoïdes topiques, antibiotiques si nécessaire',
-        'prevalence': '85% des adolescents',
-        # 'picture':"SkinDisease/train/Acne/07AcnePittedScars.jpeg"
-    },
-    'Actinic Keratosis': {
-        'description': 'Lésions précancéreuses causées par l\'exposition au soleil',
-        'symptoms': ['Plaques rugueuses', 'Squames', 'Démangeaisons'],
-        'treatment': 'Cryothérapie, thérapie photodynamique, crèmes topiques',
-        'prevalence': '58 millions d\'Américains',
-        # 'picture': 'SkinDisease/train/Actinic_Keratosis/3-s2.0-B9780128133163000064-f06-02-9780128133163.jpeg'
-    },
-    'Benign Tumors': {
-        'description': 'Tumeurs cutanées non cancéreuses',
-        'symptoms': ['Croissance lente', 'Masse palpable', 'Changement de couleur'],
-        'treatment': 'Surveillance, excision chirurgicale si nécessaire',
-        'prevalence': 'Très commune',
-        # 'picture':'SkinDisease/train/Benign_tumors/20cystAnal0531041.jpeg'
-    },
-    'Bullous': {
-        'description': 'Maladies caractérisées par des bulles cutanées',
-        'symptoms': ['Bulles remplies de liquide', 'Érosions', 'Croûtes'],
-        'treatment': 'Corticostéroïdes, immunosuppresseurs',
-        'prevalence': 'Rare',
-        # 'picture':'SkinDisease/train/Bullous/Bullous_Impetigo_fee391183f15cb4d62773032fe0be92d.jpeg'
-    },
-    'Candidiasis': {
-        'description': 'Infection fongique causée par Candida',
-        'symptoms': ['Éruption rouge', 'Démangeaisons', 'Desquamation'],
-        'treatment': 'Antifongiques topiques ou oraux',
-        'prevalence': 'Commune',
-        # 'picture':"SkinDisease/train/Candidiasis/13CandidaAxillae0712041.jpeg"
-    },
-    'Drug Eruption': {
-        'description': 'Réaction cutanée aux médicaments',
-        'symptoms': ['Éruption cutanée', 'Démangeaisons', 'Fièvre possible'],
-        'treatment': 'Arrêt du médicament, corticostéroïdes',
-        'prevalence': '2-3% des hospitalisations',
-        # 'picture':'SkinDisease/train/DrugEruption/drug-eruption-photosensitivity-12.jpeg'
-    },
-    'Eczema': {
-        'description': 'Dermatite atopique, inflammation chronique de la peau',
-        'symptoms': ['Démangeaisons intenses', 'Peau sèche', 'Rougeurs'],
-        'treatment': 'Hydratants, corticostéroïdes topiques, éviction allergènes',
-        'prevalence': '10-20% des enfants',
-        # 'picture':'SkinDisease/train/Eczema/3Eczema3-300.jpeg'
-    },
-    'Infestations/Bites': {
-        'description': 'Lésions causées par des insectes ou parasites',
-        'symptoms': ['Démangeaisons', 'Papules', 'Traces de morsures'],
-        'treatment': 'Antihistaminiques, insecticides topiques',
-        'prevalence': 'Saisonnière',
-        # 'picture':'SkinDisease/train/Infestations_Bites/1370__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsInkiLDdd.jpeg'
-    },
-    'Lichen': {
-        'description': 'Maladie inflammatoire chronique de la peau',
-        'symptoms': ['Papules violacées', 'Démangeaisons', 'Lignes de Wickham'],
-        'treatment': 'Corticostéroïdes topiques, rétinoïdes',
-        'prevalence': '0.2-1% population',
-        # 'picture':'SkinDisease/train/Lichen/3063__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsInkiLDM2XQ.jpeg'
-    },
-    'Lupus': {
-        'description': 'Maladie auto-immune systémique affectant la peau',
-        'symptoms': ['Éruption en papillon', 'Photosensibilité', 'Ulcères'],
-        'treatment': 'Immunosuppresseurs, protection solaire',
-        'prevalence': '0.1% population',
-        # 'picture':'SkinDisease/train/Lupus/2521__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsInkiLDM2XQ.jpeg'
-    },
-    'Moles': {
-        'description': 'Naevus mélanocytaires, taches pigmentées bénignes',
-        'symptoms': ['Taches brunes/noires', 'Bordures régulières', 'Symétrie'],
-        'treatment': 'Surveillance, excision si suspect',
-        'prevalence': '10-40 grains par personne',
-        # 'picture':'SkinDisease/train/Moles/3153__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsIngiLDFd.jpeg'
-    },
-    'Psoriasis': {
-        'description': 'Maladie auto-immune chronique avec plaques squameuses',
-        'symptoms': ['Plaques rouges épaisses', 'Squames argentées', 'Démangeaisons'],
-        'treatment': 'Corticostéroïdes, méthotrexate, biologiques',
-        'prevalence': '2-3% population mondiale',
-        # 'picture':'SkinDisease/train/Psoriasis/8Psoriasis2-127.jpeg'
-    },
-    'Rosacea': {
-        'description': 'Affection inflammatoire chronique du visage',
-        'symptoms': ['Rougeurs persistantes', 'Papules', 'Télangiectasies'],
-        'treatment': 'Métronidazole topique, éviction déclencheurs',
-        'prevalence': '5.5% population adulte',
-        # 'picture':'SkinDisease/train/Rosacea/07RosaceaK02161.jpeg'
-    },
-    'Seborrheic Keratoses': {
-        'description': 'Lésions bénignes verruqueuses liées à l\'âge',
-        'symptoms': ['Plaques brunes/noires', 'Surface verruqueuse', 'Bien délimitées'],
-        'treatment': 'Cryothérapie, électrocoagulation',
-        'prevalence': '>90% après 60 ans',
-        # 'picture':'SkinDisease/train/Seborrh_Keratoses/sebks01__ProtectWyJQcm90ZWN0Il0_FocusFillWzI5NCwyMjIsIngiLDBd.jpeg'
-    },
-    'Skin Cancer': {
-        'description': 'Tumeurs malignes de la peau',
-        'symptoms': ['Asymétrie', 'Bordures irrégulières', 'Couleur variée', 'Diamètre >6mm'],
-        'treatment': 'Excision chirurgicale, chimiothérapie, radiothérapie',
-        'prevalence': '1 sur 5 Américains',
-        # 'picture':'SkinDisease/train/SkinCancer/basal-cell-carcinoma-aldara-3.jpeg'
-    },
-    'Sun/Sunlight Damage': {
-        'description': 'Dommages cutanés causés par l\'exposition UV',
-        'symptoms': ['Taches de vieillesse', 'Rides', 'Texture rugueuse'],
-        'treatment': 'Protection solaire, rétinoïdes, peelings',
-        'prevalence': '>90% adultes',
-        # 'picture':'SkinDisease/train/Sun_Sunlight_Damage/actinic-comedones-2.jpeg'
-    },
-    'Tinea': {
-        'description': 'Infections fongiques superficielles',
-        'symptoms': ['Plaques circulaires', 'Bordure surélevée', 'Desquamation'],
-        'treatment': 'Antifongiques topiques ou oraux',
-        'prevalence': '10-20% population',
-        # 'picture':'SkinDisease/train/Tinea/13tineaCApitis98-GP3.jpeg'
-    },
-    'Unknown/Normal': {
-        'description': 'Peau normale ou condition non identifiée',
-        'symptoms': ['Aucun symptôme particulier'],
-        'treatment': 'Aucun traitement nécessaire',
-        'prevalence': 'Variable',
-        # 'picture':'SkinDisease/train/Unknown_Normal/Image3.jpeg'
-    },
-    'Vascular Tumors': {
-        'description': 'Tumeurs des vaisseaux sanguins',
-        'symptoms': ['Lésions rouges/violacées', 'Croissance progressive'],
-        'treatment': 'Laser, sclérose, chirurgie',
-        'prevalence': '10% nouveau-nés',
-        # 'picture':'SkinDisease/train/Vascular_Tumors/angiokeratomas-4.jpeg'
-    },
-    'Vasculitis': {
-        'description': 'Inflammation des vaisseaux sanguins',
-        'symptoms': ['Purpura', 'Ulcères', 'Nodules'],
-        'treatment': 'Corticostéroïdes, immunosuppresseurs',
-        'prevalence': 'Rare',
-        # 'picture':'SkinDisease/train/Vasculitis/atrophy-blanche-4.jpeg'
-    },
-    'Vitiligo': {
-        'description': 'Perte de pigmentation cutanée',
-        'symptoms': ['Taches blanches', 'Dépigmentation progressive'],
-        'treatment': 'Corticostéroïdes, photothérapie, greffes',
-        'prevalence': '0.5-2% population',
-        # 'picture':'SkinDisease/train/Vitiligo/Image3.jpeg'
-    },
-    'Warts': {
-        'description': 'Verrues causées par le virus HPV',
-        'symptoms': ['Papules rugueuses', 'Surface kératosique'],
-        'treatment': 'Cryothérapie, acide salicylique, laser',
-        'prevalence': '7-12% population',
-        # 'picture':'SkinDisease/train/Warts/11AnalWarts090801.jpeg'
-    }
-}
-
 # Fonction d'authentification simple
 def authenticate_user(username, password):
     """Authentification simple avec hash MD5"""
@@ -275,133 +133,180 @@ def login_page():
         """)
 
 @st.cache_resource
+def get_model_loader():
+    """Chargement du modèle en arrière-plan, partagé par toutes les sessions"""
+    return BackgroundLoader(build_model, delay=config.PRELOAD_DELAY_SECONDS).start()
+
 def load_model():
-    """Chargement du modèle (remplacez par votre modèle réel)"""
-    # Remplacez cette ligne par le chargement de votre modèle réel
-    model = tf.keras.models.load_model('checkpoints_projet/model_vgg16.keras')
-    # Pour la démo, on simule un modèle
-    return model
-
-def preprocess_image(image):
-    """Préprocessing de l'image pour le modèle"""
-    img = image.resize((64, 64))  # Adaptez selon votre modèle
-    img_array = np.array(img) / 255.0
-    img_array = np.expand_dims(img_array, axis=0)
-    return img_array
-
-def predict_disease(image, model):
+    """Modèle chargé (attend la fin du chargement si nécessaire)"""
+    return get_model_loader().result()
+
+@st.cache_resource
+def get_inference_scheduler():
+    """Ordonnanceur de micro-lots partagé, créé à côté du modèle en cache"""
+    return MicroBatchScheduler(
+        load_model().predict,
+        max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+        max_wait_ms=config.MICRO_BATCH_MAX_WAIT_MS,
+        workers=max(1, config.WORKER_PROCESSES),
+    )
+
+def get_model():
+    """Modèle utilisé par predict_disease : l'ordonnanceur partagé ou le modèle direct"""
+    return get_inference_scheduler() if config.MICRO_BATCHING else load_model()
+
+@st.cache_resource
+def get_atlas_index():
+    """Index de recherche de l'Atlas (termes, trigrammes, trie), construit une fois pour toutes les sessions"""
+    return SearchIndex(DISEASE_INFO)
+
+@st.cache_resource
+def get_prediction_cache():
+    """Cache des prédictions partagé entre toutes les sessions"""
+    return PredictionCache(
+        MODEL_PATH,
+        max_entries=config.PREDICTION_CACHE_SIZE,
+        cache_dir=config.PREDICTION_CACHE_DIR,
+        max_disk_entries=config.PREDICTION_CACHE_DISK_SIZE,
+        backend=config.INFERENCE_BACKEND,
+        artifact_path=served_artifact(),  # empreinte lue à la première clé, après l'export au chargement
+    )
+
+@st.cache_resource
+def get_prediction_log():
+    """Journal persistant des classifications (None si désactivé)"""
+    if not config.PREDICTION_LOG_PATH:
+        return None
+    return PredictionLog(config.PREDICTION_LOG_PATH, flush_interval=config.PREDICTION_LOG_FLUSH_SECONDS)
+
+@st.cache_resource
+def get_static_assets():
+    """Construit une fois par processus les images statiques périmées (voir static_assets.py)"""
+    static_assets.build()
+    return st.get_option('server.enableStaticServing')
+
+def static_asset_url(path, absolute=False):
+    """URL d'une image construite : fichier statique mis en cache par le navigateur, ou URL data:"""
+    return static_assets.asset_url(path, get_static_assets(), st.get_option('server.baseUrlPath'), absolute)
+
+def carousel_image(name):
+    """Vignette WebP du carrousel à la largeur du mode courant (URL absolue : le composant est une iframe)"""
+    width = static_assets.carousel_width(light_mode())
+    return static_asset_url(static_assets.carousel_path(name, width), absolute=True)
+
+@st.cache_resource
+def get_session_store():
+    """Dernière prédiction de chaque session (forme compacte), sessions inactives évincées"""
+    return SessionStore(idle_seconds=config.SESSION_IDLE_SECONDS)
+
+@st.cache_resource
+def get_image_cache():
+    """Images décodées partagées entre sessions, par hash de contenu, dans un budget d'octets"""
+    return ImageCache(config.IMAGE_CACHE_MAX_BYTES)
+
+def session_id():
+    """Identifiant de la session Streamlit courante"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else 'local'
+
+@st.cache_resource
+def get_explainer():
+    """Grad-CAM partageant le modèle chargé : prédiction et explication en une seule passe"""
+    return gradcam.explainer_for(load_model())
+
+@st.cache_resource
+def get_case_index():
+    """Index des cas de référence (None tant que `python similar_cases.py index` n'a pas été lancé)"""
+    if not os.path.exists(os.path.join(config.CASES_INDEX_DIR, similar_cases.METADATA_FILE)):
+        return None
+    return similar_cases.CaseIndex.load(config.CASES_INDEX_DIR)
+
+@st.cache_resource
+def get_embedding_extractor():
+    """Avant-dernière couche du modèle chargé, pour la recherche de cas similaires"""
+    return similar_cases.extractor_for(load_model())
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def find_similar_cases(digest, _image):
+    """Cas de référence les plus proches d'une image, mémoïsés par hash de contenu"""
+    embedding = get_embedding_extractor().embed_image(_image)
+    cases = get_case_index().similar(embedding, config.CASES_TOP_K, config.CASES_NPROBE or None)
+    return [case for case in cases if os.path.exists(case['path'])]
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def analyze_tiles(digest, _data, _timer=None):
+    """Analyse par zones d'une photo redécodée en haute résolution, mémoïsée par hash de contenu"""
+    timer = _timer or RequestTimer()
+    with timer.stage('decode'):
+        image = decode_image(io.BytesIO(_data), size=config.TILE_DECODE_SIZE, max_pixels=config.DECODE_MAX_PIXELS)
+    return tiling.analyze(image, get_model(), config.TILE_SCALES, config.TILE_OVERLAP,
+                          aggregate=config.TILE_AGGREGATE, timer=timer, max_tiles=config.TILE_MAX_TILES)
+
+@st.cache_resource
+def get_latency_recorder():
+    """Latences par étape partagées entre toutes les sessions"""
+    return LatencyRecorder(window=config.LATENCY_WINDOW)
+
+def light_mode():
+    """Mode léger (clients peu puissants ou distants) : graphiques natifs au lieu de Plotly,
+    image fixe dans la barre latérale et vignettes réduites dans le carrousel"""
+    return st.session_state.get('light_mode', config.LIGHT_MODE)
+
+def show_bar(x, y, title, x_label, y_label, color=None, color_label=None):
+    """Barres Plotly mémoïsées par leurs données, ou st.bar_chart en mode léger"""
+    if light_mode():
+        st.caption(title)
+        st.bar_chart({x_label: list(x), y_label: list(y)}, x=x_label, y=y_label)
+        return
+    fig = charts.bar(tuple(x), tuple(y), title, x_label, y_label,
+                     tuple(color) if color is not None else None, color_label)
+    st.plotly_chart(fig, use_container_width=True)
+
+def predict_disease(image, model, timer=None):
     """Prédiction de la maladie (corrigée)"""
     if image is None:
         return
-    
-    # Dictionnaire des classes avec leurs indices
-    classes_prediction = {
-        'Acne': 0,
-        'Actinic_Keratosis': 1,  # Attention: dans DISEASE_INFO c'est 'Actinic Keratosis' avec un espace
-        'Benign_tumors': 2,       # Attention: dans DISEASE_INFO c'est 'Benign Tumors' avec un espace
-        'Bullous': 3,
-        'Candidiasis': 4,
-        'DrugEruption': 5,        # Attention: dans DISEASE_INFO c'est 'Drug Eruption' avec un espace
-        'Eczema': 6,
-        'Infestations_Bites': 7, # Attention: dans DISEASE_INFO c'est 'Infestations/Bites' avec un slash
-        'Lichen': 8,
-        'Lupus': 9,
-        'Moles': 10,
-        'Psoriasis': 11,
-        'Rosacea': 12,
-        'Seborrh_Keratoses': 13,  # Attention: dans DISEASE_INFO c'est 'Seborrheic Keratoses'
-        'SkinCancer': 14,         # Attention: dans DISEASE_INFO c'est 'Skin Cancer' avec un espace
-        'Sun_Sunlight_Damage': 15, # Attention: dans DISEASE_INFO c'est 'Sun/Sunlight Damage' avec un slash
-        'Tinea': 16,
-        'Unknown_Normal': 17,     # Attention: dans DISEASE_INFO c'est 'Unknown/Normal' avec un slash
-        'Vascular_Tumors': 18,    # Attention: dans DISEASE_INFO c'est 'Vascular Tumors' avec un espace
-        'Vasculitis': 19,
-        'Vitiligo': 20,
-        'Warts': 21
-    }
-    
-    # Dictionnaire inverse pour récupérer le nom à partir de l'indice
-    index_to_class = {v: k for k, v in classes_prediction.items()}
-    
-    # Mapping vers les noms utilisés dans DISEASE_INFO
-    model_to_disease_info = {
-        'Actinic_Keratosis': 'Actinic Keratosis',
-        'Benign_tumors': 'Benign Tumors',
-        'DrugEruption': 'Drug Eruption',
-        'Infestations_Bites': 'Infestations/Bites',
-        'Seborrh_Keratoses': 'Seborrheic Keratoses',
-        'SkinCancer': 'Skin Cancer',
-        'Sun_Sunlight_Damage': 'Sun/Sunlight Damage',
-        'Unknown_Normal': 'Unknown/Normal',
-        'Vascular_Tumors': 'Vascular Tumors'
-    }
+    timer = timer or RequestTimer()
+
+    # Prédiction du modèle (une seule passe pour toutes les vues en mode TTA)
+    with timer.stage('inference'):
+        predictions = model.predict(image)
+
+    # Agrégation des vues puis top 5 (même mapping que le mode batch)
+    with timer.stage('postprocess'):
+        results = top_k_results(aggregate_views(predictions, config.TTA_AGGREGATE)[0])
 
-    # Prédiction du modèle
-    predictions = model.predict(image)
-    predicted_class_index = np.argmax(predictions[0])
-    
-    # Récupération du nom de la classe prédite
-    predicted_class_name = index_to_class.get(predicted_class_index, 'Unknown')
-    
-    # Mapping vers le nom utilisé dans DISEASE_INFO
-    disease_name = model_to_disease_info.get(predicted_class_name, predicted_class_name)
-    
     # Affichage du résultat principal
-    st.success(f'🎯 **Classe prédite:** {disease_name}')
-    
-    # Préparation des résultats pour le top 5
-    probabilities = predictions[0]
-    
-    # Tri par probabilité décroissante
-    sorted_indices = np.argsort(probabilities)[::-1]
-    
-    results = []
-    for i in sorted_indices[:5]:  # Top 5 prédictions
-        model_class_name = index_to_class.get(i, 'Unknown')
-        # Conversion vers le nom DISEASE_INFO
-        final_disease_name = model_to_disease_info.get(model_class_name, model_class_name)
-        
-        results.append({
-            'disease': final_disease_name,
-            'probability': float(probabilities[i]),  # Conversion en float pour éviter les erreurs
-            'confidence': float(probabilities[i] * 100)
-        })
-    
+    st.success(f'🎯 **Classe prédite:** {results[0]["disease"]}')
+
     return results
 
+def explain_disease(image, timer=None):
+    """Prédiction et carte Grad-CAM de la classe prédite, en une passe avant/arrière"""
+    timer = timer or RequestTimer()
+
+    # Passe partagée (étape 'explain' : comparable à 'inference' dans les statistiques)
+    with timer.stage('explain'):
+        predictions, cams = get_explainer().explain(image)
+
+    with timer.stage('postprocess'):
+        results = top_k_results(aggregate_views(predictions, config.TTA_AGGREGATE)[0])
+
+    st.success(f'🎯 **Classe prédite:** {results[0]["disease"]}')
+
+    return results, cams[0]
+
 def search_diseases_by_symptoms(query):
-    """Recherche des maladies par symptômes ou descriptions"""
+    """Recherche des maladies par symptômes ou descriptions (classées par pertinence)"""
     if not query:
         return list(DISEASE_INFO.keys())
     
-    query = query.lower()
-    matching_diseases = []
-    
-    for disease, info in DISEASE_INFO.items():
-        # Recherche dans le nom de la maladie
-        if query in disease.lower():
-            matching_diseases.append(disease)
-            continue
-            
-        # Recherche dans la description
-        if query in info['description'].lower():
-            matching_diseases.append(disease)
-            continue
-            
-        # Recherche dans les symptômes
-        for symptom in info['symptoms']:
-            if query in symptom.lower():
-                matching_diseases.append(disease)
-                break
-                
-        # Recherche dans le traitement
-        if query in info['treatment'].lower():
-            matching_diseases.append(disease)
-    
-    return matching_diseases
+    return get_atlas_index().search(query)
 
 def main_app():
     """Application principale"""
+    get_session_store().touch(session_id(), st.session_state.get('username'))
+    
     # Sidebar
     with st.sidebar:
         st.markdown("### 👋 Bienvenue")
@@ -409,6 +314,7 @@ def main_app():
         
         if st.button("🚪 Déconnexion"):
             st.session_state['authenticated'] = False
+            get_session_store().discard(session_id())
             st.experimental_rerun()
         
         st.markdown("---")
@@ -429,22 +335,26 @@ def main_app():
         else:
             page = st.selectbox("📑 Navigation", pages)
         st.markdown("---")
+        
+        # Graphiques natifs et images allégées pour les clients peu puissants ou distants
+        if 'light_mode' not in st.session_state:
+            st.session_state['light_mode'] = config.LIGHT_MODE
+        st.toggle("🪶 Mode léger", key='light_mode', help="Graphiques natifs et images allégées")
  
         st.text("")
 
-        # Afficher le GIF
-        st.image("assets/4.gif", use_column_width=True)
+        # Animation WebP servie en fichier statique (image fixe en mode léger)
+        st.image(static_asset_url(static_assets.sidebar_path(poster=light_mode())), use_column_width=True)
     
     # Header principal
     st.markdown('<div class="main-header"><h1>🏥 DermAI</h1><p>Intelligence Artificielle pour le Diagnostic Dermatologique</p></div>', unsafe_allow_html=True)
     
-    # Chargement du modèle
-    model = load_model()
-    
     if page == "🏠 Accueil":
         home_page()
     elif page == "🔍 Classification":
-        classification_page(model)
+        # Le modèle se charge en arrière-plan : les autres pages ne l'attendent pas
+        if wait_for_model(get_model_loader()):
+            classification_page(get_model())
     elif page == "📚 Atlas des Maladies":
         atlas_page()
     elif page == "📊 Statistiques":
@@ -458,6 +368,32 @@ def main_app():
         about_page()
 
 
+def wait_for_model(loader):
+    """Affiche l'avancement du préchauffage jusqu'à ce que le modèle soit prêt ; False en cas d'échec
+
+    Après un échec, le bouton « Réessayer » oublie le chargeur en cache : le rerun en relance un.
+    """
+    loader.prioritize()
+    notice = st.empty()
+    bar = st.progress(0.0)
+    while not loader.ready:
+        status = loader.status()
+        if status['state'] == 'failed':
+            bar.empty()
+            notice.error(f"❌ {status['message']}")
+            if st.button("🔄 Réessayer le chargement", key='retry_model_load'):
+                get_model_loader.clear()
+                st.rerun()
+            return False
+        notice.info(f"⏳ Modèle en cours de préchauffage : {status['message']} "
+                    f"({status['elapsed_seconds'] or 0:.0f}s)")
+        bar.progress(status['progress'])
+        time.sleep(0.5)
+    notice.empty()
+    bar.empty()
+    return True
+
+
 def home_page():
     """Page d'accueil"""
 
@@ -465,22 +401,24 @@ def home_page():
     # Définissez les éléments de votre carrousel ici
     # Vous pouvez utiliser des images locales (assurez-vous que les chemins sont corrects)
     # ou des URLs d'images en ligne.
+    from streamlit_carousel import carousel # Importez le composant carrousel
+    
     carousel_items = [
         dict(
             title="Bienvenue sur notre plateforme!",
             text="Détection avancée des maladies de la peau par IA.",
-            img="assets/2.jpg", # Exemple d'image
+            img=carousel_image("2.jpg"), # Exemple d'image
             # Vous pouvez ajouter un lien si vous le souhaitez: link="https://votre_lien.com"
         ),
         dict(
             title="Précision et Fiabilité",
             text="Un modèle entraîné sur 22 catégories de maladies.",
-            img="assets/3.jpg", # Exemple d'image
+            img=carousel_image("3.jpg"), # Exemple d'image
         ),
         dict(
             title="Pour les Professionnels",
             text="Un atlas médical complet et des analyses statistiques.",
-            img="assets/355d4716ca9b46301e5b38ac9e01c4a0.jpg", # Exemple d'image
+            img=carousel_image("355d4716ca9b46301e5b38ac9e01c4a0.jpg"), # Exemple d'image
         )
     ]
 
@@ -527,9 +465,10 @@ def home_page():
         """)
 
         st.markdown("## 📈 Statistiques")
-        st.metric("Maladies détectables", "22", "")
+        prediction_log = get_prediction_log()
+        st.metric("Maladies détectables", len(DISEASE_INFO), "")
         st.metric("Précision du modèle", "94.5%", "2.3%")
-        st.metric("Images analysées", "25,000+", "")
+        st.metric("Images analysées", f"{prediction_log.totals()['analyses']:,}" if prediction_log else "—", "")
 def classification_page(model):
     """Page de classification"""
     st.markdown("## 🔍 Classification des Maladies de Peau")
@@ -566,104 +505,174 @@ def classification_page(model):
         col1, col2 = st.columns([1, 1])
         
         with col1:
-            image = Image.open(image_to_process)
+            decode_start = time.perf_counter()
+            digest = content_hash(image_to_process.getvalue())
+            try:
+                # Décodée une fois par contenu, partagée entre reruns et sessions
+                image = get_image_cache().get_or_decode(
+                    digest, lambda: decode_image(image_to_process, max_pixels=config.DECODE_MAX_PIXELS)
+                )
+            except (ImageTooLargeError, OSError) as exc:  # OSError : format inconnu, fichier tronqué
+                st.error(f"❌ Image illisible ou trop grande: {exc}")
+                return
+            decode_seconds = time.perf_counter() - decode_start
             source_text = "Image téléchargée" if uploaded_file else "Photo prise"
             st.image(image, caption=source_text, use_column_width=True)
             
+            # Plusieurs vues (retournements, recadrage, rotations) analysées en un seul lot
+            tta = st.checkbox("🔁 Analyse robuste (TTA)", value=config.TTA_ENABLED,
+                              help="Moyenne des prédictions sur des vues légèrement modifiées de l'image")
+            tiled = st.checkbox("🧩 Analyse par zones (haute résolution)", value=config.TILED_ENABLED,
+                                help="Fenêtres glissantes sur la photo entière et carte des probabilités")
+            # Grad-CAM rejoue le modèle Keras : seulement quand c'est lui qui sert les prédictions
+            explainable = config.INFERENCE_BACKEND == 'keras' and not config.WORKER_PROCESSES
+            explain = st.checkbox(
+                "💡 Expliquer la prédiction (Grad-CAM)", value=config.GRADCAM_ENABLED and explainable,
+                disabled=tiled or not explainable,
+                help=("Zones de l'image qui ont le plus pesé dans la classe prédite" if explainable else
+                      "Disponible avec le backend Keras dans ce processus (DERMAI_BACKEND=keras, sans workers)"))
+            explain = explain and explainable and not tiled
+            
             # Bouton d'analyse
             if st.button("🔬 Analyser l'image", type="primary"):
                 with st.spinner("🤖 Analyse en cours..."):
-                    # Simulation d'un délai de traitement
-                    import time
-                    time.sleep(2)
+                    # Délai artificiel de démonstration (désactivé par défaut)
+                    if config.SIMULATED_DELAY_SECONDS > 0:
+                        time.sleep(config.SIMULATED_DELAY_SECONDS)
                     
-                    # Prédiction
-                    image_array= preprocess_image(image)
-                    results = predict_disease(image_array, model)
-                    st.session_state['prediction_results'] = results
+                    timer = RequestTimer(get_latency_recorder())
+                    timer.add('decode', decode_seconds)
+                    
+                    # Prédiction (ou résultat en cache pour une image identique)
+                    cache = get_prediction_cache()
+                    variant = f"tta{config.TTA_VIEWS}-{config.TTA_AGGREGATE}" if tta else None
+                    # Le nombre de fenêtres ne dépend que des proportions : vérifiable sur l'image affichée
+                    if tiled and not tiling.fit_scales(image.size, config.TILE_SCALES, config.TILE_OVERLAP,
+                                                       config.TILE_MAX_TILES or float('inf')):
+                        st.warning("⚠️ Image trop allongée pour l'analyse par zones : analyse de l'image entière")
+                        tiled = False
+                    if tiled:
+                        variant = (f"tiles{config.TILE_DECODE_SIZE[0]}-{config.TILE_SCALES}-"
+                                   f"{config.TILE_OVERLAP}-{config.TILE_AGGREGATE}-{config.TILE_MAX_TILES}")
+                    elif explain:
+                        # Résultats de la passe Grad-CAM enregistrés à part, avec leur carte
+                        variant = f"{variant}-gradcam" if variant else 'gradcam'
+                    cache_key = cache.key_for_hash(digest, variant)
+                    results = cache.get(cache_key)
+                    explanation = cache.get_explanation(cache_key) if explain and results is not None else None
+                    cached = results is not None and (explanation is not None or not explain)
+                    if results is None and tiled:
+                        # Toutes les fenêtres passent par le modèle en grands lots
+                        results = analyze_tiles(digest, image_to_process.getvalue(), timer).results()
+                        st.success(f'🎯 **Classe prédite:** {results[0]["disease"]}')
+                        cache.put(cache_key, results)
+                    elif not cached:
+                        with timer.stage('preprocess'):
+                            image_array = preprocess_tta(image, config.TTA_VIEWS) if tta else preprocess_uint8(image)
+                        if explain:
+                            results, explanation = explain_disease(image_array, timer)
+                        else:
+                            results = predict_disease(image_array, model, timer)
+                        cache.put(cache_key, results, explanation)
+                    else:
+                        st.success(f'🎯 **Classe prédite:** {results[0]["disease"]}')
+                    latency = timer.finish()
+                    get_session_store().put(session_id(), SessionPrediction.from_results(digest, results))
+                    st.session_state['tiled_digest'] = digest if tiled else None
+                    st.session_state['explanation_key'] = cache_key if explain else None
+                    
+                    # Journalisation hors du chemin de la requête (écriture par lots en arrière-plan)
+                    prediction_log = get_prediction_log()
+                    if prediction_log is not None:
+                        prediction_log.record(
+                            digest,
+                            [disease_index(result['disease']) for result in results],
+                            [result['probability'] for result in results],
+                            latency * 1000,
+                            user=st.session_state.get('username'),
+                            cached=cached,
+                        )
         
         with col2:
-            if 'prediction_results' in st.session_state:
-                results = st.session_state['prediction_results']
-                
-                st.markdown("### 🎯 Résultats de l'Analyse")
-                
-                # Résultat principal
-                top_result = results[0]
-                st.markdown(f"""
-                <div class="prediction-box">
-                    <h2>🏆 Diagnostic Principal</h2>
-                    <h3>{top_result['disease']}</h3>
-                    <h4>Confiance: {top_result['confidence']:.1f}%</h4>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Graphique des probabilités
-                diseases = [r['disease'] for r in results]
-                probabilities = [r['probability'] for r in results]
-
-                # Création du graphique horizontal
-                fig = px.bar(
-                    x=probabilities, 
-                    y=diseases,
-                    orientation='h',
-                    title="Top 5 des Prédictions",
-                    labels={'x': 'Probabilité', 'y': 'Maladie'},
-                    color=probabilities,
-                    color_continuous_scale='viridis',
-                    text=[f"{p:.1%}" for p in probabilities]  # Affichage des pourcentages
-                )
+            prediction = get_session_store().get(session_id())
+            if prediction is not None:
+                with get_latency_recorder().stage('render'):
+                    display_prediction_results(prediction.results())
+                    if st.session_state.get('tiled_digest') == prediction.content_hash == digest:
+                        display_heatmap(analyze_tiles(digest, image_to_process.getvalue()), image)
+                    explanation_key = st.session_state.get('explanation_key')
+                    if explanation_key and prediction.content_hash == digest:
+                        explanation = get_prediction_cache().get_explanation(explanation_key)
+                        if explanation is not None:
+                            display_explanation(explanation, image, prediction.results()[0]['disease'])
+                if get_case_index() is not None and prediction.content_hash == digest:
+                    display_similar_cases(find_similar_cases(digest, image))
 
-                # Mise en forme du graphique
-                fig.update_layout(
-                    height=400,
-                    showlegend=False,
-                    xaxis_title="Probabilité de prédiction",
-                    yaxis_title="Maladies",
-                    title_x=0.5,
-                    font=dict(size=12)
-                )
+def display_explanation(cam, image, disease):
+    """Carte Grad-CAM de la classe prédite superposée à l'image analysée"""
+    st.markdown("### 💡 Zones Déterminantes (Grad-CAM)")
+    st.image(gradcam.gradcam_overlay(image, cam), use_column_width=True,
+             caption=f"Régions qui ont le plus contribué à « {disease} »")
 
-                # Affichage du texte sur les barres
-                fig.update_traces(textposition='inside')
+def display_heatmap(analysis, image):
+    """Carte des probabilités par zone d'une classe, superposée à la photo"""
+    st.markdown("### 🗺️ Carte des Probabilités par Zone")
+    diseases = [result['disease'] for result in analysis.results()]
+    disease = st.selectbox("Classe affichée", diseases, key='heatmap_disease')
+    st.image(tiling.heatmap_overlay(image, analysis.class_heat(disease)), use_column_width=True,
+             caption=f"{analysis.tiles} zones analysées")
 
-                # Affichage du graphique
-                st.plotly_chart(fig, use_container_width=True)
+def display_similar_cases(cases):
+    """Vignettes des cas de référence les plus proches, avec leur classe et leur similarité"""
+    if not cases:
+        return
+    st.markdown("### 🩺 Cas Similaires")
+    for column, case in zip(st.columns(len(cases)), cases):
+        with column:
+            st.image(case['path'], use_column_width=True)
+            st.caption(f"{case['label'] or 'Cas de référence'} · {case['similarity']:.0%}")
 
-                # Alternative : Graphique en secteurs pour le top 3
-                if len(results) >= 3:
-                    st.subheader("🥧 Répartition des 3 diagnostics les plus probables")
-                    
-                    top_3_diseases = [r['disease'] for r in results[:3]]
-                    top_3_probabilities = [r['probability'] for r in results[:3]]
-                    
-                    fig_pie = px.pie(
-                        values=top_3_probabilities, 
-                        names=top_3_diseases,
-                        title="Top 3 des diagnostics"
-                    )
-                    
-                    fig_pie.update_traces(
-                        textposition='inside', 
-                        textinfo='percent+label',
-                        hovertemplate='<b>%{label}</b><br>Probabilité: %{percent}<br><extra></extra>'
-                    )
-                    
-                    st.plotly_chart(fig_pie, use_container_width=True)
-                
-                # Informations détaillées
-                if top_result['disease'] in DISEASE_INFO:
-                    info = DISEASE_INFO[top_result['disease']]
-                    
-                    st.markdown("### 📋 Informations Médicales")
-                    st.write(f"**Description:** {info['description']}")
-                    st.write(f"**Prévalence:** {info['prevalence']}")
-                    st.write(f"**Traitement:** {info['treatment']}")
-                    
-                    if info['symptoms']:
-                        st.write("**Symptômes:**")
-                        for symptom in info['symptoms']:
-                            st.write(f"• {symptom}")
+def display_prediction_results(results):
+    """Affichage des résultats d'une prédiction (diagnostic, graphiques, informations)"""
+    st.markdown("### 🎯 Résultats de l'Analyse")
+    
+    # Résultat principal
+    top_result = results[0]
+    st.markdown(f"""
+    <div class="prediction-box">
+        <h2>🏆 Diagnostic Principal</h2>
+        <h3>{top_result['disease']}</h3>
+        <h4>Confiance: {top_result['confidence']:.1f}%</h4>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Graphiques des probabilités, construits une fois par résultat
+    diseases, probabilities = charts.results_key(results)
+    if light_mode():
+        st.markdown("**Top 5 des Prédictions**")
+        for disease, probability in zip(diseases, probabilities):
+            st.progress(probability, text=f"{disease} — {probability:.1%}")
+    else:
+        st.plotly_chart(charts.prediction_bar(diseases, probabilities), use_container_width=True)
+        
+        # Alternative : Graphique en secteurs pour le top 3
+        if len(results) >= 3:
+            st.subheader("🥧 Répartition des 3 diagnostics les plus probables")
+            st.plotly_chart(charts.prediction_pie(diseases[:3], probabilities[:3]), use_container_width=True)
+    
+    # Informations détaillées
+    if top_result['disease'] in DISEASE_INFO:
+        info = DISEASE_INFO[top_result['disease']]
+        
+        st.markdown("### 📋 Informations Médicales")
+        st.write(f"**Description:** {info['description']}")
+        st.write(f"**Prévalence:** {info['prevalence']}")
+        st.write(f"**Traitement:** {info['treatment']}")
+        
+        if info['symptoms']:
+            st.write("**Symptômes:**")
+            for symptom in info['symptoms']:
+                st.write(f"• {symptom}")
 
 def atlas_page():
     """Atlas des maladies"""
@@ -676,9 +685,16 @@ def atlas_page():
         st.markdown("### 🔍 Recherche Intelligente")
         search_query = st.text_input(
             "🔎 Rechercher par symptôme ou description",
-            placeholder="Ex: démangeaisons, plaques rouges, bulles..."
+            placeholder="Ex: démangeaisons, plaques rouges, bulles...",
+            key='atlas_query'
         )
         
+        # Suggestions pendant la saisie (un clic remplace la requête)
+        for suggestion in get_atlas_index().autocomplete(search_query):
+            if suggestion.lower() != search_query.strip().lower():
+                st.button(f"💡 {suggestion}", key=f"suggestion_{suggestion}",
+                          on_click=st.session_state.__setitem__, args=('atlas_query', suggestion))
+        
         st.markdown("### 📋 Parcourir par Catégorie")
         # Liste des maladies pour navigation rapide
         all_diseases = list(DISEASE_INFO.keys())
@@ -696,6 +712,9 @@ def atlas_page():
             
             if matching_diseases:
                 st.success(f"🎯 {len(matching_diseases)} résultat(s) trouvé(s) pour '{search_query}'")
+                corrected = get_atlas_index().corrected_query(search_query)
+                if corrected:
+                    st.caption(f"Résultats pour « {corrected} » (orthographe corrigée)")
                 
                 for disease in matching_diseases:
                     info = DISEASE_INFO[disease]
@@ -719,10 +738,8 @@ def atlas_page():
                             # st.image(info['picture'])
                             
                             # Highlight des termes de recherche
-                            for symptom in info['symptoms']:
-                                if search_query.lower() in symptom.lower():
-                                    st.success(f"✅ Symptôme correspondant: {symptom}")
-                                    break
+                            for symptom in get_atlas_index().matching_symptoms(disease, search_query)[:1]:
+                                st.success(f"✅ Symptôme correspondant: {symptom}")
             else:
                 st.warning(f"❌ Aucun résultat trouvé pour '{search_query}'")
                 st.info("💡 Essayez avec d'autres termes comme: rougeur, douleur, gonflement, éruption, taches...")
@@ -794,29 +811,19 @@ def atlas_page():
 
 def statistics_page():
     """Page des statistiques"""
+    import pandas as pd
+    
     st.markdown("## 📊 Statistiques et Analyses")
     
-    # Données simulées pour les graphiques
-    diseases = list(DISEASE_INFO.keys())
-    prevalence_data = np.random.rand(len(diseases)) * 100
-    
-    # Graphique en barres des prévalences
-    fig1 = px.bar(
-        x=diseases, 
-        y=prevalence_data,
-        title="Prévalence des Maladies de Peau",
-        labels={'x': 'Maladie', 'y': 'Prévalence (%)'},
-        color=prevalence_data,
-        color_continuous_scale='plasma'
-    )
-    fig1.update_xaxes(tickangle=45)
-    st.plotly_chart(fig1, use_column_width=True)
+    recorder = get_latency_recorder()
     
-    # Métriques
+    # Métriques (agrégats du journal des classifications)
+    prediction_log = get_prediction_log()
+    totals = prediction_log.totals() if prediction_log else None
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Maladies", "22", "")
+        st.metric("Total Maladies", len(DISEASE_INFO), "")
     
     with col2:
         st.metric("Précision Modèle", "94.5%", "2.3%")
@@ -825,18 +832,130 @@ def statistics_page():
         st.metric("Images Dataset", "25,000", "")
     
     with col4:
-        st.metric("Analyses Aujourd'hui", "47", "12")
+        if totals:
+            st.metric("Analyses Aujourd'hui", totals['today'], totals['today'] - totals['yesterday'])
+        else:
+            st.metric("Analyses Aujourd'hui", "—")
     
-    # Graphique en secteurs
-    common_diseases = diseases[:8]
-    common_prevalence = prevalence_data[:8]
+    if totals and totals['analyses']:
+        st.markdown("### 🗂️ Journal des Analyses")
+        percentiles = prediction_log.latency_percentiles()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Analyses au total", f"{totals['analyses']:,}")
+        with col2:
+            st.metric("Confiance moyenne", f"{totals['mean_confidence']:.1%}")
+        with col3:
+            st.metric("Latence moyenne", f"{totals['mean_latency_ms']:.0f} ms")
+        with col4:
+            st.metric("Latence p95 (journal)", f"~{percentiles[95]:.0f} ms")
+        
+        daily = prediction_log.daily(days=30)
+        show_bar([row['day'] for row in daily], [row['analyses'] for row in daily],
+                 "Analyses par Jour (30 derniers jours d'activité)", 'Jour', 'Analyses')
+        
+        since = daily[0]['day']
+        class_counts = sorted(prediction_log.class_counts(since=since).items(), key=lambda item: -item[1][0])
+        show_bar([disease_name(index) for index, _ in class_counts],
+                 [analyses for _, (analyses, _) in class_counts],
+                 f"Diagnostics Principaux depuis le {since}", 'Maladie', 'Analyses',
+                 color=[round(confidence, 3) for _, (_, confidence) in class_counts],
+                 color_label='Confiance moyenne')
     
-    fig2 = px.pie(
-        values=common_prevalence, 
-        names=common_diseases,
-        title="Répartition des 8 Maladies les Plus Communes"
-    )
-    st.plotly_chart(fig2, use_column_width=True)
+    # Mémoire des sessions (administrateurs seulement)
+    if st.session_state.get('username') == 'admin':
+        st.markdown("### 🧠 Mémoire des Sessions")
+        store = get_session_store()
+        store.evict_idle()
+        report = store.report()
+        images = get_image_cache().stats()
+        rss = process_rss_bytes()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Sessions actives", report['count'], f"{report['evicted']} évincées", delta_color="off")
+        with col2:
+            st.metric("État des sessions", f"{report['total_bytes'] / 1024:.1f} Ko",
+                      f"max {report['max_bytes']} o/session", delta_color="off")
+        with col3:
+            st.metric("Cache d'images", f"{images['bytes'] / 2**20:.1f} / {images['max_bytes'] / 2**20:.0f} Mo",
+                      f"{images['entries']} images, succès {images['hit_rate']:.0%}", delta_color="off")
+        with col4:
+            st.metric("Mémoire du processus", f"{rss / 2**20:.0f} Mo" if rss else "—")
+        if report['sessions']:
+            sessions = pd.DataFrame(report['sessions']).sort_values('idle_seconds')
+            sessions['idle_seconds'] = sessions['idle_seconds'].round(0)
+            st.dataframe(sessions, use_container_width=True, hide_index=True)
+    
+    # Performances mesurées du pipeline de classification
+    st.markdown("### ⏱️ Latences de Classification")
+    
+    loader_status = get_model_loader().status()
+    if loader_status['state'] == 'ready':
+        st.caption(f"Modèle ({config.INFERENCE_BACKEND}) prêt en {loader_status['elapsed_seconds']:.1f}s après le démarrage")
+    else:
+        st.caption(f"Modèle : {loader_status['message']}")
+    
+    request_latencies = recorder.request_latencies()
+    if not request_latencies:
+        st.info("Aucune analyse mesurée depuis le démarrage du serveur.")
+        return
+    
+    p50, p95, p99 = np.percentile(request_latencies, [50, 95, 99]) * 1000
+    cache_stats = get_prediction_cache().stats()
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("Débit (analyses/min)", f"{recorder.throughput() * 60:.1f}")
+    with col2:
+        st.metric("Latence p50", f"{p50:.0f} ms")
+    with col3:
+        st.metric("Latence p95", f"{p95:.0f} ms")
+    with col4:
+        st.metric("Latence p99", f"{p99:.0f} ms")
+    with col5:
+        st.metric("Cache (taux de succès)", f"{cache_stats['hit_rate']:.0%}")
+    
+    # Ordonnanceur de micro-lots (réglage débit / latence)
+    model_ready = get_model_loader().ready
+    if config.MICRO_BATCHING and model_ready:
+        scheduler_stats = get_inference_scheduler().stats()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("File d'attente", scheduler_stats['queue_depth'])
+        with col2:
+            st.metric("Taille moyenne de lot", f"{scheduler_stats['mean_batch_size']:.1f}")
+        with col3:
+            st.metric("Attente p50", f"{scheduler_stats.get('wait_p50_ms', 0):.1f} ms")
+        with col4:
+            st.metric("Attente p95", f"{scheduler_stats.get('wait_p95_ms', 0):.1f} ms")
+        
+        histogram = scheduler_stats['batch_size_histogram']
+        if histogram:
+            show_bar(histogram.keys(), histogram.values(), "Tailles des Lots Exécutés",
+                     'Images par lot', 'Nombre de lots')
+    
+    # État du pool de processus d'inférence
+    if config.WORKER_PROCESSES > 0 and model_ready:
+        st.markdown("### 🧵 Workers d'Inférence")
+        st.dataframe(pd.DataFrame(load_model().health()), use_container_width=True)
+    
+    # Histogramme des latences par étape (reconstruit seulement si de nouvelles mesures sont arrivées)
+    samples = [(stage, seconds * 1000) for stage in STAGES for seconds in recorder.samples(stage)]
+    if not light_mode():
+        fig1 = charts.latency_histogram(tuple(stage for stage, _ in samples), tuple(ms for _, ms in samples))
+        st.plotly_chart(fig1, use_container_width=True)
+    
+    # Percentiles par étape
+    summary = pd.DataFrame(recorder.summary()).set_index('stage')
+    st.dataframe(summary.round(2), use_container_width=True)
+    
+    # Répartition du temps moyen entre les étapes
+    if light_mode():
+        show_bar(summary.index, summary['mean_ms'].round(3), "Temps Moyen par Étape", 'Étape', 'Temps moyen (ms)')
+    else:
+        fig2 = charts.pie(tuple(summary.index), tuple(summary['mean_ms'].round(3)),
+                          "Répartition du Temps Moyen par Étape")
+        st.plotly_chart(fig2, use_container_width=True)
 
 def about_page():
     """Page à propos"""
@@ -898,6 +1017,10 @@ def main():
     if 'authenticated' not in st.session_state:
         st.session_state['authenticated'] = False
     
+    # Préchargement du modèle dès la première session (y compris la page de connexion)
+    if config.PRELOAD_MODEL:
+        get_model_loader()
+    
     # Vérification de l'authentification
     if not st.session_state['authenticated']:
         login_page()
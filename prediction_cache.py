@@ -0,0 +1,220 @@
+"""Cache des prédictions adressé par le contenu (hash de l'image + identité du modèle)"""
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def content_hash(data):
+    """Hash SHA-256 des octets d'une image téléchargée"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def model_fingerprint(model_path):
+    """Identité du fichier modèle : hash de son contenu"""
+    digest = hashlib.sha256()
+    with open(model_path, 'rb') as model_file:
+        for chunk in iter(lambda: model_file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def served_model_id(model_path, backend='keras', artifact_path=None):
+    """Identité du modèle servi : checkpoint, backend et artefact exporté (.tflite, SavedModel)"""
+    model_id = f"{model_fingerprint(model_path)}-{backend}"
+    if artifact_path is not None:
+        model_id += '-' + (model_fingerprint(artifact_path) if os.path.exists(artifact_path) else 'new')
+    return model_id
+
+
+class PredictionCache:
+    """Cache LRU en mémoire partagé entre sessions, avec un niveau disque optionnel
+
+    Les entrées sont les listes top-5 retournées par predict_disease, accompagnées au besoin
+    d'une carte d'explication uint8 (Grad-CAM) évincée avec elles. Le modèle servi fait partie
+    de la clé : remplacer le fichier .keras, changer de backend ou réexporter l'artefact
+    (`artifact_path`) invalide toutes les entrées.
+    """
+
+    def __init__(self, model_path, max_entries=1024, cache_dir=None, max_disk_entries=100_000,
+                 backend='keras', artifact_path=None):
+        self.model_path = model_path
+        self.backend = backend
+        self.artifact_path = artifact_path
+        self._model_id = None
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._explanations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._disk_count = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_count = sum(1 for name in os.listdir(cache_dir) if name.endswith('.json'))
+
+    @property
+    def model_id(self):
+        """Identité du modèle servi, calculée à la première clé demandée
+
+        Le cache peut être créé avant que le chargement du modèle n'exporte l'artefact : les
+        clés ne sont demandées qu'une fois le modèle prêt, l'artefact servi existe alors. Tant
+        qu'il manque, l'identité (marquée 'new') n'est pas mémorisée.
+        """
+        if self._model_id is not None:
+            return self._model_id
+        model_id = served_model_id(self.model_path, self.backend, self.artifact_path)
+        if self.artifact_path is None or os.path.exists(self.artifact_path):
+            self._model_id = model_id
+        return model_id
+
+    def key(self, data):
+        """Clé de cache pour les octets d'une image"""
+        return self.key_for_hash(content_hash(data))
+
+    def key_for_hash(self, digest, variant=None):
+        """Clé de cache pour un hash de contenu déjà calculé (`variant` : mode d'analyse, ex. TTA)"""
+        if variant:
+            return f"{self.model_id}-{variant}-{digest}"
+        return f"{self.model_id}-{digest}"
+
+    def get(self, key):
+        """Résultats en cache pour `key`, ou None"""
+        with self._lock:
+            results = self._entries.get(key)
+            if results is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return [dict(r) for r in results]
+
+        results, explanation = self._disk_get(key)
+        with self._lock:
+            if results is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, results, explanation)
+        return [dict(r) for r in results]
+
+    def get_explanation(self, key):
+        """Carte d'explication enregistrée avec les résultats de `key`, ou None"""
+        with self._lock:
+            if key in self._entries:
+                return self._explanations.get(key)
+        results, explanation = self._disk_get(key)
+        if results is not None:
+            with self._lock:
+                self._store(key, results, explanation)
+        return explanation
+
+    def put(self, key, results, explanation=None):
+        """Enregistre les résultats top-5 d'une prédiction (et sa carte d'explication uint8)"""
+        results = [dict(r) for r in results]
+        if explanation is not None:
+            explanation = np.array(explanation, dtype=np.uint8)
+        with self._lock:
+            self._store(key, results, explanation)
+        self._disk_put(key, results, explanation)
+
+    def stats(self):
+        """Compteurs du cache"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'disk_entries': self._disk_count,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._explanations.clear()
+
+    def _store(self, key, results, explanation=None):
+        self._entries[key] = results
+        self._entries.move_to_end(key)
+        if explanation is not None:
+            self._explanations[key] = explanation
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._explanations.pop(evicted, None)
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_get(self, key):
+        """(résultats, carte d'explication) d'une entrée disque ; une liste seule : sans carte"""
+        if not self.cache_dir:
+            return None, None
+        try:
+            with open(self._disk_path(key), encoding='utf-8') as entry:
+                stored = json.load(entry)
+        except (OSError, ValueError):
+            return None, None
+        if isinstance(stored, list):
+            return stored, None
+        explanation = stored.get('explanation')
+        if explanation is not None:
+            explanation = np.frombuffer(base64.b64decode(explanation['data']), dtype=np.uint8).reshape(
+                explanation['shape'])
+        return stored['results'], explanation
+
+    def _disk_put(self, key, results, explanation=None):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        existed = os.path.exists(path)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        stored = results
+        if explanation is not None:
+            stored = {'results': results, 'explanation': {
+                'shape': list(explanation.shape), 'data': base64.b64encode(explanation.tobytes()).decode('ascii')}}
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as entry:
+                json.dump(stored, entry)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        with self._lock:
+            if not existed:
+                self._disk_count += 1
+            over = self._disk_count > self.max_disk_entries
+        if over:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Supprime les entrées disque les plus anciennes (jusqu'à 90% de la capacité)"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        target = int(self.max_disk_entries * 0.9)
+        removed = 0
+        for _, path in entries[:max(0, len(entries) - target)]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_count = len(entries) - removed
+            self.evictions += removed
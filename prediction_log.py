@@ -0,0 +1,321 @@
+"""Journal persistant des classifications (SQLite en mode WAL) et agrégats maintenus à l'écriture
+
+Chaque analyse est mise en file par record() puis écrite par lots dans un thread dédié : la
+requête n'attend jamais le disque. Les tables d'agrégats (par jour, par jour et par classe,
+histogramme des latences par jour) sont mises à jour dans la même transaction que le journal,
+les pages de statistiques ne lisent donc jamais la table `predictions` en entier.
+
+Générateur de charge (journal synthétique):
+    python prediction_log.py generate --rows 1000000 --days 90 --path /tmp/predictions.sqlite3
+"""
+import argparse
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    day TEXT NOT NULL,
+    user TEXT,
+    content_hash TEXT NOT NULL,
+    top_class INTEGER NOT NULL,
+    top_indices BLOB NOT NULL,
+    top_probabilities BLOB NOT NULL,
+    latency_ms REAL NOT NULL,
+    cached INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS predictions_timestamp ON predictions (timestamp);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day TEXT PRIMARY KEY,
+    analyses INTEGER NOT NULL,
+    cached INTEGER NOT NULL,
+    latency_ms_sum REAL NOT NULL,
+    latency_ms_max REAL NOT NULL,
+    confidence_sum REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_class_stats (
+    day TEXT NOT NULL,
+    class_index INTEGER NOT NULL,
+    analyses INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (day, class_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_latency_histogram (
+    day TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    analyses INTEGER NOT NULL,
+    PRIMARY KEY (day, bucket)
+) WITHOUT ROWID;
+"""
+
+UPSERT_DAILY = """
+INSERT INTO daily_stats VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (day) DO UPDATE SET
+    analyses = analyses + excluded.analyses,
+    cached = cached + excluded.cached,
+    latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum,
+    latency_ms_max = MAX(latency_ms_max, excluded.latency_ms_max),
+    confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+UPSERT_CLASS = """
+INSERT INTO daily_class_stats VALUES (?, ?, ?, ?)
+ON CONFLICT (day, class_index) DO UPDATE SET
+    analyses = analyses + excluded.analyses,
+    confidence_sum = confidence_sum + excluded.confidence_sum
+"""
+UPSERT_LATENCY = """
+INSERT INTO daily_latency_histogram VALUES (?, ?, ?)
+ON CONFLICT (day, bucket) DO UPDATE SET analyses = analyses + excluded.analyses
+"""
+
+# Histogramme logarithmique des latences : 8 classes par doublement (~9 % de résolution)
+BUCKETS_PER_OCTAVE = 8
+
+
+def latency_bucket(latency_ms):
+    return math.floor(math.log2(max(latency_ms, 0.01)) * BUCKETS_PER_OCTAVE)
+
+
+def bucket_upper_ms(bucket):
+    return 2.0 ** ((bucket + 1) / BUCKETS_PER_OCTAVE)
+
+
+def day_of(timestamp):
+    """Jour local (AAAA-MM-JJ) d'un horodatage"""
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+
+
+class PredictionLog:
+    """Journal SQLite partagé entre sessions : écriture tamponnée, lectures sur les agrégats
+
+    record() ne bloque pas : au-delà de `max_pending` analyses en attente, les suivantes
+    sont comptées dans `dropped` plutôt que de ralentir l'interface.
+    """
+
+    def __init__(self, path, flush_interval=1.0, max_batch=1000, max_pending=100_000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+        self._thread = threading.Thread(target=self._run, name='prediction-log-writer', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')  # durable au point de contrôle, sans fsync par lot
+        return connection
+
+    def record(self, content_hash, indices, probabilities, latency_ms, user=None, cached=False,
+               timestamp=None):
+        """Met une analyse en file d'écriture (top-k des indices et probabilités, latence totale)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        row = (timestamp, day_of(timestamp), user, content_hash, int(indices[0]),
+               np.asarray(indices, dtype=np.uint8).tobytes(),
+               np.asarray(probabilities, dtype=np.float32).tobytes(),
+               float(latency_ms), int(bool(cached)), float(probabilities[0]))
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=None):
+        """Attend que les analyses déjà en file soient écrites"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        connection = self._connect()
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            rows, events = [], []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                else:
+                    rows.append(item)
+                if stop or events or len(rows) >= self.max_batch:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            if rows:
+                try:
+                    self._write(connection, rows)
+                except sqlite3.Error:
+                    self.dropped += len(rows)
+            for event in events:
+                event.set()
+        connection.close()
+
+    def _write(self, connection, rows):
+        daily = defaultdict(lambda: [0, 0, 0.0, 0.0, 0.0])
+        classes = defaultdict(lambda: [0, 0.0])
+        latencies = Counter()
+        for _, day, _, _, top_class, _, _, latency_ms, cached, confidence in rows:
+            stats = daily[day]
+            stats[0] += 1
+            stats[1] += cached
+            stats[2] += latency_ms
+            stats[3] = max(stats[3], latency_ms)
+            stats[4] += confidence
+            class_stats = classes[day, top_class]
+            class_stats[0] += 1
+            class_stats[1] += confidence
+            latencies[day, latency_bucket(latency_ms)] += 1
+        with connection:
+            connection.executemany(
+                'INSERT INTO predictions (timestamp, day, user, content_hash, top_class, top_indices, '
+                'top_probabilities, latency_ms, cached) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [row[:9] for row in rows],
+            )
+            connection.executemany(UPSERT_DAILY, [(day, *stats) for day, stats in daily.items()])
+            connection.executemany(UPSERT_CLASS, [(day, index, *stats) for (day, index), stats in classes.items()])
+            connection.executemany(UPSERT_LATENCY, [(day, bucket, count) for (day, bucket), count in latencies.items()])
+        self.written += len(rows)
+
+    # Lectures : une connexion par thread (sessions Streamlit), uniquement sur les agrégats
+
+    def _reader(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    def totals(self, day=None):
+        """Analyses au total, du jour et de la veille, latence et confiance moyennes"""
+        day = day or day_of(time.time())
+        previous = (datetime.strptime(day, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+        connection = self._reader()
+        analyses, cached, latency_sum, confidence_sum = connection.execute(
+            'SELECT COALESCE(SUM(analyses), 0), COALESCE(SUM(cached), 0), COALESCE(SUM(latency_ms_sum), 0), '
+            'COALESCE(SUM(confidence_sum), 0) FROM daily_stats'
+        ).fetchone()
+        by_day = dict(connection.execute(
+            'SELECT day, analyses FROM daily_stats WHERE day IN (?, ?)', (day, previous)
+        ).fetchall())
+        return {
+            'analyses': analyses,
+            'today': by_day.get(day, 0),
+            'yesterday': by_day.get(previous, 0),
+            'cached': cached,
+            'mean_latency_ms': latency_sum / analyses if analyses else 0.0,
+            'mean_confidence': confidence_sum / analyses if analyses else 0.0,
+        }
+
+    def daily(self, days=30):
+        """Agrégats des `days` derniers jours d'activité, du plus ancien au plus récent"""
+        rows = self._reader().execute(
+            'SELECT day, analyses, cached, latency_ms_sum, latency_ms_max, confidence_sum '
+            'FROM daily_stats ORDER BY day DESC LIMIT ?', (days,)
+        ).fetchall()
+        return [
+            {'day': day, 'analyses': analyses, 'cached': cached, 'mean_latency_ms': latency_sum / analyses,
+             'max_latency_ms': latency_max, 'mean_confidence': confidence_sum / analyses}
+            for day, analyses, cached, latency_sum, latency_max, confidence_sum in reversed(rows)
+        ]
+
+    def class_counts(self, since=None):
+        """{indice de classe: (analyses, confiance moyenne)} depuis le jour `since` (inclus)"""
+        rows = self._reader().execute(
+            'SELECT class_index, SUM(analyses), SUM(confidence_sum) FROM daily_class_stats '
+            'WHERE day >= ? GROUP BY class_index', (since or '',)
+        ).fetchall()
+        return {index: (analyses, confidence_sum / analyses) for index, analyses, confidence_sum in rows}
+
+    def latency_percentiles(self, since=None, percentiles=(50, 95, 99)):
+        """Percentiles de latence (ms) estimés sur l'histogramme (borne haute de la classe)"""
+        rows = self._reader().execute(
+            'SELECT bucket, SUM(analyses) FROM daily_latency_histogram WHERE day >= ? '
+            'GROUP BY bucket ORDER BY bucket', (since or '',)
+        ).fetchall()
+        if not rows:
+            return {}
+        buckets = np.array([bucket for bucket, _ in rows])
+        cumulative = np.cumsum([count for _, count in rows])
+        return {
+            percentile: bucket_upper_ms(int(buckets[np.searchsorted(cumulative, cumulative[-1] * percentile / 100)]))
+            for percentile in percentiles
+        }
+
+    def recent(self, limit=20):
+        """Dernières analyses du journal (parcours de la clé primaire à rebours)"""
+        rows = self._reader().execute(
+            'SELECT timestamp, user, content_hash, top_indices, top_probabilities, latency_ms, cached '
+            'FROM predictions ORDER BY id DESC LIMIT ?', (limit,)
+        ).fetchall()
+        return [
+            {'timestamp': timestamp, 'user': user, 'content_hash': content_hash,
+             'top_indices': np.frombuffer(indices, dtype=np.uint8).tolist(),
+             'top_probabilities': np.frombuffer(probabilities, dtype=np.float32).tolist(),
+             'latency_ms': latency_ms, 'cached': bool(cached)}
+            for timestamp, user, content_hash, indices, probabilities, latency_ms, cached in rows
+        ]
+
+
+def generate(log, rows, days=90, num_classes=22, top_k=5, seed=0, chunk=10_000):
+    """Remplit `log` avec `rows` analyses synthétiques réparties sur les `days` derniers jours"""
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    users = np.array(['admin', 'medecin', 'user'])
+    class_weights = rng.dirichlet(np.ones(num_classes))
+    for start in range(0, rows, chunk):
+        count = min(chunk, rows - start)
+        timestamps = np.sort(now - rng.uniform(0, days * 86400, count))
+        logits = rng.normal(size=(count, num_classes)) + np.log(class_weights) * 2
+        probabilities = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+        top = np.argsort(-probabilities, axis=1)[:, :top_k]
+        top_probabilities = np.take_along_axis(probabilities, top, axis=1)
+        latencies = rng.lognormal(np.log(40), 0.5, count)
+        for row in range(count):
+            log.record(f"{rng.integers(1 << 63):016x}", top[row], top_probabilities[row], latencies[row],
+                       user=users[row % 3], cached=rng.random() < 0.2, timestamp=timestamps[row])
+        log.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Journal des prédictions : génération de charge")
+    parser.add_argument('command', choices=('generate',))
+    parser.add_argument('--path', default='data/predictions.sqlite3')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--days', type=int, default=90)
+    args = parser.parse_args(argv)
+
+    log = PredictionLog(args.path)
+    start = time.perf_counter()
+    generate(log, args.rows, args.days)
+    elapsed = time.perf_counter() - start
+    log.close()
+    print(f"{log.written} analyses écrites en {elapsed:.1f}s ({log.written / elapsed:,.0f}/s), "
+          f"{log.dropped} perdues")
+
+
+if __name__ == '__main__':
+    main()
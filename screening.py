@@ -0,0 +1,353 @@
+"""Screening en flux : un dossier de réception surveillé, classé en continu par lots
+
+    python screening.py run [--root data/screening] [--once]
+    python screening.py status
+
+Organisation de `root` :
+    inbox/    images déposées (écrire sous un nom temporaire .part/.tmp ou caché, puis renommer)
+    work/     images réclamées, en cours de traitement
+    done/     images traitées          failed/   images illisibles
+    results/  un fichier JSON par image : top-5 ou erreur
+    metrics.json  débit, retard et profondeur des files, réécrit périodiquement
+
+Une image réclamée est renommée `<horodatage>-<nom d'origine>` (claimed_name) : un nom déjà
+traité déposé à nouveau n'écrase ni son résultat ni l'image dans done/.
+
+Pipeline asyncio : scan → décodage (pool de threads) → lots → inférence → écriture. Les files
+entre étapes sont bornées et le nombre d'images réclamées est limité (`max_in_flight`) : si
+l'inférence prend du retard, le scan cesse de réclamer et les images restent dans inbox/.
+
+Reprise après arrêt brutal : une image est réclamée par un renommage atomique inbox/ → work/,
+son résultat est écrit atomiquement (fichier temporaire puis os.replace) avant son déplacement
+vers done/. Au démarrage, une image de work/ dont le résultat existe est seulement déplacée ;
+les autres retournent dans inbox/ sous leur nom unique. Aucune image n'est donc classée deux fois.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import config
+from batch_classify import IMAGE_EXTENSIONS
+from decoding import decode_image
+from inference import disease_index, preprocess_uint8, results_from_top_k, top_k_batch
+from prediction_cache import content_hash
+
+DIRECTORIES = ('inbox', 'work', 'done', 'failed', 'results')
+TEMPORARY_SUFFIXES = ('.part', '.tmp')
+CLAIM_PREFIX = re.compile(r'^[0-9a-f]{16}-')
+
+
+def original_name(name):
+    """Nom déposé d'une image, sans le préfixe ajouté à sa réclamation"""
+    return CLAIM_PREFIX.sub('', name, count=1)
+
+
+def claimed_name(name):
+    """Nom unique d'une image réclamée : horodatage en nanosecondes (hexadécimal) + nom d'origine"""
+    return f"{time.time_ns():016x}-{original_name(name)}"
+
+
+def write_json_atomic(path, payload):
+    """Écrit `payload` dans un fichier temporaire puis le renomme : jamais de JSON partiel"""
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as output:
+        json.dump(payload, output, ensure_ascii=False)
+    os.replace(temporary, path)
+
+
+class ScreeningService:
+    """Classification continue des images déposées dans `root`/inbox"""
+
+    def __init__(self, model, root, batch_size=32, decode_threads=4, max_in_flight=256,
+                 poll_interval=1.0, settle_seconds=1.0, max_wait_ms=50.0, log=None,
+                 metrics_interval=10.0, window=1000):
+        self.model = model
+        self.root = root
+        self.dirs = {name: os.path.join(root, name) for name in DIRECTORIES}
+        self.batch_size = batch_size
+        self.decode_threads = decode_threads
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.max_wait = max_wait_ms / 1000.0
+        self.log = log
+        self.metrics_interval = metrics_interval
+        self.processed = 0
+        self.failed = 0
+        self.recovered = 0
+        self.batches = 0
+        self.backlog = 0
+        self.in_flight = 0
+        self._finished = deque(maxlen=window)  # horodatages de fin
+        self._lags = deque(maxlen=window)      # dépôt → résultat (s)
+        self._started = None
+        self._queues = {}
+        for directory in self.dirs.values():
+            os.makedirs(directory, exist_ok=True)
+
+    # --- reprise -------------------------------------------------------------------------------
+
+    def _result_path(self, name):
+        return os.path.join(self.dirs['results'], f"{name}.json")
+
+    def recover(self):
+        """Termine ou remet en file les images restées dans work/ après un arrêt"""
+        for name in os.listdir(self.dirs['work']):
+            source = os.path.join(self.dirs['work'], name)
+            result = self._result_path(name)
+            if os.path.exists(result):
+                with open(result, encoding='utf-8') as handle:
+                    target = 'failed' if 'error' in json.load(handle) else 'done'
+                os.replace(source, os.path.join(self.dirs[target], name))
+            else:
+                os.replace(source, os.path.join(self.dirs['inbox'], name))
+            self.recovered += 1
+
+    # --- étapes bloquantes (exécutées dans les pools de threads) --------------------------------
+
+    def _pending(self):
+        """Images prêtes dans inbox/, les plus anciennes d'abord (fichiers encore en écriture exclus)"""
+        settled = time.time() - self.settle_seconds
+        entries = []
+        with os.scandir(self.dirs['inbox']) as scan:
+            for entry in scan:
+                name = entry.name
+                if name.startswith('.') or name.endswith(TEMPORARY_SUFFIXES):
+                    continue
+                if not name.lower().endswith(IMAGE_EXTENSIONS) or not entry.is_file():
+                    continue
+                mtime = entry.stat().st_mtime
+                if mtime <= settled:
+                    entries.append((mtime, name))
+        entries.sort()
+        return entries
+
+    def _claim(self, name):
+        """Renommage atomique inbox/ → work/ sous un nom unique ; None si l'image a disparu entre-temps"""
+        claimed = claimed_name(name)
+        try:
+            os.rename(os.path.join(self.dirs['inbox'], name), os.path.join(self.dirs['work'], claimed))
+        except FileNotFoundError:
+            return None
+        return claimed
+
+    def _decode(self, item):
+        with open(os.path.join(self.dirs['work'], item['file']), 'rb') as source:
+            data = source.read()
+        item['hash'] = content_hash(data)
+        item['array'] = preprocess_uint8(decode_image(io.BytesIO(data), max_pixels=config.DECODE_MAX_PIXELS))
+        return item
+
+    def _finish(self, item, results=None, error=None):
+        """Résultat écrit atomiquement, puis image déplacée vers done/ ou failed/"""
+        name = item['file']
+        payload = {'name': item['name'], 'file': name, 'received': item['arrived'], 'classified': time.time()}
+        if error is None:
+            payload['predictions'] = results
+        else:
+            payload['error'] = error
+        write_json_atomic(self._result_path(name), payload)
+        target = 'done' if error is None else 'failed'
+        os.replace(os.path.join(self.dirs['work'], name), os.path.join(self.dirs[target], name))
+
+    # --- pipeline asyncio ----------------------------------------------------------------------
+
+    async def run(self, once=False):
+        """Traite le dossier jusqu'à l'annulation (ou, avec `once`, jusqu'à ce qu'inbox/ soit vide)"""
+        loop = asyncio.get_running_loop()
+        self._started = time.time()
+        self.recover()
+        io_pool = ThreadPoolExecutor(self.decode_threads, thread_name_prefix='screening-io')
+        model_pool = ThreadPoolExecutor(1, thread_name_prefix='screening-model')
+        slots = asyncio.Semaphore(self.max_in_flight)
+        decode_queue = asyncio.Queue(maxsize=self.decode_threads * 2)
+        batch_queue = asyncio.Queue(maxsize=self.batch_size * 2)
+        self._queues = {'decode': decode_queue, 'batch': batch_queue}
+        writes = set()
+
+        async def finish(item, results=None, error=None):
+            try:
+                await loop.run_in_executor(io_pool, self._finish, item, results, error)
+            finally:
+                slots.release()
+                self.in_flight -= 1
+            now = time.time()
+            if error is None:
+                self.processed += 1
+                # Journalisé seulement une fois le résultat écrit : une reprise ne le compte pas deux fois
+                if self.log is not None:
+                    self.log.record(item['hash'], [disease_index(result['disease']) for result in results],
+                                    [result['probability'] for result in results],
+                                    (now - item['claimed']) * 1000, user='screening')
+            else:
+                self.failed += 1
+            self._finished.append(now)
+            self._lags.append(now - item['arrived'])
+
+        def spawn_finish(item, results=None, error=None):
+            task = asyncio.create_task(finish(item, results, error))
+            writes.add(task)
+            task.add_done_callback(writes.discard)
+
+        async def scan():
+            while True:
+                entries = await loop.run_in_executor(io_pool, self._pending)
+                self.backlog = len(entries)
+                for mtime, name in entries:
+                    await slots.acquire()  # contre-pression : pas de réclamation sans place
+                    claimed = await loop.run_in_executor(io_pool, self._claim, name)
+                    if claimed is None:
+                        slots.release()
+                        continue
+                    self.backlog -= 1
+                    self.in_flight += 1
+                    await decode_queue.put({'name': original_name(name), 'file': claimed, 'arrived': mtime,
+                                            'claimed': time.time()})
+                if once and not entries:
+                    return
+                await asyncio.sleep(self.poll_interval if not entries else 0)
+
+        async def decode():
+            while True:
+                item = await decode_queue.get()
+                try:
+                    await loop.run_in_executor(io_pool, self._decode, item)
+                except Exception as exc:
+                    spawn_finish(item, error=f"Image illisible ou trop grande: {exc}")
+                else:
+                    await batch_queue.put(item)
+                finally:
+                    decode_queue.task_done()
+
+        async def infer():
+            while True:
+                batch = [await batch_queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(await asyncio.wait_for(batch_queue.get(), deadline - loop.time()))
+                    except asyncio.TimeoutError:
+                        break
+                images = np.concatenate([item.pop('array') for item in batch])
+                try:
+                    probabilities = await loop.run_in_executor(model_pool, self.model.predict, images)
+                except Exception as exc:
+                    for item in batch:
+                        spawn_finish(item, error=f"Échec de l'inférence: {exc}")
+                else:
+                    self.batches += 1
+                    indices, top_probabilities = top_k_batch(probabilities)
+                    for item, row_indices, row_probabilities in zip(batch, indices, top_probabilities):
+                        results = results_from_top_k(row_indices, row_probabilities)
+                        spawn_finish(item, results)
+                for _ in batch:
+                    batch_queue.task_done()
+
+        async def report():
+            while True:
+                await asyncio.sleep(self.metrics_interval)
+                self.write_metrics()
+
+        workers = [asyncio.create_task(decode()) for _ in range(self.decode_threads)]
+        workers += [asyncio.create_task(infer()), asyncio.create_task(report())]
+        try:
+            await scan()
+            # --once : attend que toutes les images réclamées soient écrites
+            await decode_queue.join()
+            await batch_queue.join()
+            while writes:
+                await asyncio.gather(*list(writes))
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            # Écritures déjà lancées menées à terme ; les images encore dans work/ seront reprises
+            await asyncio.gather(*list(writes), return_exceptions=True)
+            io_pool.shutdown()
+            model_pool.shutdown()
+            self.write_metrics()
+
+    # --- métriques -----------------------------------------------------------------------------
+
+    def metrics(self, period=60.0):
+        """Débit (images/s sur `period`), retard dépôt → résultat et profondeur des files"""
+        now = time.time()
+        since = max(now - period, self._started or now)
+        recent = sum(1 for finished in self._finished if finished >= since)
+        metrics = {
+            'time': now,
+            'uptime_seconds': now - self._started if self._started else 0.0,
+            'processed': self.processed,
+            'failed': self.failed,
+            'recovered': self.recovered,
+            'batches': self.batches,
+            'mean_batch_size': self.processed / self.batches if self.batches else 0.0,
+            'throughput_per_second': recent / (now - since) if now > since else 0.0,
+            'inbox_backlog': self.backlog,
+            'in_flight': self.in_flight,
+            'queue_depth': {name: queue.qsize() for name, queue in self._queues.items()},
+        }
+        if self._lags:
+            p50, p95, p99 = np.percentile(self._lags, [50, 95, 99])
+            metrics.update({'lag_p50_seconds': float(p50), 'lag_p95_seconds': float(p95),
+                            'lag_p99_seconds': float(p99)})
+        return metrics
+
+    def write_metrics(self):
+        metrics = self.metrics()
+        write_json_atomic(os.path.join(self.root, 'metrics.json'), metrics)
+        print(f"[DermAI] screening: {metrics['processed']} traitées, {metrics['failed']} en échec, "
+              f"{metrics['throughput_per_second']:.1f} images/s, {metrics['inbox_backlog']} en attente, "
+              f"retard p95 {metrics.get('lag_p95_seconds', 0.0):.1f}s", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screening en flux d'un dossier de réception")
+    parser.add_argument('command', choices=('run', 'status'))
+    parser.add_argument('--root', default=config.SCREENING_DIR)
+    parser.add_argument('--once', action='store_true', help="Traite inbox/ puis s'arrête")
+    parser.add_argument('--batch-size', type=int, default=config.SCREENING_BATCH_SIZE)
+    parser.add_argument('--decode-threads', type=int, default=config.SCREENING_DECODE_THREADS)
+    parser.add_argument('--max-in-flight', type=int, default=config.SCREENING_MAX_IN_FLIGHT)
+    args = parser.parse_args(argv)
+
+    if args.command == 'status':
+        with open(os.path.join(args.root, 'metrics.json'), encoding='utf-8') as handle:
+            print(json.dumps(json.load(handle), indent=2, ensure_ascii=False))
+        return
+
+    from model_loader import build_model
+    from prediction_log import PredictionLog
+
+    model = build_model(lambda fraction, message: print(f"[DermAI] {message}", flush=True))
+    log = None
+    if config.PREDICTION_LOG_PATH:
+        log = PredictionLog(config.PREDICTION_LOG_PATH, flush_interval=config.PREDICTION_LOG_FLUSH_SECONDS)
+    service = ScreeningService(
+        model, args.root,
+        batch_size=args.batch_size,
+        decode_threads=args.decode_threads,
+        max_in_flight=args.max_in_flight,
+        poll_interval=config.SCREENING_POLL_SECONDS,
+        settle_seconds=config.SCREENING_SETTLE_SECONDS,
+        log=log,
+    )
+    try:
+        asyncio.run(service.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if log is not None:
+            log.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""Modèle optimisé pour l'inférence : tf.function à signature fixe, préchauffé au chargement
+
+Comparaison avec l'ancien chemin model.predict:
+    python serving.py --runs 200 [--xla]
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from inference import IMAGE_SIZE, MODEL_PATH, to_float_input
+
+INPUT_SHAPE = (None, IMAGE_SIZE[0], IMAGE_SIZE[1], 3)
+SAVEDMODEL_DIR = os.path.join(os.path.dirname(MODEL_PATH), 'savedmodel')
+
+
+UINT8_INPUT_SHAPE = (None, None, None, 3)
+
+
+def preprocess_in_graph(images):
+    """uint8 (N, H, W, 3) de taille quelconque → float32 (N, 64, 64, 3) dans [0, 1], dans le graphe
+
+    Le redimensionnement bicubique avec anti-repliement approche Image.resize de PIL ; il est
+    sauté quand les images sont déjà en 64x64.
+    """
+    images = tf.cast(images, tf.float32)
+    resized = tf.cond(
+        tf.reduce_all(tf.shape(images)[1:3] == IMAGE_SIZE),
+        lambda: images,
+        lambda: tf.clip_by_value(
+            tf.image.resize(images, IMAGE_SIZE, method='bicubic', antialias=True), 0.0, 255.0
+        ),
+    )
+    return resized / 255.0
+
+
+class ServingModel:
+    """Enveloppe d'un modèle Keras exposant predict() via des fonctions tracées une seule fois
+
+    predict() accepte soit des images float (N, 64, 64, 3) normalisées dans [0, 1], soit des
+    images uint8 brutes (N, H, W, 3) : redimensionnement et normalisation se font alors dans
+    le graphe, sans intermédiaire float64 côté Python.
+    `legacy=True` conserve l'ancien chemin model.predict (pour comparaison).
+    """
+
+    def __init__(self, model, jit_compile=False, legacy=False, warmup=True):
+        self.model = model
+        self.legacy = legacy
+        self.jit_compile = jit_compile
+        self._serve = tf.function(
+            lambda images: model(images, training=False),
+            input_signature=[tf.TensorSpec(INPUT_SHAPE, tf.float32)],
+            jit_compile=jit_compile,
+        )
+        # Le redimensionnement anti-repliement (ScaleAndTranslate) n'a pas de noyau XLA : il reste
+        # hors du cluster, le modèle passe par _serve, compilé par XLA si `jit_compile`
+        self._serve_uint8 = tf.function(
+            lambda images: self._serve(tf.ensure_shape(preprocess_in_graph(images), INPUT_SHAPE)),
+            input_signature=[tf.TensorSpec(UINT8_INPUT_SHAPE, tf.uint8)],
+        )
+        self.warmup_seconds = self.warmup() if warmup else None
+
+    def warmup(self, batch_size=1):
+        """Trace (et compile) les fonctions sur des lots factices ; retourne la durée en secondes"""
+        start = time.perf_counter()
+        self.predict(np.zeros((batch_size, *INPUT_SHAPE[1:]), dtype=np.float32))
+        if not self.legacy:
+            self.predict(np.zeros((batch_size, *INPUT_SHAPE[1:]), dtype=np.uint8))
+        return time.perf_counter() - start
+
+    def predict(self, images):
+        """Probabilités (N, 22) pour un lot d'images uint8 brutes ou float normalisées"""
+        images = np.asarray(images)
+        if self.legacy:
+            return self.model.predict(to_float_input(images), verbose=0)
+        if images.dtype == np.uint8:
+            return self._serve_uint8(tf.constant(images)).numpy()
+        return self._serve(tf.constant(images, dtype=tf.float32)).numpy()
+
+    __call__ = predict
+
+
+def load_serving_model(model_path=MODEL_PATH, jit_compile=False, legacy=False):
+    """Charge le modèle Keras et l'enveloppe pour le service"""
+    model = tf.keras.models.load_model(model_path)
+    return ServingModel(model, jit_compile=jit_compile, legacy=legacy)
+
+
+_fallback_models = {}
+_fallback_lock = threading.Lock()
+
+
+def keras_model_of(model, model_path=MODEL_PATH, fallback=True):
+    """Modèle Keras en mémoire derrière `model` (ServingModel)
+
+    Les autres backends (TFLite, SavedModel, pool de workers) n'en ont pas : le checkpoint est
+    alors chargé une seule fois par processus, avec un message, et partagé par les appelants.
+    Avec `fallback=False`, ValueError à la place (résultats qui doivent être ceux du modèle servi).
+    """
+    keras_model = getattr(model, 'model', None)
+    if keras_model is not None:
+        return keras_model
+    if not fallback:
+        raise ValueError(f"{type(model).__name__} n'a pas de modèle Keras en mémoire (backend 'keras' requis)")
+    with _fallback_lock:
+        if model_path not in _fallback_models:
+            print(f"[DermAI] {type(model).__name__} sans modèle Keras en mémoire : "
+                  f"chargement de {model_path}", flush=True)
+            _fallback_models[model_path] = tf.keras.models.load_model(model_path)
+        return _fallback_models[model_path]
+
+
+class SavedModelServing(ServingModel):
+    """Fonctions de service rechargées depuis un SavedModel exporté : ni désérialisation Keras
+    ni retraçage au démarrage"""
+
+    def __init__(self, path, warmup=True):
+        self.model = None
+        self.legacy = False
+        self.jit_compile = False
+        self.path = path
+        self._module = tf.saved_model.load(path)
+        self._serve = self._module.serve
+        self._serve_uint8 = self._module.serve_uint8
+        self.warmup_seconds = self.warmup() if warmup else None
+
+
+def export_savedmodel(model_path=MODEL_PATH, export_dir=SAVEDMODEL_DIR):
+    """Exporte les deux signatures de service (float32 et uint8) dans un SavedModel"""
+    model = tf.keras.models.load_model(model_path)
+    module = tf.Module()
+    module.model = model
+
+    @tf.function(input_signature=[tf.TensorSpec(INPUT_SHAPE, tf.float32)])
+    def serve(images):
+        return model(images, training=False)
+
+    @tf.function(input_signature=[tf.TensorSpec(UINT8_INPUT_SHAPE, tf.uint8)])
+    def serve_uint8(images):
+        return model(preprocess_in_graph(images), training=False)
+
+    module.serve = serve
+    module.serve_uint8 = serve_uint8
+    tf.saved_model.save(module, export_dir)
+    return export_dir
+
+
+def ensure_savedmodel(model_path=MODEL_PATH, export_dir=SAVEDMODEL_DIR):
+    """Répertoire du SavedModel, (ré)exporté d'abord s'il est absent ou périmé"""
+    saved_model = os.path.join(export_dir, 'saved_model.pb')
+    if not os.path.exists(saved_model) or os.path.getmtime(saved_model) < os.path.getmtime(model_path):
+        export_savedmodel(model_path, export_dir)
+    return export_dir
+
+
+def load_savedmodel(model_path=MODEL_PATH, export_dir=SAVEDMODEL_DIR):
+    """Charge le SavedModel en cache à côté du modèle, en le (ré)exportant s'il est absent ou périmé"""
+    return SavedModelServing(ensure_savedmodel(model_path, export_dir))
+
+
+def load_backend(backend='keras', model_path=MODEL_PATH, threads=None, tflite_dir=None, savedmodel_dir=None):
+    """Modèle Keras servi par tf.function, SavedModel pré-exporté ('savedmodel')
+    ou variante TFLite ('tflite-int8', ...)"""
+    if backend.startswith('tflite-'):
+        from tflite_backend import TFLITE_DIR, load_tflite_model
+        return load_tflite_model(backend.split('-', 1)[1], tflite_dir or TFLITE_DIR, threads, model_path)
+    if backend == 'savedmodel':
+        return load_savedmodel(model_path, savedmodel_dir or SAVEDMODEL_DIR)
+    return load_serving_model(model_path)
+
+
+def _latency_stats(wrapper, images, runs):
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        wrapper.predict(images)
+        latencies.append(time.perf_counter() - start)
+    return {
+        'mean_ms': float(np.mean(latencies) * 1000),
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+    }
+
+
+def compare_paths(model, batch_size=1, runs=100, xla=False):
+    """Latence moyenne par appel (ms) de model.predict et des fonctions tracées
+
+    Les fonctions tracées sont mesurées en float32 et en uint8 (entrée de l'interface et de
+    l'API) ; avec `xla`, les mêmes chemins compilés par XLA.
+    """
+    images = np.random.rand(batch_size, *INPUT_SHAPE[1:]).astype(np.float32)
+    images_uint8 = np.round(images * 255).astype(np.uint8)
+    legacy = ServingModel(model, legacy=True)
+    report = {'model.predict': _latency_stats(legacy, images, runs)}
+    variants = [('tf.function', ServingModel(model))]
+    if xla:
+        variants.append(('tf.function+xla', ServingModel(model, jit_compile=True)))
+    for name, wrapper in variants:
+        report[name] = _latency_stats(wrapper, images, runs)
+        report[f"{name} uint8"] = _latency_stats(wrapper, images_uint8, runs)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare model.predict et la fonction de service tracée")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--xla', action='store_true', help="Compile aussi une variante XLA")
+    args = parser.parse_args(argv)
+
+    model = tf.keras.models.load_model(args.model)
+    report = compare_paths(model, args.batch_size, args.runs, args.xla)
+
+    baseline = report['model.predict']['mean_ms']
+    for name, stats in report.items():
+        print(f"{name:<24} moyenne {stats['mean_ms']:8.2f} ms  p50 {stats['p50_ms']:8.2f} ms  "
+              f"p95 {stats['p95_ms']:8.2f} ms  (x{baseline / stats['mean_ms']:.1f})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""État de session compact et borné : prédictions par session, images décodées partagées
+
+Une session ne garde que le hash de l'image analysée et un vecteur float32 des probabilités ;
+le top-5 affiché est recalculé à la demande. Les images décodées sont conservées une seule
+fois, par hash de contenu, dans un cache commun limité en octets. Les sessions inactives
+sont évincées (Streamlit ne signale pas la fermeture d'un onglet).
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from inference import LABELS, disease_index, top_k_results
+
+
+class SessionPrediction:
+    """Dernière prédiction d'une session : hash binaire du contenu + probabilités float32"""
+
+    __slots__ = ('digest', 'probabilities')
+
+    def __init__(self, digest, probabilities):
+        self.digest = digest
+        self.probabilities = np.asarray(probabilities, dtype=np.float32)
+
+    @classmethod
+    def from_results(cls, content_hash, results):
+        """Depuis une liste top-k (résultat en cache) : les classes hors top-k valent 0"""
+        probabilities = np.zeros(len(LABELS), dtype=np.float32)
+        for result in results:
+            index = disease_index(result['disease'])
+            if index >= 0:
+                probabilities[index] = result['probability']
+        return cls(bytes.fromhex(content_hash), probabilities)
+
+    @property
+    def content_hash(self):
+        return self.digest.hex()
+
+    def results(self):
+        """Top-5 au format de predict_disease, dérivé à la demande"""
+        return top_k_results(self.probabilities)
+
+    def nbytes(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.digest) + sys.getsizeof(self.probabilities)
+
+
+class SessionStore:
+    """Prédictions par identifiant de session, avec éviction des sessions inactives"""
+
+    def __init__(self, idle_seconds=1800.0, sweep_interval=60.0):
+        self.idle_seconds = idle_seconds
+        self.sweep_interval = sweep_interval
+        self.evicted = 0
+        self._sessions = {}  # id → [dernière activité, utilisateur, SessionPrediction | None]
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def touch(self, session_id, user=None):
+        """Marque la session active (à chaque rerun) ; balaie périodiquement les inactives"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                self._sessions[session_id] = [now, user, None]
+            else:
+                entry[0] = now
+                entry[1] = user
+            if now - self._last_sweep >= self.sweep_interval:
+                self._evict_idle(now)
+
+    def put(self, session_id, prediction):
+        with self._lock:
+            entry = self._sessions.setdefault(session_id, [time.monotonic(), None, None])
+            entry[2] = prediction
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry[2] if entry is not None else None
+
+    def discard(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_idle(self):
+        """Retire les sessions inactives depuis plus de `idle_seconds` ; retourne leur nombre"""
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now):
+        self._last_sweep = now
+        idle = [key for key, (seen, _, _) in self._sessions.items() if now - seen > self.idle_seconds]
+        for key in idle:
+            del self._sessions[key]
+        self.evicted += len(idle)
+        return len(idle)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def report(self):
+        """Octets par session (entrée du registre + prédiction) et total"""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._sessions.items())
+        sessions = []
+        for session_id, entry in entries:
+            seen, user, prediction = entry
+            size = sys.getsizeof(session_id) + sys.getsizeof(entry)
+            if prediction is not None:
+                size += prediction.nbytes()
+            sessions.append({'session': session_id[:8], 'user': user, 'idle_seconds': now - seen,
+                             'has_prediction': prediction is not None, 'bytes': size})
+        return {
+            'sessions': sessions,
+            'count': len(sessions),
+            'total_bytes': sum(row['bytes'] for row in sessions),
+            'max_bytes': max((row['bytes'] for row in sessions), default=0),
+            'evicted': self.evicted,
+        }
+
+
+def process_rss_bytes():
+    """Mémoire résidente actuelle du processus (Linux), ou None"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def image_nbytes(image):
+    """Taille des pixels d'une image PIL décodée"""
+    return image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    """Images décodées partagées entre sessions, par hash de contenu, dans un budget d'octets (LRU)"""
+
+    def __init__(self, max_bytes=128 * 2**20):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_decode(self, content_hash, decode):
+        """Image en cache pour `content_hash`, sinon decode() (hors verrou) puis mise en cache"""
+        with self._lock:
+            image = self._entries.get(content_hash)
+            if image is not None:
+                self._entries.move_to_end(content_hash)
+                self.hits += 1
+                return image
+            self.misses += 1
+        image = decode()
+        size = image_nbytes(image)
+        if size > self.max_bytes:
+            return image  # plus grande que tout le budget : servie sans être gardée
+        with self._lock:
+            if content_hash not in self._entries:
+                self._entries[content_hash] = image
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self.bytes -= image_nbytes(evicted)
+                    self.evictions += 1
+        return image
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
@@ -0,0 +1,285 @@
+"""Cas similaires : embeddings de l'avant-dernière couche du modèle et index de vecteurs
+
+Indexation hors ligne d'un dossier de référence (par exemple SkinDisease/train/<Classe>/...) :
+    python similar_cases.py index SkinDisease/train --output data/cases --ivf-lists 256
+    python similar_cases.py query photo.jpg -k 5
+
+L'index est une matrice float32 (N, d) de vecteurs normalisés, mappée en mémoire (.npy),
+et un fichier JSON de métadonnées (chemin et classe de chaque cas). La recherche exacte est
+un produit matriciel NumPy ; pour les grandes collections, un index IVF optionnel (k-means,
+vecteurs regroupés par liste) ne parcourt que les `nprobe` listes les plus proches.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from decoding import decode_image
+from inference import CLASSES_PREDICTION, MODEL_PATH, disease_name, preprocess_uint8
+
+VECTORS_FILE = 'embeddings.npy'
+METADATA_FILE = 'cases.json'
+IVF_FILE = 'ivf.npz'
+
+
+def normalize(vectors):
+    """Vecteurs de norme 1 (le produit scalaire devient la similarité cosinus)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class EmbeddingExtractor:
+    """Sortie de l'avant-dernière couche (dense_19, 32 valeurs) du modèle Keras
+
+    Sans modèle fourni, le checkpoint est chargé (indexation hors ligne) ; dans l'application,
+    voir extractor_for. Entrée uint8 de taille quelconque, redimensionnée dans le graphe comme
+    pour la prédiction.
+    """
+
+    def __init__(self, keras_model=None, model_path=MODEL_PATH, layer=None):
+        import tensorflow as tf
+        from serving import UINT8_INPUT_SHAPE, preprocess_in_graph
+
+        if keras_model is None:
+            keras_model = tf.keras.models.load_model(model_path)
+        self.layer = layer or keras_model.layers[-2].name
+        output = keras_model.get_layer(self.layer).output
+        self.model = tf.keras.Model(keras_model.inputs, output)
+        self.dim = int(output.shape[-1])
+        self._embed = tf.function(
+            lambda images: self.model(preprocess_in_graph(images), training=False),
+            input_signature=[tf.TensorSpec(UINT8_INPUT_SHAPE, tf.uint8)],
+        )
+
+    def embed(self, images):
+        """Embeddings normalisés (N, d) float32 d'un lot d'images uint8 (N, H, W, 3)"""
+        import tensorflow as tf
+        return normalize(self._embed(tf.constant(np.asarray(images, dtype=np.uint8))).numpy())
+
+    def embed_image(self, image):
+        """Embedding (d,) d'une image PIL décodée"""
+        return self.embed(preprocess_uint8(image))[0]
+
+
+def extractor_for(model):
+    """Extracteur sur le modèle Keras du modèle servi (serving.keras_model_of)"""
+    from serving import keras_model_of
+
+    return EmbeddingExtractor(keras_model_of(model))
+
+
+def case_label(path, root):
+    """Classe d'un cas d'après son dossier parent (nom DISEASE_INFO si c'est une classe du modèle)"""
+    folder = os.path.basename(os.path.dirname(os.path.relpath(path, root)))
+    if folder in CLASSES_PREDICTION:
+        return disease_name(CLASSES_PREDICTION[folder])
+    return folder or None
+
+
+class IVFIndex:
+    """Index à listes inversées : centroïdes k-means et bornes des listes
+
+    La matrice de l'index est rangée liste par liste : `offsets[i]:offsets[i + 1]` délimite la
+    liste i, et chaque liste sondée est une tranche contiguë de la matrice mappée.
+    """
+
+    def __init__(self, centroids, offsets):
+        self.centroids = centroids
+        self.offsets = offsets
+
+    @staticmethod
+    def train(vectors, lists, iterations=10, sample=100_000, seed=0, chunk=65536):
+        """k-means sphérique sur un échantillon ; retourne (centroïdes, liste de chaque vecteur)"""
+        rng = np.random.default_rng(seed)
+        count = len(vectors)
+        lists = max(1, min(lists, count))
+        training = np.asarray(vectors[np.sort(rng.choice(count, min(sample, count), replace=False))])
+        centroids = training[rng.choice(len(training), lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(training @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, training)
+            empty = np.bincount(assignment, minlength=lists) == 0
+            sums[empty] = training[rng.choice(len(training), int(empty.sum()))]
+            centroids = normalize(sums)
+
+        assignment = np.empty(count, dtype=np.int32)
+        for start in range(0, count, chunk):
+            assignment[start:start + chunk] = np.argmax(np.asarray(vectors[start:start + chunk]) @ centroids.T, axis=1)
+        return centroids, assignment
+
+    def probe(self, query, nprobe):
+        """Tranches (début, fin) des `nprobe` listes dont le centroïde est le plus proche"""
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return [(self.offsets[probe], self.offsets[probe + 1]) for probe in probes]
+
+    def save(self, path):
+        np.savez(path, centroids=self.centroids, offsets=self.offsets)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['centroids'], data['offsets'])
+
+
+class CaseIndex:
+    """Matrice d'embeddings mappée en mémoire + métadonnées, recherche des k plus proches voisins"""
+
+    def __init__(self, vectors, cases, ivf=None, info=None):
+        self.vectors = vectors
+        self.cases = cases
+        self.ivf = ivf
+        self.info = info or {}
+
+    def __len__(self):
+        return len(self.vectors)
+
+    @classmethod
+    def load(cls, directory):
+        """Ouvre un index écrit par write_index (matrice mappée en lecture seule)"""
+        with open(os.path.join(directory, METADATA_FILE), encoding='utf-8') as handle:
+            metadata = json.load(handle)
+        vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode='r')
+        ivf_path = os.path.join(directory, IVF_FILE)
+        ivf = IVFIndex.load(ivf_path) if os.path.exists(ivf_path) else None
+        cases = metadata.pop('cases')
+        return cls(vectors, cases, ivf, metadata)
+
+    def search(self, query, k=5, nprobe=None):
+        """Indices et similarités cosinus des k cas les plus proches, du plus au moins similaire
+
+        `nprobe` : nombre de listes IVF parcourues (None : recherche exacte sur tout l'index).
+        """
+        query = normalize(query).reshape(-1)
+        if nprobe is None or self.ivf is None:
+            return top_k_scores(self.vectors @ query, k)
+
+        slices = [(start, stop) for start, stop in self.ivf.probe(query, nprobe) if stop > start]
+        if not slices:
+            return top_k_scores(np.empty(0, dtype=np.float32), k)
+        scores = np.concatenate([self.vectors[start:stop] @ query for start, stop in slices])
+        positions = np.concatenate([np.arange(start, stop) for start, stop in slices])
+        best, best_scores = top_k_scores(scores, k)
+        return positions[best], best_scores
+
+    def similar(self, query, k=5, nprobe=None):
+        """Cas (métadonnées + similarité) les plus proches d'un embedding"""
+        indices, scores = self.search(query, k, nprobe)
+        return [dict(self.cases[int(index)], similarity=float(score)) for index, score in zip(indices, scores)]
+
+
+def top_k_scores(scores, k):
+    """Indices des k meilleurs scores, triés par score décroissant (argpartition puis tri de k)"""
+    k = min(k, len(scores))
+    if k == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind='stable')]
+    return best, scores[best]
+
+
+def write_index(directory, vectors, cases, ivf_lists=0, info=None, chunk=65536):
+    """Écrit la matrice (vecteurs normalisés), les métadonnées et, si ivf_lists > 0, l'index IVF
+
+    Avec IVF, vecteurs et cas sont réordonnés liste par liste avant l'écriture. `vectors` peut
+    être lui-même mappé en mémoire : la matrice est écrite dans un fichier temporaire puis
+    renommée.
+    """
+    os.makedirs(directory, exist_ok=True)
+    info = dict(info or {}, count=len(cases), dim=int(vectors.shape[1]), created=time.time())
+    ivf_path = os.path.join(directory, IVF_FILE)
+    order = None
+    if ivf_lists > 0:
+        centroids, assignment = IVFIndex.train(vectors, ivf_lists)
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=len(centroids)))])
+        IVFIndex(centroids, offsets.astype(np.int64)).save(ivf_path)
+        cases = [cases[index] for index in order]
+        info['ivf_lists'] = len(centroids)
+    elif os.path.exists(ivf_path):
+        os.remove(ivf_path)
+
+    temporary = os.path.join(directory, f'.{VECTORS_FILE}.tmp')
+    matrix = np.lib.format.open_memmap(temporary, mode='w+', dtype=np.float32, shape=(len(cases), vectors.shape[1]))
+    for start in range(0, len(cases), chunk):
+        rows = order[start:start + chunk] if order is not None else slice(start, start + chunk)
+        matrix[start:start + chunk] = vectors[rows]
+    matrix.flush()
+    del matrix
+    os.replace(temporary, os.path.join(directory, VECTORS_FILE))
+    with open(os.path.join(directory, METADATA_FILE), 'w', encoding='utf-8') as handle:
+        json.dump(dict(info, cases=cases), handle, ensure_ascii=False)
+
+
+def build_index(source, directory, extractor, batch_size=64, workers=4, ivf_lists=0, progress=None):
+    """Embeddings de toutes les images de `source` (décodées comme pour la prédiction) indexés dans `directory`"""
+    from batch_classify import iter_batches, iter_image_paths
+
+    paths = list(iter_image_paths(source))
+    root = source if os.path.isdir(source) else os.path.dirname(os.path.abspath(source))
+    os.makedirs(directory, exist_ok=True)
+    staging = os.path.join(directory, '.staging.npy')
+    vectors = np.lib.format.open_memmap(staging, mode='w+', dtype=np.float32, shape=(len(paths), extractor.dim))
+    cases, errors = [], []
+    for batch_paths, batch, batch_errors in iter_batches(paths, batch_size, workers):
+        errors.extend(batch_errors)
+        if batch is not None:
+            vectors[len(cases):len(cases) + len(batch_paths)] = extractor.embed(batch)
+            cases.extend({'path': os.path.abspath(path), 'label': case_label(path, root)} for path in batch_paths)
+        if progress:
+            progress(len(cases) + len(errors), len(paths))
+    try:
+        # Les images illisibles sont ignorées : seules les len(cases) premières lignes sont écrites
+        write_index(directory, vectors[:len(cases)], cases, ivf_lists,
+                    {'layer': extractor.layer, 'source': os.path.abspath(source)})
+    finally:
+        del vectors
+        os.remove(staging)
+    return len(cases), errors
+
+
+def main(argv=None):
+    import config
+
+    parser = argparse.ArgumentParser(description="Index des cas de référence et recherche de cas similaires")
+    commands = parser.add_subparsers(dest='command', required=True)
+    index_parser = commands.add_parser('index', help="Indexe un dossier (ou un manifeste) d'images de référence")
+    index_parser.add_argument('source')
+    index_parser.add_argument('--output', default=config.CASES_INDEX_DIR)
+    index_parser.add_argument('--batch-size', type=int, default=64)
+    index_parser.add_argument('--workers', type=int, default=4)
+    index_parser.add_argument('--ivf-lists', type=int, default=0, help="Listes IVF (0 = recherche exacte seulement)")
+    query_parser = commands.add_parser('query', help="Cas les plus proches d'une image")
+    query_parser.add_argument('image')
+    query_parser.add_argument('--index', default=config.CASES_INDEX_DIR)
+    query_parser.add_argument('-k', type=int, default=config.CASES_TOP_K)
+    query_parser.add_argument('--nprobe', type=int, default=config.CASES_NPROBE or None)
+    args = parser.parse_args(argv)
+
+    extractor = EmbeddingExtractor()
+    if args.command == 'index':
+        start = time.perf_counter()
+        count, errors = build_index(
+            args.source, args.output, extractor, args.batch_size, args.workers, args.ivf_lists,
+            progress=lambda done, total: print(f"\r{done}/{total}", end='', file=sys.stderr, flush=True),
+        )
+        print(file=sys.stderr)
+        for path, error in errors:
+            print(f"Ignorée: {path} ({error})", file=sys.stderr)
+        print(f"{count} cas indexés dans {args.output} en {time.perf_counter() - start:.1f}s")
+        return 0
+
+    index = CaseIndex.load(args.index)
+    query = extractor.embed_image(decode_image(args.image))
+    for case in index.similar(query, args.k, args.nprobe):
+        print(f"{case['similarity']:.3f}  {case['label'] or '-':<24} {case['path']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
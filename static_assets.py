@@ -0,0 +1,156 @@
+"""Chaîne de construction des images statiques : GIF de la barre latérale en WebP animé (et image
+fixe pour le mode léger), vignettes WebP du carrousel à plusieurs largeurs
+
+Les fichiers produits vont dans static/, servi par Streamlit sous app/static
+(server.enableStaticServing dans .streamlit/config.toml) : le navigateur les télécharge une fois
+et les garde en cache au lieu de les recevoir à chaque rerun.
+
+    python static_assets.py build      # (re)construit ce qui est périmé
+    python static_assets.py report     # octets transférés par chargement de page, avant / après
+"""
+import argparse
+import base64
+import os
+from functools import lru_cache
+
+from PIL import Image, ImageSequence
+
+SOURCE_DIR = 'assets'
+STATIC_DIR = 'static'
+STATIC_URL = 'app/static'
+SIDEBAR_SOURCE = '4.gif'
+CAROUSEL_SOURCES = ('2.jpg', '3.jpg', '355d4716ca9b46301e5b38ac9e01c4a0.jpg')
+CAROUSEL_WIDTHS = (480, 960)
+WEBP_QUALITY = 75
+ANIMATION_QUALITY = 70
+
+
+def sidebar_path(poster=False, directory=STATIC_DIR):
+    stem = os.path.splitext(SIDEBAR_SOURCE)[0]
+    return os.path.join(directory, f"{stem}-poster.webp" if poster else f"{stem}.webp")
+
+
+def carousel_path(name, width, directory=STATIC_DIR):
+    return os.path.join(directory, 'carousel', f"{os.path.splitext(name)[0]}-{width}.webp")
+
+
+def _is_stale(source, output):
+    return not os.path.exists(output) or os.path.getmtime(output) < os.path.getmtime(source)
+
+
+def _write_animation(source, output):
+    """GIF → WebP animé (mêmes durées d'images, boucle infinie)"""
+    with Image.open(source) as image:
+        durations = [frame.info.get('duration', 100) for frame in ImageSequence.Iterator(image)]
+        image.seek(0)
+        image.save(output, 'WEBP', save_all=True, duration=durations, loop=image.info.get('loop', 0),
+                   quality=ANIMATION_QUALITY, method=4)
+
+
+def _write_poster(source, output):
+    """Première image du GIF en WebP fixe"""
+    with Image.open(source) as image:
+        image.convert('RGB').save(output, 'WEBP', quality=WEBP_QUALITY, method=6)
+
+
+def _write_thumbnail(source, output, width):
+    """Vignette WebP d'au plus `width` pixels de large (jamais agrandie)"""
+    with Image.open(source) as image:
+        image = image.convert('RGB')
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.Resampling.LANCZOS)
+        image.save(output, 'WEBP', quality=WEBP_QUALITY, method=6)
+
+
+def build(source_dir=SOURCE_DIR, output_dir=STATIC_DIR, force=False):
+    """Construit les fichiers périmés ; retourne [(source, sortie, octets source, octets sortie)]"""
+    os.makedirs(os.path.join(output_dir, 'carousel'), exist_ok=True)
+    gif = os.path.join(source_dir, SIDEBAR_SOURCE)
+    jobs = [
+        (gif, sidebar_path(False, output_dir), _write_animation),
+        (gif, sidebar_path(True, output_dir), _write_poster),
+    ]
+    for name in CAROUSEL_SOURCES:
+        for width in CAROUSEL_WIDTHS:
+            jobs.append((os.path.join(source_dir, name), carousel_path(name, width, output_dir),
+                         lambda source, output, width=width: _write_thumbnail(source, output, width)))
+    rows = []
+    for source, output, write in jobs:
+        if force or _is_stale(source, output):
+            write(source, output)
+        rows.append((source, output, os.path.getsize(source), os.path.getsize(output)))
+    return rows
+
+
+@lru_cache(maxsize=None)
+def asset_bytes(path):
+    """Octets d'un fichier, lus une seule fois par processus"""
+    with open(path, 'rb') as asset:
+        return asset.read()
+
+
+@lru_cache(maxsize=None)
+def data_url(path):
+    """URL data: d'une image (quand le service statique est désactivé), encodée une fois"""
+    mime = 'image/webp' if path.endswith('.webp') else 'image/gif' if path.endswith('.gif') else 'image/jpeg'
+    return f"data:{mime};base64,{base64.b64encode(asset_bytes(path)).decode()}"
+
+
+def asset_url(path, static_serving, base_url_path='', absolute=False):
+    """URL servie par Streamlit (/app/static/...) ou, à défaut, URL data: mise en cache
+
+    st.image reconnaît /app/static/ tel quel ; les composants (carrousel) sont rendus dans une
+    iframe et ont besoin du chemin complet, préfixe server.baseUrlPath compris.
+    """
+    if not static_serving:
+        return data_url(path)
+    relative = os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')
+    base = base_url_path.strip('/') if absolute else ''
+    return f"/{base}/{STATIC_URL}/{relative}" if base else f"/{STATIC_URL}/{relative}"
+
+
+def carousel_width(light=False):
+    return CAROUSEL_WIDTHS[0] if light else CAROUSEL_WIDTHS[-1]
+
+
+def transfer_report(source_dir=SOURCE_DIR, output_dir=STATIC_DIR):
+    """Octets d'images reçus par le navigateur pour un chargement de page, avant / après
+
+    Avant : GIF d'origine dans la barre latérale, JPEG d'origine encodés en base64 par le
+    carrousel (à chaque rerun de l'accueil). Après : fichiers statiques (mis en cache par le
+    navigateur après le premier chargement).
+    """
+    gif = os.path.getsize(os.path.join(source_dir, SIDEBAR_SOURCE))
+    carousel_before = sum(len(base64.b64encode(asset_bytes(os.path.join(source_dir, name))))
+                          for name in CAROUSEL_SOURCES)
+    rows = []
+    for light in (False, True):
+        sidebar = os.path.getsize(sidebar_path(poster=light, directory=output_dir))
+        carousel = sum(os.path.getsize(carousel_path(name, carousel_width(light), output_dir))
+                       for name in CAROUSEL_SOURCES)
+        mode = 'léger' if light else 'normal'
+        rows.append({'page': 'accueil', 'mode': mode, 'before': gif + carousel_before, 'after': sidebar + carousel})
+        rows.append({'page': 'autres pages', 'mode': mode, 'before': gif, 'after': sidebar})
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Construction des images statiques de l'interface")
+    parser.add_argument('command', choices=('build', 'report'))
+    parser.add_argument('--force', action='store_true', help="Reconstruit tout, même à jour")
+    args = parser.parse_args(argv)
+
+    rows = build(force=args.force)
+    if args.command == 'build':
+        for source, output, before, after in rows:
+            print(f"{source:<48} → {output:<48} {before / 1024:>8.0f} Ko → {after / 1024:>6.0f} Ko")
+        return
+
+    print(f"{'page':<14} {'mode':<7} {'avant Ko':>9} {'après Ko':>9} {'gain':>6}")
+    for row in transfer_report():
+        print(f"{row['page']:<14} {row['mode']:<7} {row['before'] / 1024:>9.0f} {row['after'] / 1024:>9.0f} "
+              f"{row['before'] / row['after']:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
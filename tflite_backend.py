@@ -0,0 +1,217 @@
+"""Backend TFLite : export float32 / float16 / dynamique / int8 et comparaison avec le modèle Keras
+
+Exemples:
+    python tflite_backend.py export
+    python tflite_backend.py compare --synthetic 128 --threads 4
+"""
+import argparse
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+from inference import IMAGE_SIZE, MODEL_PATH, preprocess_image, to_float_input
+
+TFLITE_DIR = os.path.join(os.path.dirname(MODEL_PATH), 'tflite')
+VARIANTS = ('float32', 'float16', 'dynamic', 'int8')
+CALIBRATION_DIR = 'assets'
+TFLITE_IDENTIFIER = b'TFL3'
+
+
+def interpreter_class():
+    """Interpréteur LiteRT si installé (démarrage sans importer TensorFlow), sinon tf.lite.Interpreter"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+def tflite_path(variant, directory=TFLITE_DIR):
+    return os.path.join(directory, f"model_{variant}.tflite")
+
+
+def calibration_images(directory=CALIBRATION_DIR, synthetic=64, seed=0):
+    """Images (N, 64, 64, 3) float32 : celles de `directory` puis des images synthétiques"""
+    images = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.jp*g')) + glob.glob(os.path.join(directory, '*.png'))):
+        with Image.open(path) as image:
+            images.append(preprocess_image(image.convert('RGB'))[0])
+    rng = np.random.default_rng(seed)
+    for _ in range(synthetic):
+        # Fond de teinte cutanée uniforme + tache sombre + bruit
+        base = rng.uniform([0.5, 0.3, 0.2], [1.0, 0.8, 0.7])
+        image = np.ones((*IMAGE_SIZE, 3)) * base
+        cy, cx = rng.integers(8, IMAGE_SIZE[0] - 8, size=2)
+        yy, xx = np.ogrid[:IMAGE_SIZE[0], :IMAGE_SIZE[1]]
+        mask = (yy - cy) ** 2 + (xx - cx) ** 2 < rng.integers(16, 200)
+        image[mask] *= rng.uniform(0.3, 0.8)
+        image += rng.normal(0, 0.03, image.shape)
+        images.append(np.clip(image, 0, 1))
+    return np.stack(images).astype(np.float32)
+
+
+def convert(model, variant, calibration=None):
+    """Convertit un modèle Keras en TFLite pour une variante ; retourne les octets"""
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if variant == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == 'dynamic':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif variant == 'int8':
+        if calibration is None:
+            calibration = calibration_images()
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([image[np.newaxis]] for image in calibration)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    elif variant != 'float32':
+        raise ValueError(f"Variante TFLite inconnue: {variant} (attendu: {', '.join(VARIANTS)})")
+    return converter.convert()
+
+
+def export_tflite(model_path=MODEL_PATH, output_dir=TFLITE_DIR, variants=VARIANTS):
+    """Exporte les variantes demandées ; retourne {variante: chemin}"""
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(model_path)
+    os.makedirs(output_dir, exist_ok=True)
+    calibration = calibration_images() if 'int8' in variants else None
+    paths = {}
+    for variant in variants:
+        path = tflite_path(variant, output_dir)
+        # Conversion avant toute écriture, puis renommage atomique : jamais de fichier vide ou partiel
+        flatbuffer = convert(model, variant, calibration)
+        with open(f"{path}.tmp", 'wb') as output:
+            output.write(flatbuffer)
+        os.replace(f"{path}.tmp", path)
+        paths[variant] = path
+    return paths
+
+
+class TFLiteModel:
+    """Modèle TFLite avec la même interface predict() que ServingModel"""
+
+    def __init__(self, path, num_threads=None):
+        self.path = path
+        self.interpreter = interpreter_class()(model_path=path, num_threads=num_threads)
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+        self._lock = threading.Lock()  # l'interpréteur n'est pas réentrant
+
+    def predict(self, images):
+        images = to_float_input(images)
+        with self._lock:
+            if images.shape[0] != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input['index'], images.shape)
+                self.interpreter.allocate_tensors()
+                self._batch_size = images.shape[0]
+            self.interpreter.set_tensor(self._input['index'], images)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output['index']).copy()
+
+    __call__ = predict
+
+
+def is_tflite_file(path):
+    """Vrai si `path` se lit et commence par l'en-tête d'un flatbuffer TFLite (identifiant TFL3)"""
+    try:
+        with open(path, 'rb') as model_file:
+            header = model_file.read(8)
+    except OSError:
+        return False
+    return header[4:8] == TFLITE_IDENTIFIER
+
+
+def ensure_tflite(variant, directory=TFLITE_DIR, model_path=MODEL_PATH):
+    """Chemin d'une variante TFLite, (ré)exportée d'abord si elle est absente, illisible ou périmée"""
+    path = tflite_path(variant, directory)
+    if not is_tflite_file(path) or os.path.getmtime(path) < os.path.getmtime(model_path):
+        export_tflite(model_path, directory, (variant,))
+    return path
+
+
+def load_tflite_model(variant, directory=TFLITE_DIR, num_threads=None, model_path=MODEL_PATH):
+    """Charge une variante TFLite, en l'exportant d'abord si elle est absente ou périmée"""
+    return TFLiteModel(ensure_tflite(variant, directory, model_path), num_threads)
+
+
+def _mean_latency_ms(predict, images, batch_size):
+    latencies = []
+    for start in range(0, len(images), batch_size):
+        batch = images[start:start + batch_size]
+        begin = time.perf_counter()
+        predict(batch)
+        latencies.append((time.perf_counter() - begin) / len(batch))
+    return float(np.mean(latencies) * 1000)
+
+
+def compare_backends(images, model_path=MODEL_PATH, directory=TFLITE_DIR, variants=VARIANTS,
+                     num_threads=None, batch_size=1):
+    """Accord top-1 avec le modèle Keras, latence par image et taille de chaque backend"""
+    import tensorflow as tf
+    from serving import ServingModel
+
+    keras_model = ServingModel(tf.keras.models.load_model(model_path))
+    reference = keras_model.predict(images)
+    reference_top1 = reference.argmax(axis=1)
+    keras_model.predict(images[:batch_size])  # préchauffage
+    rows = [{
+        'backend': 'keras',
+        'top1_agreement': 1.0,
+        'max_abs_diff': 0.0,
+        'latency_ms': _mean_latency_ms(keras_model.predict, images, batch_size),
+        'size_kb': os.path.getsize(model_path) / 1024,
+    }]
+    for variant in variants:
+        backend = load_tflite_model(variant, directory, num_threads, model_path)
+        outputs = backend.predict(images)
+        backend.predict(images[:batch_size])
+        rows.append({
+            'backend': f"tflite-{variant}",
+            'top1_agreement': float(np.mean(outputs.argmax(axis=1) == reference_top1)),
+            'max_abs_diff': float(np.abs(outputs - reference).max()),
+            'latency_ms': _mean_latency_ms(backend.predict, images, batch_size),
+            'size_kb': os.path.getsize(backend.path) / 1024,
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export et comparaison des backends TFLite")
+    parser.add_argument('command', choices=('export', 'compare'))
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--output-dir', default=TFLITE_DIR)
+    parser.add_argument('--variants', nargs='+', default=list(VARIANTS), choices=VARIANTS)
+    parser.add_argument('--images', default=CALIBRATION_DIR, help="Dossier d'images de test")
+    parser.add_argument('--synthetic', type=int, default=64, help="Nombre d'images synthétiques ajoutées")
+    parser.add_argument('--threads', type=int, default=None, help="Threads de l'interpréteur TFLite")
+    parser.add_argument('--batch-size', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        for variant, path in export_tflite(args.model, args.output_dir, args.variants).items():
+            print(f"{variant:<8} {path} ({os.path.getsize(path) / 1024:.0f} Ko)")
+        return
+
+    images = calibration_images(args.images, args.synthetic, seed=1)
+    rows = compare_backends(images, args.model, args.output_dir, args.variants, args.threads, args.batch_size)
+    print(f"{len(images)} images, lots de {args.batch_size}")
+    print(f"{'backend':<16} {'accord top-1':>12} {'écart max':>10} {'ms/image':>9} {'taille Ko':>10}")
+    for row in rows:
+        print(f"{row['backend']:<16} {row['top1_agreement']:>12.1%} {row['max_abs_diff']:>10.4f} "
+              f"{row['latency_ms']:>9.3f} {row['size_kb']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
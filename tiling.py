@@ -0,0 +1,206 @@
+"""Analyse par zones des photos haute résolution : fenêtres glissantes en lots et carte de chaleur
+
+Réduire toute une photo en 64x64 efface les petites lésions d'une grande zone du corps. Ici
+l'image est réduite une fois par échelle, de sorte qu'une fenêtre couvrant `scale` du petit
+côté fasse 64x64 pixels ; les fenêtres (recouvrement `overlap`) sont des vues NumPy à pas
+(sliding_window_view), copiées par lots seulement au moment de passer dans le modèle.
+
+    python tiling.py photo.jpg --output carte.png
+"""
+import argparse
+import sys
+from contextlib import nullcontext
+
+import numpy as np
+from PIL import Image
+
+from decoding import to_rgb
+from inference import IMAGE_SIZE, disease_index, top_k_results
+
+TILE_SCALES = (0.5, 0.25, 0.125)  # côté de la fenêtre, en fraction du petit côté de l'image
+TILE_OVERLAP = 0.5
+TILE_BATCH_SIZE = 128
+TILE_MAX_TILES = 1024
+HEATMAP_COLOR = (230, 40, 40)
+
+
+def tile_views(pixels, tile=IMAGE_SIZE[0], stride=IMAGE_SIZE[0] // 2):
+    """Vue (lignes, colonnes, tile, tile, 3) des fenêtres d'un tableau (H, W, 3), sans copie"""
+    windows = np.lib.stride_tricks.sliding_window_view(pixels, (tile, tile), axis=(0, 1))
+    return windows[::stride, ::stride].transpose(0, 1, 3, 4, 2)
+
+
+def scaled_grid(size, scale, overlap, tile=IMAGE_SIZE[0]):
+    """Taille de réduction (largeur, hauteur) et pas pour une échelle
+
+    La taille est arrondie pour que les fenêtres couvrent exactement l'image, bords compris
+    (déformation inférieure à un demi-pas).
+    """
+    width, height = size
+    factor = tile / (scale * min(width, height))
+    stride = max(1, round(tile * (1 - overlap)))
+    columns = max(0, round((width * factor - tile) / stride))
+    rows = max(0, round((height * factor - tile) / stride))
+    return (tile + columns * stride, tile + rows * stride), stride
+
+
+class TooManyTilesError(ValueError):
+    """Image trop allongée : même l'échelle la plus grossière dépasse le nombre de fenêtres permis"""
+
+
+def tile_count(size, scales, overlap, tile=IMAGE_SIZE[0]):
+    """Nombre de fenêtres analysées pour une image de taille `size` (largeur, hauteur)"""
+    count = 0
+    for scale in scales:
+        (width, height), stride = scaled_grid(size, scale, overlap, tile)
+        count += ((width - tile) // stride + 1) * ((height - tile) // stride + 1)
+    return count
+
+
+def fit_scales(size, scales, overlap, max_tiles=TILE_MAX_TILES, tile=IMAGE_SIZE[0]):
+    """Échelles gardées pour rester sous `max_tiles` fenêtres, dans l'ordre de `scales`
+
+    Les plus fines (les plus coûteuses) sont abandonnées d'abord ; () si même la plus grossière
+    dépasse. Le nombre de fenêtres ne dépend que des proportions de l'image : une bande de
+    3000x100 en donnerait 9215 aux échelles par défaut.
+    """
+    kept = []
+    count = 0
+    for scale in sorted(scales, reverse=True):
+        count += tile_count(size, (scale,), overlap, tile)
+        if count > max_tiles:
+            break
+        kept.append(scale)
+    return tuple(scale for scale in scales if scale in kept)
+
+
+class TileAnalysis:
+    """Résultat de l'analyse par zones : probabilités agrégées et carte (lignes, colonnes, 22)"""
+
+    def __init__(self, probabilities, heat, tiles, scales):
+        self.probabilities = probabilities
+        self.heat = heat
+        self.tiles = tiles
+        self.scales = scales
+
+    def results(self):
+        """Top-5 agrégé, au format de predict_disease"""
+        return top_k_results(self.probabilities)
+
+    def class_heat(self, disease):
+        """Carte (lignes, colonnes) des probabilités d'une classe DISEASE_INFO"""
+        return self.heat[..., disease_index(disease)]
+
+
+def analyze(image, model, scales=TILE_SCALES, overlap=TILE_OVERLAP, batch_size=TILE_BATCH_SIZE,
+            aggregate='max', timer=None, max_tiles=TILE_MAX_TILES):
+    """Classe toutes les fenêtres de `image` (PIL) à chaque échelle, par lots de `batch_size`
+
+    Au-delà de `max_tiles` fenêtres, les échelles les plus fines sont abandonnées (fit_scales) ;
+    TooManyTilesError si aucune ne tient (`max_tiles` nul ou None : pas de limite).
+
+    Agrégation 'max' : maximum par classe sur les fenêtres puis renormalisation (une lésion
+    visible dans une seule zone compte) ; 'mean' : moyenne des fenêtres. La carte est calculée
+    sur une grille dont la cellule vaut le plus petit pas, chaque cellule recevant la moyenne
+    des fenêtres qui la recouvrent (sommes par tableau de différences, sans boucle Python).
+    """
+    def stage(name):
+        return timer.stage(name) if timer is not None else nullcontext()
+
+    image = to_rgb(image)
+    width, height = image.size
+    if max_tiles:
+        fitted = fit_scales(image.size, scales, overlap, max_tiles)
+        if not fitted:
+            raise TooManyTilesError(f"Image de {width}x{height} : plus de {max_tiles} zones à analyser")
+        scales = fitted
+    grids = []
+    with stage('preprocess'):
+        # Une seule réduction de l'image entière par échelle
+        for scale in scales:
+            (scaled_width, scaled_height), stride = scaled_grid(image.size, scale, overlap)
+            grids.append((stride, scaled_width / width, scaled_height / height,
+                          np.asarray(image.resize((scaled_width, scaled_height), Image.Resampling.BILINEAR))))
+
+    cell = min(stride / fx for stride, fx, _, _ in grids)
+    rows, columns = int(np.ceil(height / cell)), int(np.ceil(width / cell))
+    sums = None
+    counts = np.zeros((rows + 1, columns + 1), dtype=np.float32)
+    maximum = None
+    total = 0
+    tile = IMAGE_SIZE[0]
+    with stage('inference'):
+        for stride, fx, fy, pixels in grids:
+            tiles = tile_views(pixels, tile, stride)
+            grid_rows, grid_columns = tiles.shape[:2]
+            rows_per_batch = max(1, batch_size // grid_columns)
+            outputs = []
+            for start in range(0, grid_rows, rows_per_batch):
+                batch = np.ascontiguousarray(tiles[start:start + rows_per_batch]).reshape(-1, tile, tile, 3)
+                outputs.append(np.asarray(model.predict(batch), dtype=np.float32))
+            probabilities = np.concatenate(outputs)
+            total += len(probabilities)
+            if sums is None:
+                sums = np.zeros((rows + 1, columns + 1, probabilities.shape[1]), dtype=np.float32)
+                maximum = probabilities.max(axis=0)
+            else:
+                maximum = np.maximum(maximum, probabilities.max(axis=0))
+
+            # Boîtes des fenêtres en cellules de la grille (coordonnées de l'image d'origine)
+            row_index, column_index = np.divmod(np.arange(len(probabilities)), grid_columns)
+            y0 = np.minimum(np.floor(row_index * stride / fy / cell).astype(int), rows - 1)
+            x0 = np.minimum(np.floor(column_index * stride / fx / cell).astype(int), columns - 1)
+            y1 = np.clip(np.round((row_index * stride + tile) / fy / cell).astype(int), y0 + 1, rows)
+            x1 = np.clip(np.round((column_index * stride + tile) / fx / cell).astype(int), x0 + 1, columns)
+            for ys, xs, sign in ((y0, x0, 1), (y0, x1, -1), (y1, x0, -1), (y1, x1, 1)):
+                np.add.at(sums, (ys, xs), sign * probabilities)
+                np.add.at(counts, (ys, xs), sign)
+
+    sums = sums.cumsum(axis=0).cumsum(axis=1)[:rows, :columns]
+    counts = counts.cumsum(axis=0).cumsum(axis=1)[:rows, :columns]
+    heat = sums / np.maximum(counts, 1)[..., np.newaxis]
+    if aggregate == 'max':
+        aggregated = maximum / maximum.sum()
+    elif aggregate == 'mean':
+        aggregated = heat.reshape(-1, heat.shape[-1]).mean(axis=0)
+        aggregated /= aggregated.sum()
+    else:
+        raise ValueError(f"Agrégation inconnue: {aggregate}")
+    return TileAnalysis(aggregated.astype(np.float32), heat.astype(np.float32), total, tuple(scales))
+
+
+def heatmap_overlay(image, heat, color=HEATMAP_COLOR, opacity=0.6):
+    """Superpose une carte de probabilités (lignes, colonnes) dans [0, 1] à l'image"""
+    image = to_rgb(image)
+    mask = Image.fromarray(np.clip(heat * opacity * 255, 0, 255).astype(np.uint8), 'L')
+    mask = mask.resize(image.size, Image.Resampling.BILINEAR)
+    return Image.composite(Image.new('RGB', image.size, color), image, mask)
+
+
+def main(argv=None):
+    from decoding import decode_image
+    from model_loader import build_model
+
+    import config
+
+    parser = argparse.ArgumentParser(description="Analyse par zones d'une photo et carte de chaleur")
+    parser.add_argument('image')
+    parser.add_argument('--output', help="Image PNG de la carte de la classe principale")
+    parser.add_argument('--aggregate', choices=['max', 'mean'], default=config.TILE_AGGREGATE)
+    args = parser.parse_args(argv)
+
+    model = build_model(lambda fraction, message: None)
+    image = decode_image(args.image, size=config.TILE_DECODE_SIZE, max_pixels=config.DECODE_MAX_PIXELS)
+    analysis = analyze(image, model, config.TILE_SCALES, config.TILE_OVERLAP, aggregate=args.aggregate,
+                       max_tiles=config.TILE_MAX_TILES)
+    print(f"{analysis.tiles} zones analysées ({image.width}x{image.height}, échelles {analysis.scales})")
+    results = analysis.results()
+    for result in results:
+        print(f"{result['confidence']:6.2f}%  {result['disease']}")
+    if args.output:
+        heatmap_overlay(image, analysis.class_heat(results[0]['disease'])).save(args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Mesure légère des latences par étape du pipeline de classification"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Étapes mesurées, dans l'ordre du pipeline
+STAGES = ('decode', 'preprocess', 'inference', 'explain', 'postprocess', 'render')
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyRecorder:
+    """Fenêtre glissante des durées par étape (en secondes), partagée entre sessions"""
+
+    def __init__(self, window=1000, stages=STAGES):
+        self.window = window
+        self._samples = {stage: deque(maxlen=window) for stage in stages}
+        self._requests = deque(maxlen=window)  # (horodatage de fin, durée totale)
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """Enregistre une durée pour une étape"""
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self.window)
+            self._samples[stage].append(seconds)
+
+    def observe_request(self, seconds):
+        """Enregistre la durée totale d'une classification terminée"""
+        with self._lock:
+            self._requests.append((time.time(), seconds))
+
+    @contextmanager
+    def stage(self, name):
+        """Mesure le bloc `with` comme une étape"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def samples(self, stage):
+        """Copie des durées enregistrées pour une étape"""
+        with self._lock:
+            return list(self._samples.get(stage, ()))
+
+    def percentiles(self, stage, percentiles=PERCENTILES):
+        """Percentiles (en secondes) d'une étape, ou None sans données"""
+        values = self.samples(stage)
+        if not values:
+            return None
+        return dict(zip(percentiles, np.percentile(values, percentiles)))
+
+    def summary(self):
+        """Résumé par étape : nombre, moyenne et percentiles en millisecondes"""
+        rows = []
+        for stage in list(self._samples):
+            values = self.samples(stage)
+            if not values:
+                continue
+            p = np.percentile(values, PERCENTILES) * 1000
+            row = {'stage': stage, 'count': len(values), 'mean_ms': float(np.mean(values) * 1000)}
+            row.update({f'p{q}_ms': float(v) for q, v in zip(PERCENTILES, p)})
+            rows.append(row)
+        return rows
+
+    def throughput(self, period=60.0):
+        """Classifications par seconde sur les `period` dernières secondes"""
+        cutoff = time.time() - period
+        with self._lock:
+            recent = sum(1 for finished, _ in self._requests if finished >= cutoff)
+        return recent / period
+
+    def request_latencies(self):
+        """Durées totales des dernières classifications (en secondes)"""
+        with self._lock:
+            return [seconds for _, seconds in self._requests]
+
+
+class RequestTimer:
+    """Chronométrage d'une classification : chaque étape est aussi envoyée au recorder
+
+    Une étape peut être mesurée depuis plusieurs threads à la fois (décodages parallèles) :
+    ses durées s'additionnent.
+    """
+
+    def __init__(self, recorder=None):
+        self.recorder = recorder
+        self.durations = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.durations[name] = self.durations.get(name, 0.0) + elapsed
+            if self.recorder is not None:
+                self.recorder.observe(name, elapsed)
+
+    def add(self, name, seconds):
+        """Ajoute une étape mesurée avant la création du timer (comptée dans le total)"""
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self._start -= seconds
+        if self.recorder is not None:
+            self.recorder.observe(name, seconds)
+
+    def finish(self):
+        """Clôt la requête et retourne sa durée totale"""
+        total = time.perf_counter() - self._start
+        if self.recorder is not None:
+            self.recorder.observe_request(total)
+        return total
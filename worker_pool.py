@@ -0,0 +1,342 @@
+"""Pool de processus d'inférence : chaque worker détient sa copie du modèle, les tenseurs
+transitent par mémoire partagée (multiprocessing.shared_memory) au lieu d'être picklés
+
+Les images passent en uint8 (4 fois moins d'octets copiés qu'en float32) : la normalisation
+est faite par le backend du worker (dans le graphe pour ServingModel et le SavedModel).
+
+Mesure du passage à l'échelle de 1 à N workers:
+    python worker_pool.py --max-workers 4 --batch-size 32 --batches 100
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from inference import IMAGE_SIZE, MODEL_PATH, to_uint8_input
+
+IMAGE_SHAPE = (IMAGE_SIZE[0], IMAGE_SIZE[1], 3)
+NUM_CLASSES = 22
+MAX_RETRY_SECONDS = 300.0  # plafond de l'attente entre deux redémarrages d'un worker en échec
+
+
+def export_artifact(backend, model_path=MODEL_PATH, tflite_dir=None, savedmodel_dir=None):
+    """(Ré)exporte au besoin l'artefact du backend, une fois dans le processus parent plutôt que
+    dans chaque worker (TensorFlow n'est importé que pour un SavedModel ou un export)"""
+    if backend.startswith('tflite-'):
+        from tflite_backend import TFLITE_DIR, ensure_tflite
+        ensure_tflite(backend.split('-', 1)[1], tflite_dir or TFLITE_DIR, model_path)
+    elif backend == 'savedmodel':
+        from serving import SAVEDMODEL_DIR, ensure_savedmodel
+        ensure_savedmodel(model_path, savedmodel_dir or SAVEDMODEL_DIR)
+
+
+def _worker_main(connection, input_name, output_name, max_batch, backend, model_path,
+                 threads, cpus, tflite_dir, savedmodel_dir):
+    """Boucle d'un worker : attend (n,) sur le pipe, lit n images en mémoire partagée, écrit les sorties"""
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    from serving import load_backend
+
+    input_shm = shared_memory.SharedMemory(name=input_name)
+    output_shm = shared_memory.SharedMemory(name=output_name)
+    inputs = np.ndarray((max_batch, *IMAGE_SHAPE), dtype=np.uint8, buffer=input_shm.buf)
+    outputs = np.ndarray((max_batch, NUM_CLASSES), dtype=np.float32, buffer=output_shm.buf)
+    model = load_backend(backend, model_path, threads, tflite_dir, savedmodel_dir)
+    connection.send(('ready', os.getpid()))
+
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                return
+            if message is None:
+                return
+            if message == 'ping':
+                connection.send(('pong', None))
+                continue
+            count = message
+            try:
+                outputs[:count] = model.predict(inputs[:count])
+                connection.send(('ok', count))
+            except Exception as exc:
+                connection.send(('error', repr(exc)))
+    finally:
+        del inputs, outputs
+        input_shm.close()
+        output_shm.close()
+
+
+class _Worker:
+    """Processus worker et ses deux segments de mémoire partagée (entrées / sorties)"""
+
+    def __init__(self, index, context, max_batch, backend, model_path, threads, cpus, start_timeout,
+                 tflite_dir=None, savedmodel_dir=None):
+        self.index = index
+        self.max_batch = max_batch
+        self.restarts = -1
+        self.error = None      # dernière erreur de redémarrage (worker retiré du pool)
+        self.failures = 0
+        self.retry_at = 0.0
+        self._args = (context, backend, model_path, threads, cpus, start_timeout, tflite_dir, savedmodel_dir)
+        self.input_shm = shared_memory.SharedMemory(create=True, size=max_batch * int(np.prod(IMAGE_SHAPE)))
+        self.output_shm = shared_memory.SharedMemory(create=True, size=max_batch * NUM_CLASSES * 4)
+        self.inputs = np.ndarray((max_batch, *IMAGE_SHAPE), dtype=np.uint8, buffer=self.input_shm.buf)
+        self.outputs = np.ndarray((max_batch, NUM_CLASSES), dtype=np.float32, buffer=self.output_shm.buf)
+        self.start()
+
+    def start(self):
+        context, backend, model_path, threads, cpus, start_timeout, tflite_dir, savedmodel_dir = self._args
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, self.input_shm.name, self.output_shm.name, self.max_batch,
+                  backend, model_path, threads, cpus, tflite_dir, savedmodel_dir),
+            name=f"dermai-worker-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        try:
+            if not self.connection.poll(start_timeout):
+                raise TimeoutError(f"délai de {start_timeout}s dépassé")
+            self.connection.recv()
+        except (OSError, EOFError, TimeoutError) as exc:
+            self.process.kill()
+            self.process.join()
+            self.connection.close()
+            raise RuntimeError(f"Le worker {self.index} n'a pas démarré: {exc!r}") from exc
+        self.restarts += 1
+
+    def restart(self):
+        self.stop(timeout=1.0)
+        self.start()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def ping(self, timeout=5.0):
+        try:
+            self.connection.send('ping')
+            return self.connection.poll(timeout) and self.connection.recv()[0] == 'pong'
+        except (OSError, EOFError):
+            return False
+
+    def run(self, images, timeout):
+        """Exécute un lot (n <= max_batch) ; lève ConnectionError si le worker ne répond pas"""
+        count = len(images)
+        self.inputs[:count] = images
+        try:
+            self.connection.send(count)
+            if not self.connection.poll(timeout):
+                raise ConnectionError(f"Le worker {self.index} ne répond pas")
+            status, detail = self.connection.recv()
+        except (OSError, EOFError) as exc:
+            raise ConnectionError(f"Le worker {self.index} s'est arrêté") from exc
+        if status != 'ok':
+            raise RuntimeError(f"Erreur du worker {self.index}: {detail}")
+        return self.outputs[:count].copy()
+
+    def stop(self, timeout=5.0):
+        try:
+            self.connection.send(None)
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+    def release(self):
+        del self.inputs, self.outputs
+        self.input_shm.close()
+        self.input_shm.unlink()
+        self.output_shm.close()
+        self.output_shm.unlink()
+
+
+class WorkerPool:
+    """N processus d'inférence avec la même interface predict() que ServingModel
+
+    Un appel prend un worker libre, lui confie son lot par mémoire partagée et le rend ensuite.
+    Un worker mort est redémarré (et le lot rejoué une fois) ; un thread de surveillance
+    vérifie périodiquement l'état des workers libres. Un worker qui ne redémarre pas est retiré
+    du pool et retenté par la surveillance avec un délai croissant (erreur visible dans health()).
+    """
+
+    def __init__(self, num_workers=2, backend='keras', model_path=MODEL_PATH, threads_per_worker=1,
+                 max_batch=128, pin_cpus=True, request_timeout=60.0, start_timeout=120.0,
+                 health_interval=10.0, tflite_dir=None, savedmodel_dir=None):
+        self.num_workers = num_workers
+        self.max_batch = max_batch
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+        self._failed = []
+        self._failed_lock = threading.Lock()
+        context = mp.get_context('spawn')  # pas de fork d'un runtime TensorFlow déjà initialisé
+        cpu_count = os.cpu_count() or 1
+        self._workers = []
+        self._idle = queue.Queue()
+        export_artifact(backend, model_path, tflite_dir, savedmodel_dir)
+        try:
+            for index in range(num_workers):
+                cpus = None
+                if pin_cpus and num_workers * threads_per_worker <= cpu_count:
+                    cpus = set(range(index * threads_per_worker, (index + 1) * threads_per_worker))
+                worker = _Worker(index, context, max_batch, backend, model_path, threads_per_worker,
+                                 cpus, start_timeout, tflite_dir, savedmodel_dir)
+                self._workers.append(worker)
+                self._idle.put(worker)
+        except Exception:
+            self.close()
+            raise
+        self._closed = threading.Event()
+        self._monitor = threading.Thread(target=self._watch, args=(health_interval,),
+                                         name='worker-pool-monitor', daemon=True)
+        self._monitor.start()
+
+    def predict(self, images):
+        images = to_uint8_input(images)
+        if images.ndim == 3:
+            images = images[np.newaxis]
+        if len(images) > self.max_batch:
+            return np.concatenate([self.predict(images[start:start + self.max_batch])
+                                   for start in range(0, len(images), self.max_batch)])
+        with self._failed_lock:
+            all_failed = len(self._failed) == len(self._workers)
+        if all_failed:
+            raise RuntimeError(f"Aucun worker disponible: {self._failure_summary()}")
+        try:
+            worker = self._idle.get(timeout=self.request_timeout)
+        except queue.Empty:
+            raise RuntimeError(f"Aucun worker disponible: {self._failure_summary()}") from None
+        healthy = True
+        try:
+            try:
+                return worker.run(images, self.request_timeout)
+            except ConnectionError:
+                healthy = self._restart(worker)
+                if not healthy:
+                    raise RuntimeError(f"Le worker {worker.index} ne redémarre pas: {worker.error}") from None
+                return worker.run(images, self.request_timeout)
+        finally:
+            if healthy:
+                self._idle.put(worker)
+
+    __call__ = predict
+
+    def health(self):
+        """État de chaque worker (vivant, pid, redémarrages, erreur s'il est retiré du pool)"""
+        return [
+            {'worker': worker.index, 'alive': worker.is_alive(), 'pid': worker.process.pid,
+             'restarts': worker.restarts, 'failed': worker.error is not None, 'error': worker.error}
+            for worker in self._workers
+        ]
+
+    def check(self):
+        """Ping des workers libres, redémarre ceux qui sont morts ou muets ; retente les workers
+        en échec dont le délai est écoulé"""
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker.is_alive() and worker.ping() or self._restart(worker):
+                self._idle.put(worker)
+
+        now = time.monotonic()
+        with self._failed_lock:
+            due = [worker for worker in self._failed if worker.retry_at <= now]
+            self._failed = [worker for worker in self._failed if worker.retry_at > now]
+        for worker in due:
+            if self._restart(worker):
+                self._idle.put(worker)
+
+    def _restart(self, worker):
+        """Redémarre un worker ; en cas d'échec, le retire du pool jusqu'au prochain essai (False)"""
+        try:
+            worker.restart()
+        except Exception as exc:
+            worker.error = repr(exc)
+            worker.failures += 1
+            delay = min(self.health_interval * 2 ** (worker.failures - 1), MAX_RETRY_SECONDS)
+            worker.retry_at = time.monotonic() + delay
+            with self._failed_lock:
+                self._failed.append(worker)
+            return False
+        worker.error = None
+        worker.failures = 0
+        return True
+
+    def _failure_summary(self):
+        with self._failed_lock:
+            return "; ".join(f"worker {worker.index}: {worker.error}" for worker in self._failed) or "délai dépassé"
+
+    def close(self):
+        if hasattr(self, '_closed'):
+            self._closed.set()
+        for worker in self._workers:
+            worker.stop()
+            worker.release()
+        self._workers = []
+
+    def _watch(self, interval):
+        while not self._closed.wait(interval):
+            try:
+                self.check()
+            except Exception:
+                continue
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Débit du pool de workers de 1 à N processus")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--batches', type=int, default=100, help="Lots envoyés par mesure")
+    parser.add_argument('--backend', default='keras')
+    args = parser.parse_args(argv)
+
+    images = np.random.default_rng(0).integers(0, 256, (args.batch_size, *IMAGE_SHAPE), dtype=np.uint8)
+    baseline = None
+    print(f"{'workers':>7} {'images/s':>10} {'accélération':>12}")
+    for workers in range(1, args.max_workers + 1):
+        pool = WorkerPool(workers, args.backend, threads_per_worker=args.threads_per_worker,
+                          max_batch=args.batch_size)
+        try:
+            pool.predict(images)  # préchauffage
+            remaining = iter(range(args.batches))
+            lock = threading.Lock()
+
+            def client():
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    pool.predict(images)
+
+            clients = [threading.Thread(target=client) for _ in range(workers * 2)]
+            start = time.perf_counter()
+            for thread in clients:
+                thread.start()
+            for thread in clients:
+                thread.join()
+            rate = args.batches * args.batch_size / (time.perf_counter() - start)
+        finally:
+            pool.close()
+        baseline = baseline or rate
+        print(f"{workers:>7} {rate:>10.0f} {rate / baseline:>11.2f}x")
+
+
+if __name__ == '__main__':
+    main()